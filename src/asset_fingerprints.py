@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+from typing import Dict, List, Optional, Tuple
+
+from build_manifest import GENERATED_SECTION, BuildManifest, remove_generated, remove_output, write_generated
+from copy_static_to_public import SKIPPED, sync_file
+from images import IMAGES_SECTION, transform_key
+from link_checker import resolve_link
+from metadata_index import page_url
+
+# Manifest section holding each fingerprinted static file's content hash and fingerprinted name.
+ASSETS_SECTION = "assets"
+# Written to the output root for deploy tooling: {"index.css": "index.0123456789.css", ...}.
+ASSET_MANIFEST_FILE = "asset-manifest.json"
+
+# Static files referenced by pages; anything else (HTML, robots.txt,
+# favicon.ico) is fetched by a fixed name and keeps it.
+FINGERPRINT_EXTENSIONS = (
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg",
+    ".woff", ".woff2", ".ttf", ".otf",
+)
+# Hex digits of the content hash kept in the name.
+HASH_LENGTH = 10
+
+_REFERENCE_RE = re.compile(r"""(\s(?:href|src|srcset|poster)=)(?:"([^"]*)"|'([^']*)')""")
+
+
+def is_asset(key: str) -> bool:
+    return key.lower().endswith(FINGERPRINT_EXTENSIONS)
+
+
+def fingerprinted_name(key: str, content_hash: str) -> str:
+    """css/index.css with content hash 0123456789abc... is written as css/index.0123456789.css."""
+    directory, name = posixpath.split(key)
+    stem, extension = posixpath.splitext(name)
+    return posixpath.join(directory, f"{stem}.{content_hash[:HASH_LENGTH]}{extension}")
+
+
+def _image_variants(manifest: BuildManifest, dest_dir: str) -> Dict[str, Tuple[str, str]]:
+    """The resized images process_images wrote, each with the hash of what it is made from and its path."""
+    variants = {}
+    for key in manifest.keys(IMAGES_SECTION):
+        entry = manifest.get(IMAGES_SECTION, key)
+        for width, name in entry["variants"]:
+            variants[name] = (transform_key(entry["hash"], width), os.path.join(dest_dir, *name.split("/")))
+    return variants
+
+
+def fingerprint_assets(manifest: BuildManifest, static_dir: str, dest_dir: str, mode: str = "copy") -> Dict[str, int]:
+    """
+    Writes a name.<hash>.ext copy of every static asset next to its original.
+
+    Run after the static files were synced and the images processed: the
+    hash is the one copy_static_incremental recorded while copying, so no
+    file is read twice. The resized variants of process_images are
+    fingerprinted too, by their transform_key, so a srcset never names a
+    cached copy of an old image. A file whose contents are unchanged keeps
+    its fingerprinted name and is not written again; copies of old
+    contents are removed. The originals stay in place for links that don't
+    go through the rewrite.
+
+    Returns:
+        dict: Counts of "assets", "written", "unchanged" and "removed" files.
+    """
+    live = {
+        key: (manifest.get("static", key)["hash"], os.path.join(static_dir, *key.split("/")))
+        for key in manifest.keys("static") if is_asset(key)
+    }
+    live.update(_image_variants(manifest, dest_dir))
+    removed = 0
+    for key in manifest.keys(ASSETS_SECTION):
+        entry = manifest.get(ASSETS_SECTION, key)
+        if key not in live or live[key][0] != entry["hash"]:
+            remove_output(os.path.join(dest_dir, *entry["output"].split("/")), dest_dir)
+            manifest.pop(ASSETS_SECTION, key)
+            removed += 1
+
+    written = unchanged = 0
+    for key, (content_hash, source_path) in sorted(live.items()):
+        output = fingerprinted_name(key, content_hash)
+        action = sync_file(source_path, os.path.join(dest_dir, *output.split("/")), mode)
+        if action == SKIPPED:
+            unchanged += 1
+        else:
+            written += 1
+        manifest.set(ASSETS_SECTION, key, {"hash": content_hash, "output": output})
+
+    assets = asset_map(manifest)
+    asset_manifest = json.dumps(assets, indent=2, sort_keys=True)
+
+    def write_asset_manifest(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(asset_manifest)
+    write_generated(manifest, dest_dir, ASSET_MANIFEST_FILE,
+                    hashlib.sha256(asset_manifest.encode("utf-8")).hexdigest(), write_asset_manifest)
+    return {"assets": len(live), "written": written, "unchanged": unchanged, "removed": removed}
+
+
+def remove_fingerprinted_assets(manifest: BuildManifest, dest_dir: str):
+    """Deletes the fingerprinted copies and asset-manifest.json of an earlier build, for a build without them."""
+    for key in manifest.keys(ASSETS_SECTION):
+        entry = manifest.pop(ASSETS_SECTION, key)
+        remove_output(os.path.join(dest_dir, *entry["output"].split("/")), dest_dir)
+    if manifest.get(GENERATED_SECTION, ASSET_MANIFEST_FILE) is not None:
+        remove_generated(manifest, dest_dir, ASSET_MANIFEST_FILE)
+
+
+def asset_map(manifest: BuildManifest) -> Dict[str, str]:
+    """Original output path -> fingerprinted output path, as recorded by fingerprint_assets."""
+    return {key: manifest.get(ASSETS_SECTION, key)["output"] for key in manifest.keys(ASSETS_SECTION)}
+
+
+def asset_map_digest(assets: Optional[Dict[str, str]]) -> str:
+    """Changes whenever an asset's fingerprinted name does, i.e. whenever pages referencing it need re-rendering."""
+    return hashlib.sha256(repr(sorted(assets.items()) if assets is not None else None).encode("utf-8")).hexdigest()
+
+
+def _rewrite_url(value: str, url: str, assets: Dict[str, str]) -> str:
+    target = assets.get(resolve_link(url, value))
+    if target is None:
+        return value
+    # Swap only the file name, so the reference stays as relative (and keeps the query or fragment) it was.
+    end = len(value)
+    for separator in "?#":
+        position = value.find(separator)
+        if position != -1:
+            end = min(end, position)
+    start = value.rfind("/", 0, end) + 1
+    return value[:start] + posixpath.basename(target) + value[end:]
+
+
+def _rewrite_srcset(value: str, url: str, assets: Dict[str, str]) -> str:
+    candidates = []
+    for candidate in value.split(","):
+        reference = candidate.strip().split(" ", 1)[0]
+        rewritten = _rewrite_url(reference, url, assets)
+        candidates.append(candidate.replace(reference, rewritten, 1) if rewritten != reference else candidate)
+    return ",".join(candidates)
+
+
+def rewrite_asset_references(text: str, url: str, assets: Dict[str, str]) -> str:
+    """
+    Points the href, src, srcset and poster attributes in text that name a
+    fingerprinted asset at its fingerprinted name, in one regex pass.
+
+    Args:
+        text: HTML (a filled-in template, or part of one).
+        url: The page's URL, that relative references are resolved against.
+        assets: The asset_map.
+
+    Returns:
+        The HTML, with every other reference (external, unknown, not fingerprinted) untouched.
+    """
+    if not assets:
+        return text
+
+    def rewrite(match):
+        attribute, double_quoted, single_quoted = match.groups()
+        value = double_quoted if double_quoted is not None else single_quoted
+        if attribute.endswith("srcset="):
+            new_value = _rewrite_srcset(value, url, assets)
+        else:
+            new_value = _rewrite_url(value, url, assets)
+        if new_value == value:
+            return match.group(0)
+        quote = '"' if double_quoted is not None else "'"
+        return f"{attribute}{quote}{new_value}{quote}"
+
+    return _REFERENCE_RE.sub(rewrite, text)
+
+
+# Asset rewriting of this process: (asset_map, output root) or None.
+_asset_settings: Optional[Tuple[Dict[str, str], str]] = None
+
+
+def enable_asset_rewrite(assets: Dict[str, str], dest_dir: str):
+    """Makes generate_page rewrite asset references, for pages under dest_dir, in this process."""
+    global _asset_settings
+    _asset_settings = (assets, dest_dir)
+
+
+def disable_asset_rewrite():
+    global _asset_settings
+    _asset_settings = None
+
+
+def get_asset_settings() -> Optional[Tuple[Dict[str, str], str]]:
+    return _asset_settings
+
+
+def apply_asset_rewrite(page_parts: List[str], dest_path: str) -> List[str]:
+    """
+    rewrite_asset_references on the filled-in template pieces of the page written to dest_path, if enabled.
+
+    The pieces are joined first, so an attribute whose value comes from a
+    slot (href="{{ Style }}") or spans several pieces is rewritten too.
+    """
+    if _asset_settings is None:
+        return page_parts
+    assets, dest_dir = _asset_settings
+    return [rewrite_asset_references("".join(page_parts), page_url(dest_path, dest_dir), assets)]
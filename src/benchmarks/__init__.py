@@ -0,0 +1 @@
+"""Benchmarks for the site generator. Run from src/, e.g. python3 -m benchmarks.inline_children."""
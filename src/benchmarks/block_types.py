@@ -0,0 +1,68 @@
+"""
+Time of block_to_block_type on large list, quote and code blocks.
+
+Compares the first-character dispatch classifier with the sequential checks
+it replaced (splitlines, six heading prefixes, whole-block counts for code and
+one pass over the lines per list/quote check).
+
+Usage (from src/):
+    python3 -m benchmarks.block_types [--lines 100 10000] [--repeat 5]
+"""
+from benchmarks.harness import benchmark_parser, best_time
+from block_to_block_type import BlockType, block_to_block_type
+
+
+def sequential_block_to_block_type(block: str) -> BlockType:
+    lines = block.splitlines()
+    if not lines:
+        return BlockType.PARAGRAPH
+    if lines[0].startswith('#'):
+        for prefix in ('###### ', '##### ', '#### ', '### ', '## ', '# '):
+            if lines[0].startswith(prefix):
+                return BlockType.HEADING
+        return BlockType.PARAGRAPH
+    if block.startswith('```'):
+        if block.endswith('```') and block.count('```') == 2:
+            if block.count('\n') == 0 or block.startswith('```\n') or block.endswith('\n```'):
+                return BlockType.CODE
+        return BlockType.PARAGRAPH
+    if all(line.startswith('>') for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith('- ') for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(line.startswith(f'{i+1}. ') for i, line in enumerate(lines)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def make_blocks(lines: int) -> dict:
+    """Returns one block of each kind with the given number of lines."""
+    item = "an item with some **bold** words in it"
+    return {
+        "unordered list": "\n".join(f"- {item}" for _ in range(lines)),
+        "ordered list": "\n".join(f"{number}. {item}" for number in range(1, lines + 1)),
+        "quote": "\n".join(f"> {item}" for _ in range(lines)),
+        "code": "```\n" + "\n".join(f"    {item}" for _ in range(lines)) + "\n```",
+        "paragraph": "\n".join(item for _ in range(lines)),
+        "heading": "###### " + item,
+    }
+
+
+def main(argv=None):
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 1_000, 100_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'lines':>7} {'block':<15} {'sequential us':>14} {'dispatch us':>12} {'speedup':>8}")
+    for lines in args.lines:
+        number = max(1, 100_000 // lines)
+        for name, block in make_blocks(lines).items():
+            if block_to_block_type(block) != sequential_block_to_block_type(block):
+                raise SystemExit(f"classifiers disagree on the {name} block")
+            before = best_time(sequential_block_to_block_type, [block], args.repeat, number)
+            after = best_time(block_to_block_type, [block], args.repeat, number)
+            print(f"{lines:>7} {name:<15} {before * 1e6:>14.2f} {after * 1e6:>12.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Synthetic markdown corpora for benchmarks.
+
+Every generator is deterministic for a given random.Random, so two runs with
+the same seed and sizes benchmark exactly the same text.
+
+Usage (from src/), to write a corpus to disk for use as a content/ tree:
+    python3 -m benchmarks.corpus OUTPUT_DIR [--pages 1000] [--page-size 4000] [--seed 0]
+"""
+import argparse
+import os
+import random
+from typing import Callable, Dict, List, Tuple
+
+_WORDS = (
+    "hobbit ring shire wizard elf dwarf mountain river forest road tower "
+    "king sword song star journey fellowship council gate bridge lantern"
+).split()
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+
+def _inline_sentence(rng: random.Random) -> str:
+    """A sentence mixing every inline construct."""
+    return (
+        f"{_words(rng, 4).capitalize()} **{_words(rng, 2)}** and _{_words(rng, 2)}_ "
+        f"with `{rng.choice(_WORDS)}()` near [{_words(rng, 2)}](/{rng.choice(_WORDS)}/{rng.randrange(1000)}) "
+        f"and ![{rng.choice(_WORDS)}](/images/{rng.choice(_WORDS)}.png)."
+    )
+
+
+def deep_nesting(rng: random.Random, size: int) -> str:
+    """Nested emphasis inside quotes, list items and headings."""
+    blocks = []
+    while sum(map(len, blocks)) < size:
+        depth = rng.randint(3, 8)
+        nested = _words(rng, 2)
+        for level in range(depth):
+            nested = f"**{_words(rng, 1)} _{nested}_ {_words(rng, 1)}**" if level % 2 else f"_{nested} {_words(rng, 1)}_"
+        blocks.append(f"## {_words(rng, 3).title()} **{_words(rng, 1)}**")
+        blocks.append("\n".join(f"> {nested} {_words(rng, 3)}" for _ in range(rng.randint(2, 5))))
+        blocks.append("\n".join(f"- {nested}" for _ in range(rng.randint(2, 5))))
+    return "\n\n".join(blocks)
+
+
+def long_paragraphs(rng: random.Random, size: int) -> str:
+    """A few very long paragraphs of mostly plain text with occasional emphasis."""
+    paragraphs = []
+    while sum(map(len, paragraphs)) < size:
+        sentences = [_words(rng, rng.randint(8, 20)).capitalize() + "." for _ in range(rng.randint(40, 120))]
+        for index in rng.sample(range(len(sentences)), k=min(5, len(sentences))):
+            sentences[index] = f"**{sentences[index]}**" if index % 2 else f"_{sentences[index]}_"
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def links_and_images(rng: random.Random, size: int) -> str:
+    """Paragraphs dense with links, images and other inline markup."""
+    paragraphs = []
+    while sum(map(len, paragraphs)) < size:
+        paragraphs.append(" ".join(_inline_sentence(rng) for _ in range(rng.randint(3, 10))))
+    return "\n\n".join(paragraphs)
+
+
+def long_lists(rng: random.Random, size: int) -> str:
+    """Long unordered and ordered lists."""
+    blocks = []
+    while sum(map(len, blocks)) < size:
+        items = rng.randint(50, 300)
+        if rng.random() < 0.5:
+            blocks.append("\n".join(f"- {_words(rng, rng.randint(3, 12))}" for _ in range(items)))
+        else:
+            blocks.append("\n".join(f"{number}. {_words(rng, rng.randint(3, 12))}" for number in range(1, items + 1)))
+    return "\n\n".join(blocks)
+
+
+def big_code_blocks(rng: random.Random, size: int) -> str:
+    """Large fenced code blocks between short paragraphs."""
+    blocks = []
+    while sum(map(len, blocks)) < size:
+        lines = [
+            f"    {rng.choice(_WORDS)}_{index} = {rng.choice(_WORDS)}({rng.randrange(100)})"
+            for index in range(rng.randint(50, 400))
+        ]
+        blocks.append(_words(rng, 12).capitalize() + ":")
+        blocks.append("```\ndef " + rng.choice(_WORDS) + "():\n" + "\n".join(lines) + "\n```")
+    return "\n\n".join(blocks)
+
+
+def mixed(rng: random.Random, size: int) -> str:
+    """A typical page: title, paragraphs, lists, a quote and a code block."""
+    share = max(1, size // 5)
+    return "\n\n".join([
+        f"# {_words(rng, 4).title()}",
+        links_and_images(rng, share),
+        long_lists(rng, share // 4),
+        deep_nesting(rng, share // 2),
+        long_paragraphs(rng, share),
+        big_code_blocks(rng, share // 2),
+    ])
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int], str]] = {
+    "deep_nesting": deep_nesting,
+    "long_paragraphs": long_paragraphs,
+    "links_and_images": links_and_images,
+    "long_lists": long_lists,
+    "big_code_blocks": big_code_blocks,
+    "mixed": mixed,
+}
+
+
+def generate_corpus(pages: int, page_size: int, seed: int = 0, kinds: List[str] = None) -> List[Tuple[str, str]]:
+    """
+    Generates pages of roughly page_size characters, cycling through kinds.
+
+    Args:
+        pages: Number of documents.
+        page_size: Approximate characters per document.
+        seed: Random seed; the same seed gives the same corpus.
+        kinds: GENERATORS names to cycle through, defaults to all of them.
+
+    Returns:
+        A list of (relative path, markdown) pairs, e.g. ("long_lists/00003.md", "...").
+    """
+    kinds = kinds or list(GENERATORS)
+    unknown = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        raise ValueError(f"Unknown corpus kinds: {', '.join(unknown)}")
+
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(pages):
+        kind = kinds[index % len(kinds)]
+        corpus.append((f"{kind}/{index:05d}.md", GENERATORS[kind](rng, page_size)))
+    return corpus
+
+
+def write_corpus(output_dir: str, corpus: List[Tuple[str, str]]) -> None:
+    for relative_path, text in corpus:
+        path = os.path.join(output_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic markdown corpus to a directory.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kinds", nargs="+", choices=sorted(GENERATORS))
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.pages, args.page_size, args.seed, args.kinds)
+    write_corpus(args.output_dir, corpus)
+    print(f"Wrote {len(corpus)} pages ({sum(len(text) for _, text in corpus) / 1e6:.1f} MB) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Timing and command line helpers shared by the benchmarks.
+
+Each benchmark module builds its parser with benchmark_parser() and times
+its implementations with best_time(), so every benchmark reports the same
+statistic and accepts the same corpus options.
+"""
+import argparse
+import time
+from typing import Callable, Iterable, List, Optional
+
+from benchmarks.corpus import GENERATORS, generate_corpus
+
+
+def best_time(func: Callable, items: Iterable, repeat: int, number: int = 1) -> float:
+    """
+    Returns the best of repeat timings of calling func on every item, number times over.
+
+    Args:
+        func: The function to time, called with one item.
+        items: The inputs; a single input is passed as a one-item list.
+        repeat: Number of timings to take the best of.
+        number: Passes over items per timing, for inputs too fast to time once.
+
+    Returns:
+        The wall time of one pass over items, in seconds.
+    """
+    items = list(items)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            for item in items:
+                func(item)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def benchmark_parser(doc: str, repeat: int = 5, pages: Optional[int] = None) -> argparse.ArgumentParser:
+    """
+    Returns a parser described by the first line of the benchmark's docstring, with --repeat.
+
+    Args:
+        doc: The benchmark module's __doc__.
+        repeat: Default of --repeat.
+        pages: If given, also adds the corpus options --pages (with this
+            default), --page-size, --seed and --kinds; see corpus_texts.
+    """
+    parser = argparse.ArgumentParser(description=doc.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=repeat)
+    if pages is not None:
+        parser.add_argument("--pages", type=int, default=pages)
+        parser.add_argument("--page-size", type=int, default=4000, help="approximate characters per page")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--kinds", nargs="+", choices=sorted(GENERATORS), help="corpus kinds (default: all)")
+    return parser
+
+
+def corpus_texts(args: argparse.Namespace) -> List[str]:
+    """The markdown of the corpus described by a benchmark_parser's corpus options."""
+    return [text for _, text in generate_corpus(args.pages, args.page_size, args.seed, args.kinds)]
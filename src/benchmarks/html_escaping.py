@@ -0,0 +1,78 @@
+"""
+Cost of escaping in htmlnode serialization.
+
+Serializes the same htmlnode trees (built by the native renderer from the
+corpus) three ways: unescaped, as LeafNode.to_html and props_to_html did
+before; naively escaped, with html.escape on every leaf value and every
+attribute value; and with htmlnode's batched escaping and cached attribute
+strings, which must give the same HTML as the naive version.
+
+Usage (from src/):
+    python3 -m benchmarks.html_escaping [--pages 200] [--page-size 4000] [--seed 0] [--repeat 5]
+                                        [--kinds links_and_images long_paragraphs ...]
+"""
+import html
+from typing import Callable, List
+
+from benchmarks.harness import benchmark_parser, best_time, corpus_texts
+from block_to_block_type import block_to_block_type
+from htmlnode import LeafNode, ParentNode
+from markdown_to_blocks import markdown_to_blocks
+from renderers import NativeRenderer
+
+
+def _serialize(node, escape_value: Callable, escape_attribute: Callable) -> str:
+    attributes = "".join(f' {key}="{escape_attribute(value)}"' for key, value in node.props.items())
+    if isinstance(node, LeafNode):
+        value = escape_value(node.value)
+        if node.tag is None:
+            return value
+        return f"<{node.tag}{attributes}>{value}</{node.tag}>"
+    children = "".join(_serialize(child, escape_value, escape_attribute) for child in node.children)
+    return f"<{node.tag}{attributes}>{children}</{node.tag}>"
+
+
+def unescaped_to_html(node) -> str:
+    return _serialize(node, str, str)
+
+
+def naive_to_html(node) -> str:
+    return _serialize(node, lambda value: html.escape(value, quote=False), lambda value: html.escape(str(value)))
+
+
+def build_trees(texts: List[str]) -> List[ParentNode]:
+    renderer = NativeRenderer()
+    trees = []
+    for text in texts:
+        children = []
+        for block in markdown_to_blocks(text):
+            try:
+                children.append(renderer.block_node(block, block_to_block_type(block)))
+            except ValueError:
+                # Images without alt text; the native renderer rejects them.
+                continue
+        trees.append(ParentNode("div", children))
+    return trees
+
+
+def main(argv=None):
+    args = benchmark_parser(__doc__, pages=200).parse_args(argv)
+
+    texts = corpus_texts(args)
+    trees = build_trees(texts)
+    if [tree.to_html() for tree in trees] != [naive_to_html(tree) for tree in trees]:
+        raise SystemExit("htmlnode output differs from naive escaping")
+
+    results = [
+        ("unescaped", best_time(unescaped_to_html, trees, args.repeat)),
+        ("naive html.escape", best_time(naive_to_html, trees, args.repeat)),
+        ("htmlnode to_html", best_time(lambda tree: tree.to_html(), trees, args.repeat)),
+    ]
+    print(f"{len(trees)} pages, best of {args.repeat}")
+    print(f"{'impl':<20} {'total s':>9} {'per page us':>12}")
+    for name, seconds in results:
+        print(f"{name:<20} {seconds:>9.3f} {seconds / len(trees) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+The in-house HTML path against python-markdown on the same corpus.
+
+Times html_node_to_html on trees built beforehand, against a naive
+serializer that builds a string per node and escapes every TEXT node on its
+own (and must give the same HTML). Then times the whole in-house path,
+markdown_to_html (blocks, inline parsing, tree, serialization), against
+python-markdown's MarkdownRenderer on the same pages.
+
+Usage (from src/):
+    python3 -m benchmarks.html_serializer [--pages 200] [--page-size 4000] [--seed 0] [--repeat 5]
+                                          [--kinds long_lists deep_nesting ...]
+"""
+import html
+import sys
+
+from benchmarks.harness import benchmark_parser, best_time, corpus_texts
+from markdown_to_html_node import HTML_TAGS, HTMLNode, HTMLNodeType, html_node_to_html, markdown_to_html, markdown_to_html_node
+
+
+def naive_to_html(node: HTMLNode) -> str:
+    """Recursive per-node serialization, escaping each TEXT node separately."""
+    if node.node_type == HTMLNodeType.TEXT:
+        return html.escape(node.text or '', quote=False)
+    if node.node_type == HTMLNodeType.IMG:
+        alt = html.escape(''.join(child.text for child in node.children))
+        return f'<img alt="{alt}" src="{html.escape(node.text)}" />'
+    tag = HTML_TAGS[node.node_type]
+    attributes = f' href="{html.escape(node.text)}"' if node.node_type == HTMLNodeType.A else ""
+    return f"<{tag}{attributes}>{''.join(naive_to_html(child) for child in node.children)}</{tag}>"
+
+
+def main(argv=None):
+    args = benchmark_parser(__doc__, pages=200).parse_args(argv)
+
+    texts = corpus_texts(args)
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    trees = [markdown_to_html_node(text) for text in texts]
+    if [html_node_to_html(tree) for tree in trees] != [naive_to_html(tree) for tree in trees]:
+        raise SystemExit("html_node_to_html output differs from the naive serializer")
+
+    results = [
+        ("naive serializer", best_time(naive_to_html, trees, args.repeat)),
+        ("html_node_to_html", best_time(html_node_to_html, trees, args.repeat)),
+        ("markdown_to_html", best_time(markdown_to_html, texts, args.repeat)),
+    ]
+    try:
+        from markdown_renderer import MarkdownRenderer
+    except ImportError as e:
+        print(f"Skipping python-markdown: {e}", file=sys.stderr)
+    else:
+        renderer = MarkdownRenderer()
+        results.append(("python-markdown", best_time(renderer.render, texts, args.repeat)))
+
+    print(f"{len(texts)} pages, {megabytes:.2f} MB, best of {args.repeat}")
+    print(f"{'impl':<20} {'total s':>9} {'MB/s':>9} {'per page us':>12}")
+    for name, seconds in results:
+        print(f"{name:<20} {seconds:>9.3f} {megabytes / seconds:>9.2f} {seconds / len(texts) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Node count and timing of markdown_to_html_node.text_to_children on large paragraphs.
+
+Compares the delimiter-stack scanner against the previous character-at-a-time
+implementation, kept below as _legacy_text_to_children for reference.
+
+Usage (from src/):
+    python3 -m benchmarks.inline_children [--sizes 1000 10000 100000] [--repeat 5]
+"""
+from benchmarks.harness import benchmark_parser, best_time
+from markdown_to_html_node import HTMLNode, HTMLNodeType, text_node_to_html_node, text_to_children
+
+_SENTENCE = "Here is some **bold text** and _italic words_ with `inline code` in it. "
+
+
+def _legacy_text_to_children(text):
+    children = []
+    i = 0
+    while i < len(text):
+        if text[i:i+2] == '**':
+            end = text.find('**', i + 2)
+            if end != -1:
+                children.append(HTMLNode(HTMLNodeType.STRONG, children=_legacy_text_to_children(text[i+2:end])))
+                i = end + 2
+                continue
+        elif text[i:i+1] == '_':
+            end = text.find('_', i + 1)
+            if end != -1:
+                children.append(HTMLNode(HTMLNodeType.EM, children=_legacy_text_to_children(text[i+1:end])))
+                i = end + 1
+                continue
+        elif text[i:i+1] == '`':
+            end = text.find('`', i + 1)
+            if end != -1:
+                children.append(HTMLNode(HTMLNodeType.CODE, children=[text_node_to_html_node(text[i+1:end])]))
+                i = end + 1
+                continue
+        children.append(text_node_to_html_node(text[i]))
+        i += 1
+    return children
+
+
+def make_paragraph(size: int) -> str:
+    """Builds a paragraph of roughly size characters with mixed inline markup."""
+    repeats = size // len(_SENTENCE) + 1
+    return (_SENTENCE * repeats)[:size]
+
+
+def count_nodes(nodes) -> int:
+    total = 0
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        total += 1
+        stack.extend(node.children)
+    return total
+
+
+def main(argv=None):
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'chars':>8} {'impl':>8} {'nodes':>8} {'best ms':>10}")
+    for size in args.sizes:
+        text = make_paragraph(size)
+        for name, func in (("legacy", _legacy_text_to_children), ("scanner", text_to_children)):
+            nodes = count_nodes(func(text))
+            elapsed = best_time(func, [text], args.repeat)
+            print(f"{size:>8} {name:>8} {nodes:>8} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Time and allocations of text_to_textnodes on inline-heavy text.
+
+Compares the fused single-walk lexer with the five sequential splitter passes
+it replaced (split_nodes_code, _image, _link, _bold, _italic).
+
+Usage (from src/):
+    python3 -m benchmarks.inline_textnodes [--sizes 10000 100000] [--repeat 5]
+"""
+import tracemalloc
+
+from benchmarks.harness import benchmark_parser, best_time
+from textnode import TextNode, TextType
+from text_to_textnodes import (
+    split_nodes_bold,
+    split_nodes_code,
+    split_nodes_image,
+    split_nodes_italic,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+_SENTENCE = (
+    "See **bold _mixed_ text** and _italic_ with `code` plus "
+    "![an image](/images/pic.png) and [a link](https://example.com/page). "
+)
+
+
+def five_pass_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_code(nodes)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_bold(nodes)
+    nodes = split_nodes_italic(nodes)
+    return [node for node in nodes if node.text is not None and node.text != ""]
+
+
+def make_text(size: int) -> str:
+    """Builds roughly size characters of text dense with every inline construct."""
+    repeats = size // len(_SENTENCE) + 1
+    return _SENTENCE * repeats
+
+
+def peak_allocated(func, text: str) -> int:
+    """Returns the peak bytes allocated while func(text) runs."""
+    tracemalloc.start()
+    try:
+        func(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'chars':>9} {'impl':>10} {'nodes':>8} {'best ms':>10} {'peak KiB':>10}")
+    for size in args.sizes:
+        text = make_text(size)
+        expected = five_pass_text_to_textnodes(text)
+        if text_to_textnodes(text) != expected:
+            raise SystemExit("fused lexer output differs from the five-pass pipeline")
+        for name, func in (("five-pass", five_pass_text_to_textnodes), ("fused", text_to_textnodes)):
+            elapsed = best_time(func, [text], args.repeat)
+            peak = peak_allocated(func, text)
+            print(f"{len(text):>9} {name:>10} {len(expected):>8} {elapsed * 1000:>10.2f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-page overhead of python-markdown on many small pages.
+
+Compares markdown.markdown(), which builds a new Markdown object and looks up
+Pygments lexers and formatters on every call, with MarkdownRenderer, which
+reuses one reset() instance and cached Pygments objects.
+
+Usage (from src/):
+    python3 -m benchmarks.markdown_instance [--pages 10000] [--repeat 3]
+"""
+import random
+import time
+
+import markdown
+
+from benchmarks.harness import benchmark_parser, best_time
+from markdown_renderer import MARKDOWN_EXTENSIONS, MarkdownRenderer
+
+_LANGUAGES = ("python", "bash", "javascript", "json")
+
+
+def make_pages(count: int, seed: int = 0) -> list:
+    """Small pages: a heading, a paragraph, a short list and, on most pages, a short code block."""
+    rng = random.Random(seed)
+    pages = []
+    for index in range(count):
+        parts = [
+            f"# Page {index}",
+            f"Some *text* with a [link](/pages/{rng.randrange(1000)}) and `code`.",
+            "- one\n- two\n- three",
+        ]
+        if index % 4:
+            language = rng.choice(_LANGUAGES)
+            parts.append(f"```{language}\nvalue = {index}\nprint(value)\n```")
+        pages.append("\n\n".join(parts))
+    return pages
+
+
+def fresh_instance(text: str) -> str:
+    return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def main(argv=None):
+    parser = benchmark_parser(__doc__, repeat=3)
+    parser.add_argument("--pages", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    pages = make_pages(args.pages)
+    expected = [fresh_instance(page) for page in pages[:200]]
+    # Time markdown.markdown first: creating a MarkdownRenderer installs the
+    # lexer cache in codehilite, which markdown.markdown would then share.
+    before = best_time(fresh_instance, pages, args.repeat)
+
+    start = time.perf_counter()
+    renderer = MarkdownRenderer()
+    setup = time.perf_counter() - start
+    if [renderer.render(page) for page in pages[:200]] != expected:
+        raise SystemExit("reused renderer output differs from markdown.markdown")
+    after = best_time(renderer.render, pages, args.repeat)
+    print(f"{len(pages)} pages, best of {args.repeat}; renderer setup and warm-up {setup * 1000:.1f} ms")
+    print(f"{'impl':<20} {'total s':>9} {'per page us':>12}")
+    print(f"{'markdown.markdown':<20} {before:>9.3f} {before / len(pages) * 1e6:>12.1f}")
+    print(f"{'MarkdownRenderer':<20} {after:>9.3f} {after / len(pages) * 1e6:>12.1f}")
+    print(f"speedup {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Bytes per node for the TextNode and HTMLNode classes, measured with tracemalloc.
+
+Builds the nodes for a large synthetic document twice: once with the slotted
+classes in the tree, and once with dict-backed copies of the previous classes
+(kept below), and reports the retained bytes per node for each.
+
+Usage (from src/):
+    python3 -m benchmarks.node_memory [--paragraphs 2000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+import markdown_to_html_node
+from htmlnode import LeafNode
+from textnode import TextNode, TextType
+from text_node_to_html import text_node_to_html_node
+from text_to_textnodes import text_to_textnodes
+
+_PARAGRAPH = (
+    "This has **bold _mixed_ words** and _italic_ and `code` plus "
+    "![an image](/images/pic.png) and [a link](https://example.com/page) in it."
+)
+
+
+class _DictTextNode:
+    def __init__(self, text, text_type, url=None, alt=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+        self.alt = alt
+
+
+class _DictLeafNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children else []
+        self.props = props if props else {}
+
+
+class _DictTreeNode:
+    def __init__(self, node_type, children=None, text=None):
+        self.node_type = node_type
+        self.children = children or []
+        self.text = text
+
+
+def make_document(paragraphs: int) -> str:
+    return "\n\n".join(_PARAGRAPH for _ in range(paragraphs))
+
+
+def measure(build) -> tuple:
+    """Returns (retained bytes, node count) of the nodes build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        nodes = build()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before, len(nodes)
+
+
+def _flatten_tree(root):
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children)
+    return nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    document = make_document(args.paragraphs)
+    # Parse once up front so only node construction is measured below.
+    text_nodes = text_to_textnodes(document)
+    fields = [(node.text, node.text_type, node.url, node.alt) for node in text_nodes]
+    leaves = [text_node_to_html_node(node) for node in text_nodes if node.text_type != TextType.IMAGE or node.alt]
+    leaf_fields = [(leaf.tag, leaf.value, dict(leaf.props) or None) for leaf in leaves]
+    tree = markdown_to_html_node.markdown_to_html_node(document)
+    tree_fields = [(node.node_type, node.text) for node in _flatten_tree(tree)]
+
+    cases = [
+        ("TextNode", lambda: [TextNode(*f) for f in fields], lambda: [_DictTextNode(*f) for f in fields]),
+        ("LeafNode", lambda: [LeafNode(*f) for f in leaf_fields],
+         lambda: [_DictLeafNode(tag, value, [], props) for tag, value, props in leaf_fields]),
+        ("tree HTMLNode",
+         lambda: [markdown_to_html_node.HTMLNode(node_type, text=text) for node_type, text in tree_fields],
+         lambda: [_DictTreeNode(node_type, text=text) for node_type, text in tree_fields]),
+    ]
+
+    print(f"{'class':>14} {'nodes':>8} {'before B/node':>14} {'after B/node':>13}")
+    for name, build_slotted, build_dict in cases:
+        dict_bytes, count = measure(build_dict)
+        slotted_bytes, _ = measure(build_slotted)
+        print(f"{name:>14} {count:>8} {dict_bytes / count:>14.1f} {slotted_bytes / count:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
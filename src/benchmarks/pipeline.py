@@ -0,0 +1,227 @@
+"""
+Throughput of every stage of the markdown pipeline on a synthetic corpus.
+
+Times markdown_to_blocks, block_to_block_type, text_to_textnodes,
+markdown_to_html_node, html_node_to_html and the full main.generate_page (read, render, fill
+template, write) over the same corpus, and reports MB/s and pages/s for each.
+Results can be saved as JSON and compared against an earlier run; the exit
+status is 1 if any stage got slower than --threshold.
+
+Usage (from src/):
+    python3 -m benchmarks.pipeline [--pages 200] [--page-size 4000] [--seed 0] [--repeat 5]
+                                   [--kinds long_lists big_code_blocks ...]
+                                   [--output results.json] [--compare baseline.json]
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import GENERATORS, generate_corpus, write_corpus
+from benchmarks.harness import benchmark_parser
+from block_to_block_type import BlockType, block_to_block_type
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html_node import html_node_to_html, markdown_to_html_node
+from text_to_textnodes import text_to_textnodes
+
+_TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+def time_stage(func: Callable[[], None], repeat: int) -> List[float]:
+    """Returns the wall time in seconds of each of repeat calls of func."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _stage_functions(corpus: List[Tuple[str, str]], work_dir: str) -> Dict[str, Optional[Callable[[], None]]]:
+    """Builds a zero-argument callable per stage, each processing the whole corpus once."""
+    texts = [text for _, text in corpus]
+    blocks = [block for text in texts for block in markdown_to_blocks(text)]
+    inline_blocks = [block for block in blocks if block_to_block_type(block) != BlockType.CODE]
+    trees = [markdown_to_html_node(text) for text in texts]
+
+    def blocks_stage():
+        for text in texts:
+            markdown_to_blocks(text)
+
+    def block_types_stage():
+        for block in blocks:
+            block_to_block_type(block)
+
+    def inline_stage():
+        for block in inline_blocks:
+            text_to_textnodes(block)
+
+    def html_node_stage():
+        for text in texts:
+            markdown_to_html_node(text)
+
+    def serialize_stage():
+        for tree in trees:
+            html_node_to_html(tree)
+
+    stages = {
+        "markdown_to_blocks": blocks_stage,
+        "block_to_block_type": block_types_stage,
+        "text_to_textnodes": inline_stage,
+        "markdown_to_html_node": html_node_stage,
+        "html_node_to_html": serialize_stage,
+        "generate_page": None,
+    }
+
+    try:
+        from main import generate_page
+    except ImportError as e:
+        # main.py needs python-markdown; the in-house stages still run without it.
+        print(f"Skipping generate_page: {e}", file=sys.stderr)
+        return stages
+
+    content_dir = os.path.join(work_dir, "content")
+    dest_dir = os.path.join(work_dir, "public")
+    template_path = os.path.join(work_dir, "template.html")
+    write_corpus(content_dir, corpus)
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(_TEMPLATE)
+    pages = [
+        (os.path.join(content_dir, name), os.path.join(dest_dir, name[:-len(".md")] + ".html"))
+        for name, _ in corpus
+    ]
+
+    def generate_page_stage():
+        # generate_page reports progress on stdout; keep it out of the table.
+        with contextlib.redirect_stdout(io.StringIO()):
+            for from_path, dest_path in pages:
+                if not generate_page(from_path, template_path, dest_path):
+                    raise RuntimeError(f"generate_page failed for {from_path}")
+
+    stages["generate_page"] = generate_page_stage
+    return stages
+
+
+def run(pages: int, page_size: int, seed: int, repeat: int, kinds: Optional[List[str]] = None) -> Dict:
+    """
+    Benchmarks every stage and returns the JSON-serialisable results.
+
+    Returns:
+        {"meta": {...corpus and machine description...},
+         "stages": {name: {"best": s, "mean": s, "mb_per_s": x, "pages_per_s": y}}}
+    """
+    corpus = generate_corpus(pages, page_size, seed, kinds)
+    total_bytes = sum(len(text.encode("utf-8")) for _, text in corpus)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, func in _stage_functions(corpus, work_dir).items():
+            if func is None:
+                continue
+            timings = time_stage(func, repeat)
+            best = min(timings)
+            results[name] = {
+                "best": best,
+                "mean": statistics.mean(timings),
+                "mb_per_s": total_bytes / 1e6 / best,
+                "pages_per_s": len(corpus) / best,
+            }
+
+    return {
+        "meta": {
+            "pages": len(corpus),
+            "page_size": page_size,
+            "bytes": total_bytes,
+            "seed": seed,
+            "kinds": kinds or list(GENERATORS),
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": results,
+    }
+
+
+def format_results(results: Dict) -> str:
+    meta = results["meta"]
+    lines = [
+        f"{meta['pages']} pages, {meta['bytes'] / 1e6:.2f} MB, best of {meta['repeat']}",
+        f"{'stage':<24} {'best ms':>10} {'mean ms':>10} {'MB/s':>9} {'pages/s':>10}",
+    ]
+    for name, stage in results["stages"].items():
+        lines.append(
+            f"{name:<24} {stage['best'] * 1000:>10.2f} {stage['mean'] * 1000:>10.2f} "
+            f"{stage['mb_per_s']:>9.2f} {stage['pages_per_s']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> Tuple[str, List[str]]:
+    """
+    Compares best times stage by stage.
+
+    Args:
+        results: This run, as returned by run().
+        baseline: An earlier run loaded from JSON.
+        threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10%.
+
+    Returns:
+        The comparison table, and the names of the stages that regressed by more than threshold.
+    """
+    lines = [f"{'stage':<24} {'baseline ms':>12} {'now ms':>10} {'change':>9}"]
+    regressions = []
+    for name, stage in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous is None:
+            lines.append(f"{name:<24} {'-':>12} {stage['best'] * 1000:>10.2f} {'new':>9}")
+            continue
+        change = stage["best"] / previous["best"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(
+            f"{name:<24} {previous['best'] * 1000:>12.2f} {stage['best'] * 1000:>10.2f} {change:>+9.1%}{flag}"
+        )
+    if results["meta"]["bytes"] != baseline.get("meta", {}).get("bytes"):
+        lines.append("warning: the corpus differs from the baseline's; compare like with like")
+    return "\n".join(lines), regressions
+
+
+def main(argv=None):
+    parser = benchmark_parser(__doc__, pages=200)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against results saved with --output")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="with --compare: slowdown counted as a regression (default: 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.page_size, args.seed, args.repeat, args.kinds)
+    print(format_results(results))
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        table, regressions = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.compare}:")
+        print(table)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import enum
-from typing import List
+from itertools import repeat
+from typing import Callable, Dict, List
 
 class BlockType(enum.Enum):
     PARAGRAPH = 1
@@ -9,64 +10,84 @@ class BlockType(enum.Enum):
     UNORDERED_LIST = 5
     ORDERED_LIST = 6
 
-def block_to_block_type(block: str) -> BlockType:
-    """
-    Determines the BlockType of a given markdown block.
+# "1. ", "2. ", ... grown on demand so ordered lists don't format a prefix per line.
+_ordered_prefixes: List[str] = []
 
-    Args:
-        block: A single block of markdown text (leading/trailing whitespace stripped).
+def _ordered_list_prefixes(count: int) -> List[str]:
+    for number in range(len(_ordered_prefixes) + 1, count + 1):
+        _ordered_prefixes.append(f'{number}. ')
+    return _ordered_prefixes
 
-    Returns:
-        The BlockType representing the type of the block.
-    """
+# Line boundaries str.splitlines() recognises besides '\n'.
+_OTHER_LINE_BREAKS = '\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
 
-    lines = block.splitlines()
+def _all_lines_start_with(block: str, prefix: str) -> bool:
+    """Returns True if every line of block (as split by str.splitlines) starts with prefix."""
+    if any(line_break in block for line_break in _OTHER_LINE_BREAKS):
+        return all(map(str.startswith, block.splitlines(), repeat(prefix)))
+    # Only '\n' breaks lines: every line but the first starts right after a
+    # '\n', except a trailing '\n', which splitlines() drops.
+    if not block.startswith(prefix):
+        return False
+    line_breaks = block.count('\n') - block.endswith('\n')
+    return block.count('\n' + prefix) == line_breaks
+
+def _heading_type(block: str) -> BlockType:
+    # 1 to 6 '#' followed by a space.
+    level = len(block) - len(block.lstrip('#'))
+    if level <= 6 and block[level:level + 1] == ' ':
+        return BlockType.HEADING
+    return BlockType.PARAGRAPH
 
-    # Handle empty block
-    if not lines:
+def _code_type(block: str) -> BlockType:
+    # Exactly two ``` (the opener and the closer), and the fences sit on their
+    # own lines unless the whole block is one line.
+    if not block.startswith('```') or not block.endswith('```'):
         return BlockType.PARAGRAPH
+    closer = block.find('```', 3)
+    if closer == -1 or block.find('```', closer + 3) != -1:
+        return BlockType.PARAGRAPH
+    if '\n' not in block or block.startswith('```\n') or block.endswith('\n```'):
+        return BlockType.CODE
+    return BlockType.PARAGRAPH
 
-    # Heading
-    if lines[0].startswith('#'):
-        if lines[0].startswith('###### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('##### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('#### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('## '):
-          return BlockType.HEADING
-        elif lines[0].startswith('# '):
-          return BlockType.HEADING
-        else:
-          return BlockType.PARAGRAPH
+def _quote_type(block: str) -> BlockType:
+    return BlockType.QUOTE if _all_lines_start_with(block, '>') else BlockType.PARAGRAPH
 
-    # Code
-    if block.startswith('```'):
-        if block.endswith('```'):
-            if block.count('```') == 2:
-                if block.count('\n') == 0 or block.startswith('```\n') or block.endswith('\n```'):
-                    return BlockType.CODE
-                else:
-                    return BlockType.PARAGRAPH
-            else:
-                return BlockType.PARAGRAPH
-        else:
-            return BlockType.PARAGRAPH
+def _unordered_list_type(block: str) -> BlockType:
+    return BlockType.UNORDERED_LIST if _all_lines_start_with(block, '- ') else BlockType.PARAGRAPH
 
-    # Quote
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
+def _ordered_list_type(block: str) -> BlockType:
+    lines = block.splitlines()
+    if all(map(str.startswith, lines, _ordered_list_prefixes(len(lines)))):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
 
-    # Unordered list
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
+# Only one block type can start with each of these characters, so the first
+# character picks the single check that has to run.
+_CLASSIFIERS: Dict[str, Callable[[str], BlockType]] = {
+    '#': _heading_type,
+    '`': _code_type,
+    '>': _quote_type,
+    '-': _unordered_list_type,
+    '1': _ordered_list_type,
+}
 
-    # Ordered list
-    if all(line.startswith(f'{i+1}. ') for i, line in enumerate(lines)):
-        return BlockType.ORDERED_LIST
+def block_to_block_type(block: str) -> BlockType:
+    """
+    Determines the BlockType of a given markdown block.
+
+    The first character selects the one check that can apply (headings,
+    code, quotes, unordered or ordered lists); any other block is a
+    paragraph.
+
+    Args:
+        block: A single block of markdown text (leading/trailing whitespace stripped).
 
-    # Paragraph
-    return BlockType.PARAGRAPH
\ No newline at end of file
+    Returns:
+        The BlockType representing the type of the block.
+    """
+    classifier = _CLASSIFIERS.get(block[:1])
+    if classifier is None:
+        return BlockType.PARAGRAPH
+    return classifier(block)
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Iterator, Optional
+
+# Bump when the layout of the manifest or the way outputs are produced from
+# their inputs changes; an old manifest is then ignored and everything rebuilds.
+MANIFEST_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Section of outputs generated from the whole site rather than one input
+# (sitemaps, feeds), keyed by output path, with a digest of their inputs.
+GENERATED_SECTION = "generated"
+
+
+def _write_json(path: str, data, prefix: str):
+    """Writes data as JSON atomically, so an interrupted build can't leave a truncated file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_digest(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        The hex digest string.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: str, previous: Optional[Dict] = None) -> Dict:
+    """
+    Fingerprints a file as its size, mtime and content hash.
+
+    If the size and mtime match the previous fingerprint, its hash is reused
+    without reading the file, so unchanged inputs cost one stat() each.
+
+    Args:
+        path: The file to fingerprint.
+        previous: The fingerprint recorded by the last build, if any.
+
+    Returns:
+        A dict with "size", "mtime_ns" and "hash" keys.
+    """
+    stat = os.stat(path)
+    if (previous
+            and previous.get("size") == stat.st_size
+            and previous.get("mtime_ns") == stat.st_mtime_ns
+            and previous.get("hash")):
+        content_hash = previous["hash"]
+    else:
+        content_hash = file_digest(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+
+
+class ManifestTable:
+    """
+    Bulky per-page data (search terms, links) kept in its own JSON file beside the manifest.
+
+    The manifest is rewritten on every build and every watch rebuild, so
+    it holds only small entries; a table is read the first time it is used
+    and rewritten by BuildManifest.save() only if it changed. Each entry
+    records the hash of the input it was made from, and is stale unless
+    that matches the hash in the manifest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict]] = None
+        self.changed = False
+
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            if (isinstance(data, dict) and data.get("version") == MANIFEST_VERSION
+                    and isinstance(data.get("entries"), dict)):
+                self._entries = data["entries"]
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def set(self, key: str, entry: Dict):
+        self.entries[key] = entry
+        self.changed = True
+
+    def pop(self, key: str) -> Optional[Dict]:
+        entry = self.entries.pop(key, None)
+        self.changed = self.changed or entry is not None
+        return entry
+
+    def keys(self) -> Iterator[str]:
+        return iter(list(self.entries))
+
+    def clear(self):
+        if self.entries:
+            self._entries = {}
+            self.changed = True
+
+    def save(self):
+        if self.changed:
+            _write_json(self.path, {"version": MANIFEST_VERSION, "entries": self._entries}, ".table-")
+            self.changed = False
+
+
+class BuildManifest:
+    """
+    On-disk record of the inputs each output was last built from.
+
+    Entries are grouped in named sections (e.g. "pages", "static") and keyed
+    by source path relative to its root. Each entry is a fingerprint from
+    fingerprint_file, optionally with the "output" path it produced. Larger
+    per-page data lives in tables (see table()) next to the manifest file.
+    """
+
+    def __init__(self, path: str, sections: Optional[Dict[str, Dict[str, Dict]]] = None):
+        self.path = path
+        self.sections = sections if sections is not None else {}
+        self._tables: Dict[str, ManifestTable] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """
+        Loads a manifest, returning an empty one if it is missing, unreadable
+        or was written by a different MANIFEST_VERSION.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        sections = data.get("sections")
+        if not isinstance(sections, dict):
+            return cls(path)
+        return cls(path, sections)
+
+    def save(self):
+        """Writes the manifest, and the tables that changed, atomically so an interrupted build can't corrupt them."""
+        for table in self._tables.values():
+            table.save()
+        _write_json(self.path, {"version": MANIFEST_VERSION, "sections": self.sections}, ".manifest-")
+
+    def table(self, name: str) -> ManifestTable:
+        """The named table, stored as <name>.json in the manifest's directory."""
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = ManifestTable(
+                os.path.join(os.path.dirname(self.path), f"{name}.json"))
+        return table
+
+    def get(self, section: str, key: str) -> Optional[Dict]:
+        return self.sections.get(section, {}).get(key)
+
+    def set(self, section: str, key: str, entry: Dict):
+        self.sections.setdefault(section, {})[key] = entry
+
+    def pop(self, section: str, key: str) -> Optional[Dict]:
+        return self.sections.get(section, {}).pop(key, None)
+
+    def keys(self, section: str) -> Iterator[str]:
+        return iter(list(self.sections.get(section, {})))
+
+    def clear(self, section: str):
+        self.sections.pop(section, None)
+
+
+def remove_output(path: str, root: str):
+    """
+    Deletes a generated file and any directories it leaves empty, up to root.
+
+    Args:
+        path: The output file to delete. Missing files are ignored.
+        root: The output root, which is never removed.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+    root = os.path.abspath(root)
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def write_generated(manifest: BuildManifest, dest_dir: str, name: str, digest: str,
+                    write: Callable[[str], None]) -> bool:
+    """
+    Writes a generated output (a sitemap shard, a feed) unless it is already current.
+
+    The digest stands for everything the output is made from; if the
+    manifest recorded the same digest for name and the file still exists,
+    write is not called.
+
+    Args:
+        manifest: The build manifest, updated in place.
+        dest_dir: The output root.
+        name: The output's path relative to dest_dir, with forward slashes.
+        digest: A digest of the output's inputs.
+        write: Called with the output path to (re)write the file.
+
+    Returns:
+        True if the file was written, False if it was reused.
+    """
+    path = os.path.join(dest_dir, *name.split("/"))
+    previous = manifest.get(GENERATED_SECTION, name)
+    if previous and previous.get("hash") == digest and os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write(path)
+    manifest.set(GENERATED_SECTION, name, {"hash": digest})
+    return True
+
+
+def remove_generated(manifest: BuildManifest, dest_dir: str, name: str):
+    """Deletes a generated output that is no longer produced and forgets it."""
+    manifest.pop(GENERATED_SECTION, name)
+    remove_output(os.path.join(dest_dir, *name.split("/")), dest_dir)
@@ -0,0 +1,211 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+# Pipeline stage names, in pipeline order; reports list stages in this order.
+STAGES = (
+    "static copy",
+    "file read",
+    "markdown render",
+    "markdown_to_blocks",
+    "block typing",
+    "inline parsing",
+    "html serialization",
+    "image attributes",
+    "template fill",
+    "asset rewrite",
+    "write",
+)
+
+
+class BuildProfiler:
+    """
+    Records wall time, CPU time and peak traced memory of pipeline stages.
+
+    Each stage() block produces one record dict with the stage name, the page
+    it belongs to (None for site-wide stages), the stage it is nested in
+    (None at the top level), its start time and its measurements. Records
+    made in worker processes are returned to the parent with drain() and
+    merged with add_records().
+    """
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.records: List[Dict] = []
+        # The stages currently open, outermost first: [name, highest traced peak seen before a nested reset].
+        self._open: List[List] = []
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, page: Optional[str] = None):
+        parent = self._open[-1] if self._open else None
+        frame = [name, 0]
+        start_bytes = 0
+        if self.track_memory:
+            start_bytes, peak_so_far = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # reset_peak() would lose the enclosing stage's peak so far; keep it for when that stage ends.
+                parent[1] = max(parent[1], peak_so_far)
+            tracemalloc.reset_peak()
+        self._open.append(frame)
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = (time.perf_counter_ns() - start_ns) / 1e9
+            cpu = time.process_time() - start_cpu
+            self._open.pop()
+            # Peak allocated above what was live when the stage started.
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1]) - start_bytes if self.track_memory else 0
+            self.records.append({
+                "stage": name,
+                "page": page,
+                "parent": parent[0] if parent is not None else None,
+                "start_ns": start_ns,
+                "wall": wall,
+                "cpu": cpu,
+                "peak_bytes": peak,
+                "pid": os.getpid(),
+            })
+
+    def drain(self) -> List[Dict]:
+        """Returns and forgets the records made so far."""
+        records, self.records = self.records, []
+        return records
+
+    def add_records(self, records: List[Dict]):
+        self.records.extend(records)
+
+    def stage_totals(self) -> Dict[str, Dict]:
+        """
+        Aggregates records per stage: count, total wall/CPU seconds, max peak
+        bytes and the stage it is nested in, whose totals already include it.
+        """
+        totals: Dict[str, Dict] = {}
+        for record in self.records:
+            total = totals.setdefault(record["stage"], {
+                "count": 0, "wall": 0.0, "cpu": 0.0, "peak_bytes": 0, "parent": record.get("parent"),
+            })
+            total["count"] += 1
+            total["wall"] += record["wall"]
+            total["cpu"] += record["cpu"]
+            total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+        order = {name: index for index, name in enumerate(STAGES)}
+        return dict(sorted(totals.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+    def page_totals(self) -> Dict[str, Dict]:
+        """
+        Aggregates records per page: total wall/CPU seconds (of its top-level
+        stages, so nested ones aren't counted twice), max peak bytes and wall
+        seconds per stage.
+        """
+        pages: Dict[str, Dict] = {}
+        for record in self.records:
+            if record["page"] is None:
+                continue
+            page = pages.setdefault(record["page"], {"wall": 0.0, "cpu": 0.0, "peak_bytes": 0, "stages": {}})
+            if record.get("parent") is None:
+                page["wall"] += record["wall"]
+                page["cpu"] += record["cpu"]
+            page["peak_bytes"] = max(page["peak_bytes"], record["peak_bytes"])
+            page["stages"][record["stage"]] = page["stages"].get(record["stage"], 0.0) + record["wall"]
+        return pages
+
+    def report(self, wall_time: Optional[float] = None) -> Dict:
+        """Returns the JSON-serialisable report: per-stage and per-page aggregates."""
+        return {
+            "wall_time": wall_time,
+            "stages": self.stage_totals(),
+            "pages": self.page_totals(),
+        }
+
+    def write_report(self, path: str, wall_time: Optional[float] = None):
+        _ensure_parent(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(wall_time), f, indent=2, sort_keys=True)
+
+    def format_stage_table(self) -> str:
+        lines = [f"{'stage':<20} {'count':>7} {'wall s':>9} {'cpu s':>9} {'peak KiB':>10}"]
+        for name, total in self.stage_totals().items():
+            # Nested stages are indented under the stage whose time includes theirs.
+            label = f"  {name}" if total["parent"] is not None else name
+            lines.append(
+                f"{label:<20} {total['count']:>7} {total['wall']:>9.3f} {total['cpu']:>9.3f} "
+                f"{total['peak_bytes'] / 1024:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def format_slowest_pages(self, top: int = 10) -> str:
+        """Returns a table of the top slowest pages by total wall time, with their slowest stage."""
+        pages = sorted(self.page_totals().items(), key=lambda item: item[1]["wall"], reverse=True)[:top]
+        lines = [f"{'wall ms':>9} {'cpu ms':>9} {'slowest stage':<20} page"]
+        for page, total in pages:
+            slowest = max(total["stages"].items(), key=lambda item: item[1])[0] if total["stages"] else ""
+            lines.append(f"{total['wall'] * 1000:>9.2f} {total['cpu'] * 1000:>9.2f} {slowest:<20} {page}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str):
+        """Writes the records as Chrome trace events, viewable in chrome://tracing or Perfetto."""
+        events = [
+            {
+                "name": record["stage"],
+                "cat": "build",
+                "ph": "X",
+                "ts": record["start_ns"] / 1000,
+                "dur": record["wall"] * 1e6,
+                "pid": record["pid"],
+                "tid": record["pid"],
+                "args": {"page": record["page"], "cpu_s": record["cpu"], "peak_bytes": record["peak_bytes"]},
+            }
+            for record in self.records
+        ]
+        _ensure_parent(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def _ensure_parent(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+_active_profiler: Optional[BuildProfiler] = None
+_NO_STAGE = nullcontext()
+
+
+def enable_profiling(track_memory: bool = True) -> BuildProfiler:
+    """Starts recording stages in this process and returns the profiler."""
+    global _active_profiler
+    _active_profiler = BuildProfiler(track_memory)
+    return _active_profiler
+
+
+def disable_profiling():
+    global _active_profiler
+    if _active_profiler is not None and _active_profiler.track_memory:
+        tracemalloc.stop()
+    _active_profiler = None
+
+
+def get_profiler() -> Optional[BuildProfiler]:
+    return _active_profiler
+
+
+def profile_stage(name: str, page: Optional[str] = None):
+    """Context manager timing a stage if profiling is enabled in this process, else a no-op."""
+    if _active_profiler is None:
+        return _NO_STAGE
+    return _active_profiler.stage(name, page)
+
+
+def drain_records() -> List[Dict]:
+    """Returns and forgets this process's records ([] when profiling is off)."""
+    if _active_profiler is None:
+        return []
+    return _active_profiler.drain()
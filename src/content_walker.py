@@ -0,0 +1,67 @@
+import os
+from typing import Iterator, List, Tuple
+
+MARKDOWN_EXTENSION = ".md"
+HTML_EXTENSION = ".html"
+
+
+def content_path_to_dest(source_path: str, content_dir: str, dest_dir: str) -> str:
+    """
+    Maps a markdown file under content_dir to its HTML path under dest_dir.
+
+    content/blog/tom/index.md becomes public/blog/tom/index.html.
+
+    Args:
+        source_path: Path to a markdown file inside content_dir.
+        content_dir: Root of the content tree.
+        dest_dir: Root of the output tree.
+
+    Returns:
+        The destination path of the generated HTML page.
+    """
+    relative_path = os.path.relpath(source_path, content_dir)
+    stem, _ = os.path.splitext(relative_path)
+    return os.path.join(dest_dir, stem + HTML_EXTENSION)
+
+
+def iter_markdown_files(content_dir: str) -> Iterator[str]:
+    """
+    Recursively yields every markdown file under content_dir.
+
+    Directories and files are visited in sorted order so the page list (and
+    anything derived from it) is the same on every run and every platform.
+
+    Args:
+        content_dir: Root of the content tree.
+
+    Yields:
+        Paths of the markdown files, rooted at content_dir.
+    """
+    with os.scandir(content_dir) as entries:
+        sorted_entries = sorted(entries, key=lambda entry: entry.name)
+
+    for entry in sorted_entries:
+        if entry.is_dir():
+            yield from iter_markdown_files(entry.path)
+        elif entry.is_file() and entry.name.endswith(MARKDOWN_EXTENSION):
+            yield entry.path
+
+
+def find_content_pages(content_dir: str, dest_dir: str) -> List[Tuple[str, str]]:
+    """
+    Lists every page to generate as (markdown path, html path) pairs.
+
+    Args:
+        content_dir: Root of the content tree.
+        dest_dir: Root of the output tree.
+
+    Returns:
+        A list of (source_path, dest_path) tuples in sorted source order.
+    """
+    if not os.path.isdir(content_dir):
+        raise ValueError(f"Content directory not found: {content_dir}")
+
+    return [
+        (source_path, content_path_to_dest(source_path, content_dir, dest_dir))
+        for source_path in iter_markdown_files(content_dir)
+    ]
@@ -1,17 +1,181 @@
 import os
 import shutil
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-def copy_recursive(source_dir_path: str, dest_dir_path: str):
+try:
+    import fcntl
+except ImportError:  # Not available on Windows.
+    fcntl = None
+
+# ioctl request that makes the destination share the source's extents
+# (reflink / copy-on-write clone) on btrfs, XFS, bcachefs, overlayfs, ...
+FICLONE = 0x40049409
+
+SYNC_MODES = ("copy", "link")
+
+# Sync actions reported by sync_file.
+SKIPPED = "skipped"
+LINKED = "linked"
+CLONED = "cloned"
+COPIED = "copied"
+
+
+def _clone_file(source_path: str, dest_path: str) -> bool:
+    """Clones source into dest with FICLONE; returns False if the filesystem can't."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def _copy_file_range(source_path: str, dest_path: str) -> bool:
+    """Copies with os.copy_file_range (in-kernel, no user-space buffers); returns False if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            return False
+    return remaining == 0
+
+
+def _copy_contents(source_path: str, dest_path: str) -> str:
+    """Copies file contents, preferring a reflink clone, then copy_file_range, then a plain copy."""
+    if _clone_file(source_path, dest_path):
+        return CLONED
+    if not _copy_file_range(source_path, dest_path):
+        shutil.copyfile(source_path, dest_path)
+    return COPIED
+
+
+def is_up_to_date(source_path: str, dest_path: str) -> bool:
+    """Returns True if dest exists with the same size and mtime as source (or is the same file)."""
+    try:
+        source_stat = os.stat(source_path)
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if (source_stat.st_ino, source_stat.st_dev) == (dest_stat.st_ino, dest_stat.st_dev):
+        return True
+    return source_stat.st_size == dest_stat.st_size and source_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def sync_file(source_path: str, dest_path: str, mode: str = "copy", force: bool = False) -> str:
+    """
+    Brings dest_path up to date with source_path.
+
+    Files whose size and mtime already match are skipped. In "link" mode the
+    destination is a hard link to the source (falling back to a copy across
+    filesystems). In "copy" mode the contents are cloned with FICLONE where
+    the filesystem supports it, otherwise copied with copy_file_range or
+    shutil.copyfile; the source mtime is preserved so the next sync can skip.
+    The destination is replaced atomically.
+
+    Args:
+        source_path: The file to copy.
+        dest_path: Where to put it. Parent directories are created.
+        mode: "copy" or "link".
+        force: Copy even if size and mtime match.
+
+    Returns:
+        The action taken: SKIPPED, LINKED, CLONED or COPIED.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode: {mode}")
+    if not force and is_up_to_date(source_path, dest_path):
+        return SKIPPED
+
+    dest_dir = os.path.dirname(dest_path) or "."
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".sync-", dir=dest_dir)
+    os.close(fd)
+    try:
+        action = None
+        if mode == "link":
+            os.remove(tmp_path)
+            try:
+                os.link(source_path, tmp_path)
+                action = LINKED
+            except OSError:
+                # Different filesystem or links not permitted: copy instead.
+                pass
+        if action is None:
+            action = _copy_contents(source_path, tmp_path)
+            shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return action
+
+
+def _iter_relative_files(source_dir_path: str):
+    for dir_path, dir_names, file_names in os.walk(source_dir_path):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            source_path = os.path.join(dir_path, file_name)
+            yield os.path.relpath(source_path, source_dir_path)
+
+
+def sync_tree(source_dir_path: str, dest_dir_path: str, mode: str = "copy", workers: int = None) -> Counter:
+    """
+    Syncs every file under source_dir_path into dest_dir_path on a thread pool.
+
+    Unchanged files (same size and mtime) are skipped; see sync_file for how
+    the rest are linked, cloned or copied.
+
+    Args:
+        source_dir_path: The directory to copy from.
+        dest_dir_path: The directory to copy into.
+        mode: "copy" or "link".
+        workers: Thread count, defaults to ThreadPoolExecutor's default.
+
+    Returns:
+        A Counter of actions taken (SKIPPED, LINKED, CLONED, COPIED).
+    """
+    relative_paths = list(_iter_relative_files(source_dir_path))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        actions = executor.map(
+            lambda relative_path: sync_file(
+                os.path.join(source_dir_path, relative_path),
+                os.path.join(dest_dir_path, relative_path),
+                mode,
+            ),
+            relative_paths,
+        )
+        return Counter(actions)
+
+
+def copy_recursive(source_dir_path: str, dest_dir_path: str, mode: str = "copy"):
     """
     Recursively copies files and directories from source_dir_path to dest_dir_path.
 
     Assumes dest_dir_path exists (or will be created for subdirectories).
     The initial clearing of the top-level destination should happen *before*
-    calling this function for the first time.
+    calling this function for the first time. Files already up to date in
+    the destination are skipped (see sync_tree).
 
     Args:
         source_dir_path: The path to the source directory.
         dest_dir_path: The path to the destination directory.
+        mode: "copy" or "link".
+
+    Returns:
+        A Counter of actions taken, as returned by sync_tree.
     """
     if not os.path.exists(source_dir_path):
         raise ValueError(f"Source directory not found: {source_dir_path}")
@@ -20,27 +184,10 @@ def copy_recursive(source_dir_path: str, dest_dir_path: str):
     if not os.path.exists(dest_dir_path):
         raise ValueError(f"Destination directory must exist before copying contents into it: {dest_dir_path}")
 
-
-    print(f"Processing contents of: {source_dir_path}")
-
-    for item_name in os.listdir(source_dir_path):
-        source_item_path = os.path.join(source_dir_path, item_name)
-        dest_item_path = os.path.join(dest_dir_path, item_name)
-
-        if os.path.isfile(source_item_path):
-            # If it's a file, copy it
-            print(f"  Copying file: {source_item_path} -> {dest_item_path}")
-            shutil.copy(source_item_path, dest_item_path)
-        elif os.path.isdir(source_item_path):
-            # If it's a directory, create the corresponding directory
-            # in the destination and then recurse into it
-            print(f"  Creating directory and entering: {dest_item_path}")
-            # Create destination subdirectory (exist_ok=True handles potential race conditions)
-            os.makedirs(dest_item_path, exist_ok=True)
-            # Recursively call the function for the subdirectory
-            copy_recursive(source_item_path, dest_item_path)
-        else:
-            print(f"  Skipping item (not file or dir): {source_item_path}")
+    print(f"Syncing contents of: {source_dir_path}")
+    actions = sync_tree(source_dir_path, dest_dir_path, mode)
+    print("  " + ", ".join(f"{count} {action}" for action, count in sorted(actions.items())))
+    return actions
 
 # --- Main execution part ---
 if __name__ == "__main__":
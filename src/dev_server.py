@@ -0,0 +1,195 @@
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+LIVE_RELOAD_PATH = "/__livereload"
+
+# Injected into every HTML page the dev server sends; reloads the page when
+# the server announces a rebuild. EventSource reconnects on its own if the
+# server restarts.
+LIVE_RELOAD_SNIPPET = (
+    "<script>"
+    f'new EventSource("{LIVE_RELOAD_PATH}")'
+    '.addEventListener("reload", function () { location.reload(); });'
+    "</script>"
+).encode("utf-8")
+
+# Idle SSE connections get a comment line this often, so dead clients are
+# noticed and proxies don't time the stream out.
+_KEEPALIVE_SECONDS = 15
+
+
+def inject_live_reload(html: bytes) -> bytes:
+    """Inserts the live-reload script before the last </body>, or appends it if there is none."""
+    index = html.lower().rfind(b"</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SNIPPET
+    return html[:index] + LIVE_RELOAD_SNIPPET + html[index:]
+
+
+class ReloadBroadcaster:
+    """Version counter that live-reload connections wait on; notify() bumps it."""
+
+    def __init__(self):
+        self.version = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def close(self):
+        """Wakes every waiter without announcing a reload."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def wait(self, seen_version: int, timeout: Optional[float] = None) -> int:
+        """
+        Blocks until the version differs from seen_version, the broadcaster is
+        closed or timeout expires; returns the current version.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != seen_version or self.closed, timeout=timeout)
+            return self.version
+
+
+class FileWatcher:
+    """
+    Polls directory trees and single files for changes.
+
+    Each poll stats every watched file and compares (mtime, size) with the
+    previous poll. It needs no platform-specific notification API.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._scan_dir(path, snapshot)
+            else:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _scan_dir(self, directory: str, snapshot: Dict[str, Tuple[int, int]]):
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        self._scan_dir(entry.path, snapshot)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    # Deleted between listing and stat; the next poll sees it gone.
+                    continue
+
+    def poll(self) -> Set[str]:
+        """Returns the paths added, modified or removed since the previous poll."""
+        current = self._scan()
+        previous = self._snapshot
+        self._snapshot = current
+        changed = {path for path, signature in current.items() if previous.get(path) != signature}
+        changed.update(path for path in previous if path not in current)
+        return changed
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory, adds the live-reload script to HTML and hosts the SSE endpoint."""
+
+    def do_GET(self):
+        request_path = urlsplit(self.path).path
+        if request_path == LIVE_RELOAD_PATH:
+            self._stream_reload_events()
+            return
+
+        file_path = self.translate_path(self.path)
+        if os.path.isdir(file_path) and request_path.endswith("/"):
+            file_path = os.path.join(file_path, "index.html")
+        if file_path.endswith(".html") and os.path.isfile(file_path):
+            self._send_html(file_path)
+            return
+        super().do_GET()
+
+    def _send_html(self, file_path: str):
+        try:
+            with open(file_path, "rb") as f:
+                body = inject_live_reload(f.read())
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reload_events(self):
+        broadcaster = self.server.broadcaster
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = broadcaster.version
+        try:
+            while not broadcaster.closed:
+                latest = broadcaster.wait(version, timeout=_KEEPALIVE_SECONDS)
+                if broadcaster.closed:
+                    break
+                if latest != version:
+                    version = latest
+                    self.wfile.write(f"event: reload\ndata: {version}\n\n".encode("utf-8"))
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if not self.server.quiet and LIVE_RELOAD_PATH not in self.path:
+            super().log_message(format, *args)
+
+
+class DevServer(ThreadingHTTPServer):
+    """HTTP server for the generated site with live reload; quiet turns off the request log."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], directory: str, quiet: bool = False):
+        self.directory = directory
+        self.quiet = quiet
+        self.broadcaster = ReloadBroadcaster()
+        super().__init__(address, self._make_handler)
+
+    def _make_handler(self, request, client_address, server):
+        return DevRequestHandler(request, client_address, server, directory=self.directory)
+
+    def start(self) -> threading.Thread:
+        """Serves requests on a background thread and returns it."""
+        thread = threading.Thread(target=self.serve_forever, name="dev-server", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        # Wake SSE connections so their threads can exit.
+        self.broadcaster.close()
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,108 @@
+import datetime
+import hashlib
+from email.utils import format_datetime
+from typing import Dict, List, TextIO
+
+from build_manifest import GENERATED_SECTION, BuildManifest, remove_generated, write_generated
+from html_escape import escape_attribute
+from metadata_index import MetadataIndex, PageMetadata, page_datetime
+from sitemap import absolute_url
+
+RSS_FILE = "rss.xml"
+ATOM_FILE = "atom.xml"
+DEFAULT_FEED_LIMIT = 20
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def feed_pages(index: MetadataIndex, limit: int = DEFAULT_FEED_LIMIT) -> List[PageMetadata]:
+    """The newest limit published pages that have a valid date."""
+    dated = [page for page in index.published() if page_datetime(page) is not None]
+    dated.sort(key=page_datetime, reverse=True)
+    return dated[:limit]
+
+
+def write_rss(stream: TextIO, pages: List[PageMetadata], title: str, base_url: str):
+    """Streams an RSS 2.0 feed of pages, one <item> at a time."""
+    site_url = absolute_url(base_url, "/")
+    stream.write(_XML_DECLARATION)
+    stream.write('<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n')
+    stream.write(f"<title>{escape_attribute(title)}</title>\n<link>{escape_attribute(site_url)}</link>\n")
+    stream.write(f"<description>{escape_attribute(title)}</description>\n")
+    stream.write(f'<atom:link href="{escape_attribute(absolute_url(base_url, "/" + RSS_FILE))}" rel="self" '
+                 'type="application/rss+xml"/>\n')
+    if pages:
+        stream.write(f"<lastBuildDate>{format_datetime(page_datetime(pages[0]))}</lastBuildDate>\n")
+    for page in pages:
+        url = escape_attribute(absolute_url(base_url, page.url))
+        stream.write(f"<item><title>{escape_attribute(page.title)}</title><link>{url}</link>"
+                     f'<guid isPermaLink="true">{url}</guid>'
+                     f"<pubDate>{format_datetime(page_datetime(page))}</pubDate>")
+        for tag in page.tags:
+            stream.write(f"<category>{escape_attribute(tag)}</category>")
+        stream.write("</item>\n")
+    stream.write("</channel>\n</rss>\n")
+
+
+def _rfc3339(value: datetime.datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def write_atom(stream: TextIO, pages: List[PageMetadata], title: str, base_url: str):
+    """Streams an Atom feed of pages, one <entry> at a time."""
+    site_url = escape_attribute(absolute_url(base_url, "/"))
+    updated = page_datetime(pages[0]) if pages else datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    stream.write(_XML_DECLARATION)
+    stream.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+    stream.write(f"<title>{escape_attribute(title)}</title>\n<id>{site_url}</id>\n<link href=\"{site_url}\"/>\n")
+    stream.write(f'<link rel="self" href="{escape_attribute(absolute_url(base_url, "/" + ATOM_FILE))}"/>\n')
+    stream.write(f"<updated>{_rfc3339(updated)}</updated>\n<author><name>{escape_attribute(title)}</name></author>\n")
+    for page in pages:
+        url = escape_attribute(absolute_url(base_url, page.url))
+        stream.write(f'<entry><title>{escape_attribute(page.title)}</title><id>{url}</id><link href="{url}"/>'
+                     f"<updated>{_rfc3339(page_datetime(page))}</updated>")
+        for tag in page.tags:
+            stream.write(f'<category term="{escape_attribute(tag)}"/>')
+        stream.write("</entry>\n")
+    stream.write("</feed>\n")
+
+
+def site_title(index: MetadataIndex) -> str:
+    """The title of the site's home page, used as the feeds' title."""
+    for page in index:
+        if page.url == "/":
+            return page.title
+    return "Site"
+
+
+def write_feeds(index: MetadataIndex, dest_dir: str, base_url: str, manifest: BuildManifest,
+                title: str = None, limit: int = DEFAULT_FEED_LIMIT) -> Dict[str, int]:
+    """
+    Writes rss.xml and atom.xml for the newest dated pages of index.
+
+    Built from the metadata index alone; each feed is rewritten only when
+    its pages' metadata changed since the last build.
+
+    Returns:
+        dict: Counts of "entries", "written" and "reused" files.
+    """
+    pages = feed_pages(index, limit)
+    title = title or site_title(index)
+    digest = hashlib.sha256(repr((title, base_url, pages)).encode("utf-8")).hexdigest()
+    written = reused = 0
+    for name, write in ((RSS_FILE, write_rss), (ATOM_FILE, write_atom)):
+        def write_feed(path, write=write):
+            with open(path, "w", encoding="utf-8") as f:
+                write(f, pages, title, base_url)
+        if write_generated(manifest, dest_dir, name, digest, write_feed):
+            written += 1
+        else:
+            reused += 1
+    return {"entries": len(pages), "written": written, "reused": reused}
+
+
+def remove_feeds(manifest: BuildManifest, dest_dir: str):
+    """Deletes the feeds written by an earlier build, for a build without a base URL."""
+    for name in (RSS_FILE, ATOM_FILE):
+        if manifest.get(GENERATED_SECTION, name) is not None:
+            remove_generated(manifest, dest_dir, name)
@@ -0,0 +1,207 @@
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+YAML_DELIMITER = "---"
+TOML_DELIMITER = "+++"
+# A YAML document may also be closed by "...".
+_CLOSING_DELIMITERS = {YAML_DELIMITER: (YAML_DELIMITER, "..."), TOML_DELIMITER: (TOML_DELIMITER,)}
+
+
+class FrontMatterError(ValueError):
+    """Raised for front matter that is malformed or not a mapping."""
+
+
+class _NotAMapping(FrontMatterError):
+    """The delimited block isn't a mapping, so it is no front matter but a '---' rule and body text."""
+
+
+# --- Minimal YAML, used when PyYAML isn't installed ---
+
+_YAML_KEY_RE = re.compile(r"^([A-Za-z_][\w-]*)\s*:(?:\s+(.*))?$")
+_YAML_INT_RE = re.compile(r"^[-+]?\d+$")
+
+
+def _yaml_scalar(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        return [_yaml_scalar(item) for item in text[1:-1].split(",") if item.strip()]
+    lowered = text.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    if lowered in ("", "~", "null"):
+        return None
+    if _YAML_INT_RE.match(text):
+        return int(text)
+    return text
+
+
+def _parse_simple_yaml(source: str) -> Dict:
+    """
+    Parses the subset of YAML front matter is usually written in: one
+    "key: value" per line, with quoted or plain scalars, booleans, integers,
+    [inline, lists] and "- item" lists under an empty key. Dates stay strings.
+    """
+    metadata = {}
+    list_key = None
+    for line_number, line in enumerate(source.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if list_key is not None and stripped.startswith("- "):
+            metadata[list_key].append(_yaml_scalar(stripped[2:]))
+            continue
+        match = _YAML_KEY_RE.match(line)
+        if match is None and not metadata:
+            raise _NotAMapping("front matter must be a mapping of keys to values")
+        if match is None:
+            raise FrontMatterError(f"unsupported front matter on line {line_number}: {line!r} (install PyYAML)")
+        key, value = match.groups()
+        if value is None or not value.strip():
+            metadata[key] = []
+            list_key = key
+        else:
+            metadata[key] = _yaml_scalar(value)
+            list_key = None
+    # An empty key not followed by "- item" lines has no value.
+    return {key: (None if value == [] else value) for key, value in metadata.items()}
+
+
+def parse_front_matter(source: str, delimiter: str) -> Dict:
+    """
+    Parses the text between the front matter delimiters.
+
+    Args:
+        source: The front matter, without its delimiter lines.
+        delimiter: YAML_DELIMITER or TOML_DELIMITER.
+
+    Returns:
+        The metadata mapping ({} for empty front matter).
+
+    Raises:
+        FrontMatterError: If the front matter can't be parsed or isn't a mapping.
+    """
+    if delimiter == TOML_DELIMITER:
+        if tomllib is None:
+            raise FrontMatterError("TOML front matter needs Python 3.11 or the tomli package")
+        try:
+            return tomllib.loads(source)
+        except tomllib.TOMLDecodeError as e:
+            raise FrontMatterError(f"invalid TOML front matter: {e}") from e
+
+    if yaml is None:
+        return _parse_simple_yaml(source)
+    try:
+        metadata = yaml.safe_load(source)
+    except yaml.YAMLError as e:
+        raise FrontMatterError(f"invalid YAML front matter: {e}") from e
+    if metadata is None:
+        return {}
+    if not isinstance(metadata, dict):
+        raise _NotAMapping("front matter must be a mapping of keys to values")
+    return metadata
+
+
+def _opening_delimiter(line: str) -> Optional[str]:
+    stripped = line.rstrip()
+    return stripped if stripped in _CLOSING_DELIMITERS else None
+
+
+def read_front_matter(lines: Iterable[str]) -> Tuple[Dict, Iterator[str]]:
+    """
+    Reads front matter from the start of a stream of lines, and no further.
+
+    Stops at the closing delimiter, so the header of a file can be read
+    without reading its body. A document that opens with '---' but never
+    closes it, or whose delimited block isn't a mapping, starts with a
+    thematic break rather than front matter; it is returned whole as body.
+
+        with open(path, encoding="utf-8") as f:
+            metadata, body_lines = read_front_matter(f)
+
+    Args:
+        lines: The document's lines, with or without line endings.
+
+    Returns:
+        tuple[dict, Iterator[str]]: The metadata ({} if the document has no
+        front matter) and an iterator over the remaining lines of the body.
+
+    Raises:
+        FrontMatterError: If the front matter is invalid.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, lines
+    delimiter = _opening_delimiter(first)
+    if delimiter is None:
+        return {}, _prepend(first, lines)
+
+    closing = _CLOSING_DELIMITERS[delimiter]
+    header = [first]
+    for line in lines:
+        header.append(line)
+        if line.rstrip() in closing:
+            try:
+                metadata = parse_front_matter("\n".join(text.rstrip("\r\n") for text in header[1:-1]), delimiter)
+            except _NotAMapping:
+                break
+            return metadata, lines
+    return {}, itertools.chain(header, lines)
+
+
+def _prepend(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def split_front_matter(text: str) -> Tuple[Dict, str]:
+    """
+    Splits a markdown document into its front matter and its body.
+
+    Like read_front_matter, an unclosed or non-mapping block is body text.
+
+    Returns:
+        tuple[dict, str]: The metadata ({} if there is none) and the markdown
+        after the closing delimiter (the whole text if there is none).
+
+    Raises:
+        FrontMatterError: If the front matter is invalid.
+    """
+    if not text.startswith((YAML_DELIMITER, TOML_DELIMITER)):
+        return {}, text
+    first_end = text.find("\n")
+    if first_end == -1 or _opening_delimiter(text[:first_end]) is None:
+        return {}, text
+    delimiter = text[:first_end].rstrip()
+
+    position = first_end + 1
+    while position <= len(text):
+        line_end = text.find("\n", position)
+        if line_end == -1:
+            line_end = len(text)
+        if text[position:line_end].rstrip() in _CLOSING_DELIMITERS[delimiter]:
+            try:
+                metadata = parse_front_matter(text[first_end + 1:position], delimiter)
+            except _NotAMapping:
+                break
+            return metadata, text[line_end + 1:]
+        position = line_end + 1
+    return {}, text
@@ -0,0 +1,185 @@
+import re
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+from typing import Dict, Optional, Tuple
+
+from markdown.extensions import codehilite
+
+from render_cache import fragment_key, get_render_cache
+
+HIGHLIGHT_CACHE = "highlight"
+
+# Written into the page in place of a block being highlighted in the pool,
+# and replaced by resolve_deferred_highlights(). python-markdown stores
+# codehilite output as raw HTML, so the placeholder reaches the output as is.
+_PLACEHOLDER = "<!--deferred-highlight:{}-->"
+_PLACEHOLDER_RE = re.compile(r"<!--deferred-highlight:([0-9a-f]{64})-->")
+
+_original_hilite = codehilite.CodeHilite.hilite
+
+# Deferral settings of this process: (executor, minimum lines) or None.
+_deferral: Optional[Tuple[Executor, int]] = None
+# (workers, minimum lines) of the pool start_highlight_pool() started, or None.
+_pool_settings: Optional[Tuple[int, int]] = None
+# key -> (future, CodeHilite arguments) for blocks highlighting in the pool.
+_pending: Dict[str, Tuple[Future, Tuple]] = {}
+# Only conversions inside cached_highlighting() use the cache and the pool;
+# other python-markdown users in the process highlight as usual.
+_enabled = False
+
+
+def _hilite_arguments(block: "codehilite.CodeHilite", shebang: bool) -> Tuple:
+    """Everything the highlighted HTML depends on besides Pygments itself, in CodeHilite's own terms."""
+    return (
+        block.src,
+        block.lang,
+        block.guess_lang,
+        block.use_pygments,
+        block.lang_prefix,
+        block.pygments_formatter,
+        dict(block.options),
+        shebang,
+    )
+
+
+def _highlight_key(arguments: Tuple) -> str:
+    src, lang, guess_lang, use_pygments, lang_prefix, formatter, options, shebang = arguments
+    formatter_name = formatter if isinstance(formatter, str) else f"{formatter.__module__}.{formatter.__qualname__}"
+    # The options carry the Pygments style, CSS class, line numbers and highlighted lines.
+    description = repr((lang, guess_lang, use_pygments, lang_prefix, formatter_name,
+                        sorted((name, repr(value)) for name, value in options.items()), shebang))
+    return fragment_key(src, description)
+
+
+def highlight_block(arguments: Tuple) -> str:
+    """Highlights one code block as codehilite would; runs in the highlight pool."""
+    src, lang, guess_lang, use_pygments, lang_prefix, formatter, options, shebang = arguments
+    block = codehilite.CodeHilite(
+        src, lang=lang, guess_lang=guess_lang, use_pygments=use_pygments,
+        lang_prefix=lang_prefix, pygments_formatter=formatter, **options
+    )
+    return _original_hilite(block, shebang)
+
+
+def _cached_hilite(self, shebang: bool = True) -> str:
+    cache = get_render_cache(HIGHLIGHT_CACHE)
+    if not _enabled or (cache is None and _deferral is None):
+        return _original_hilite(self, shebang)
+
+    arguments = _hilite_arguments(self, shebang)
+    key = _highlight_key(arguments)
+    if cache is not None:
+        html = cache.get(key)
+        if html is not None:
+            return html
+
+    if _deferral is not None:
+        executor, min_lines = _deferral
+        if self.src.count("\n") + 1 >= min_lines:
+            if key not in _pending:
+                _pending[key] = (executor.submit(highlight_block, arguments), arguments)
+            return _PLACEHOLDER.format(key)
+
+    html = _original_hilite(self, shebang)
+    if cache is not None:
+        cache.put(key, html)
+    return html
+
+
+def install_highlight_cache():
+    """
+    Routes codehilite's highlighting through this module.
+
+    Inside cached_highlighting(), code blocks are then served from the
+    HIGHLIGHT_CACHE render cache when it is enabled, keyed on the code, its
+    language and every formatting option (style, CSS class, line numbers...),
+    and large blocks are sent to the highlight pool when deferral is
+    enabled. Otherwise blocks are highlighted exactly as before. Safe to call
+    more than once.
+    """
+    codehilite.CodeHilite.hilite = _cached_hilite
+
+
+@contextmanager
+def cached_highlighting():
+    """
+    Routes code blocks highlighted inside the with block through the cache and the pool.
+
+    Output converted inside it may contain placeholders of deferred blocks,
+    so it must be passed through resolve_deferred_highlights() afterwards.
+    """
+    global _enabled
+    previous, _enabled = _enabled, True
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+
+def enable_deferred_highlighting(executor: Executor, min_lines: int):
+    """
+    Highlights code blocks of at least min_lines lines on executor instead of inline.
+
+    While python-markdown carries on with the rest of the document, the large
+    blocks are highlighted in parallel; resolve_deferred_highlights() then
+    waits for them and fills them in.
+    """
+    global _deferral
+    _deferral = (executor, min_lines)
+
+
+def disable_deferred_highlighting():
+    global _deferral, _pool_settings
+    _deferral = None
+    _pool_settings = None
+
+
+def start_highlight_pool(workers: int, min_lines: int) -> ProcessPoolExecutor:
+    """
+    Starts a pool of workers processes and defers code blocks of at least min_lines lines to it.
+
+    Its processes are only started once a block is sent to it. The pool is
+    shut down when this process exits, also in a render worker, which the
+    render pool lets exit without any shutdown hook of ours.
+    """
+    global _pool_settings
+    pool = ProcessPoolExecutor(max_workers=workers)
+    # Finalizers with an exitpriority run before multiprocessing joins the
+    # exiting process's children, which would otherwise wait for work
+    # forever. It must run before the pool's call queue closes (priority 10).
+    Finalize(None, pool.shutdown, exitpriority=20)
+    enable_deferred_highlighting(pool, min_lines)
+    _pool_settings = (workers, min_lines)
+    return pool
+
+
+def get_highlight_pool_settings() -> Optional[Tuple[int, int]]:
+    return _pool_settings
+
+
+def resolve_deferred_highlights(html: str) -> str:
+    """Waits for the deferred blocks in html and replaces their placeholders with the highlighted HTML."""
+    if not _pending:
+        return html
+    cache = get_render_cache(HIGHLIGHT_CACHE)
+    highlighted = {}
+    for key in set(_PLACEHOLDER_RE.findall(html)):
+        entry = _pending.get(key)
+        if entry is None:
+            continue
+        future, arguments = entry
+        try:
+            block_html = future.result()
+        except Exception:
+            # The pool failed (e.g. a worker died); highlight it here instead.
+            block_html = highlight_block(arguments)
+        if cache is not None:
+            cache.put(key, block_html)
+        highlighted[key] = block_html
+    # Pending blocks belong to the document just converted.
+    _pending.clear()
+    html = _PLACEHOLDER_RE.sub(lambda match: highlighted.get(match.group(1), match.group(0)), html)
+    # python-markdown strips its output after inserting raw HTML; a block at
+    # either end of the document would otherwise keep its surrounding newline.
+    return html.strip()
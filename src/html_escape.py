@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+
+def escape_text(text: str) -> str:
+    """
+    Escapes &, < and > in text content, like html.escape(text, quote=False).
+
+    Callers pass whole text runs rather than individual nodes. Each
+    character is only replaced when the text contains it, so text that needs
+    no escaping, the common case, costs three substring checks and is
+    returned unchanged. This is several times faster than a str.translate
+    table or a regex substitution on CPython.
+    """
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_attribute(value) -> str:
+    """Escapes an attribute value for use between double quotes; non-strings are converted with str()."""
+    value = str(value)
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    return value
+
+
+def _join_attributes(items) -> str:
+    return "".join(f' {key}="{escape_attribute(value)}"' for key, value in items)
+
+
+# Link targets and images repeat across a site (navigation, icons), and
+# text_node_to_html_node builds a fresh props dict for every occurrence.
+_cached_attributes = lru_cache(maxsize=4096)(_join_attributes)
+
+
+def render_attributes(props) -> str:
+    """
+    Renders a props mapping as ' key="value"' pairs with escaped values.
+
+    When every value is a string, the rendered string is cached per distinct
+    (key, value) sequence, so a props dict equal to one seen before costs one
+    tuple and one lookup. Other values (numbers, which compare equal across
+    types, or unhashable ones) are rendered afresh.
+    """
+    if not props:
+        return ""
+    items = tuple(props.items())
+    for _, value in items:
+        if type(value) is not str:
+            return _join_attributes(items)
+    return _cached_attributes(items)
@@ -1,11 +1,21 @@
 # html_node.py
+from types import MappingProxyType
+
+from html_escape import escape_text, render_attributes
+
+# Shared by every node without children or props, so leaves don't each
+# allocate an empty list and dict. Both are immutable.
+EMPTY_CHILDREN = ()
+EMPTY_PROPS = MappingProxyType({})
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = children if children else []
-        self.props = props if props else {}
+        self.children = children if children else EMPTY_CHILDREN
+        self.props = props if props else EMPTY_PROPS
 
     def __eq__(self, other):
         if isinstance(other, HTMLNode):
@@ -16,39 +26,92 @@ class HTMLNode:
         return False
 
     def __repr__(self):
-        return f"HTMLNode(tag={self.tag!r}, value={self.value!r}, children={self.children!r}, props={self.props!r})"
+        return f"HTMLNode(tag={self.tag!r}, value={self.value!r}, children={list(self.children)!r}, props={dict(self.props)!r})"
 
     def to_html(self):
         raise NotImplementedError("to_html method must be implemented in child classes")
 
     def props_to_html(self):
-        props_str = ""
-        for key, value in self.props.items():
-            props_str += f' {key}="{value}"'
-        return props_str
+        return render_attributes(self.props)
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag=tag, value=value, children=[], props=props)
+        super().__init__(tag=tag, value=value, props=props)
 
     def to_html(self):
         if self.value is None:
             raise ValueError("LeafNode must have a value")
 
+        value = escape_text(str(self.value))
         if self.tag is None:
-            return self.value
+            return value
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if children is None:
             raise ValueError("ParentNode must have children")
         super().__init__(tag=tag, children=children, props=props)
 
     def to_html(self):
-        if self.tag is None:
-            raise ValueError("ParentNode must have a tag")
+        return "".join(iter_html(self))
+
+# Flush write_html's buffer to the stream after this many fragments.
+_WRITE_BATCH = 1024
+
+def iter_html(node):
+    """
+    Yields the HTML of a node tree as string fragments, in document order.
+
+    Walks the tree with an explicit stack of child iterators instead of
+    recursing, so arbitrarily deep documents can't overflow the call stack,
+    and each fragment is produced once instead of being copied into every
+    enclosing element's string. Adjacent untagged leaves are yielded as one
+    text run, escaped once.
+    """
+    # Each entry is (iterator over remaining siblings, closing tag of their parent).
+    stack = [(iter((node,)), None)]
+    text_run = []
+    while stack:
+        siblings, closing_tag = stack[-1]
+        child = next(siblings, None)
+        if type(child) is LeafNode and child.tag is None and child.value is not None:
+            text_run.append(str(child.value))
+            continue
+        if text_run:
+            yield escape_text("".join(text_run))
+            text_run.clear()
+        if child is None:
+            stack.pop()
+            if closing_tag is not None:
+                yield closing_tag
+            continue
+
+        if isinstance(child, ParentNode) and type(child).to_html is ParentNode.to_html:
+            if child.tag is None:
+                raise ValueError("ParentNode must have a tag")
+            yield f"<{child.tag}{child.props_to_html()}>"
+            stack.append((iter(child.children), f"</{child.tag}>"))
+        else:
+            yield child.to_html()
+
+def write_html(node, stream):
+    """
+    Writes the HTML of a node tree to a writable text stream (a file, io.StringIO, ...).
 
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+    Fragments from iter_html are written in batches, so the whole document
+    is never held in memory as one string.
+    """
+    batch = []
+    for fragment in iter_html(node):
+        batch.append(fragment)
+        if len(batch) >= _WRITE_BATCH:
+            stream.write("".join(batch))
+            batch.clear()
+    if batch:
+        stream.write("".join(batch))
\ No newline at end of file
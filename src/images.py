@@ -0,0 +1,319 @@
+import hashlib
+import html
+import os
+import re
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it images get their dimensions but no resized variants.
+    Image = None
+
+from build_manifest import BuildManifest, remove_output
+from copy_static_to_public import sync_file
+from link_checker import resolve_link
+from metadata_index import page_url
+
+# Manifest section holding each static image's content hash, dimensions and variants.
+IMAGES_SECTION = "images"
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+# srcset widths, in pixels; only those narrower than the original are made.
+DEFAULT_WIDTHS = (480, 960, 1440)
+JPEG_QUALITY = 82
+# Bump when resize_image produces different pixels for the same parameters.
+TRANSFORM_VERSION = 1
+
+_JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+# Markers without a length field.
+_JPEG_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xDA)))
+
+_IMG_TAG_RE = re.compile(r"<img\b[^>]*>")
+_SRC_RE = re.compile(r"""\ssrc=(?:"([^"]*)"|'([^']*)')""")
+_SIZED_RE = re.compile(r"\s(?:width|height|srcset)=")
+
+
+class ImageInfo(NamedTuple):
+    """An image's intrinsic size and its resized variants as (width, output path) pairs, narrowest first."""
+    width: int
+    height: int
+    variants: Tuple[Tuple[int, str], ...]
+
+
+def _jpeg_size(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Walks the JPEG's marker segments up to the first start-of-frame, seeking over the rest."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if length < 2:
+            # The length counts its own two bytes; anything less would seek backwards forever.
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and len(head) >= 30:
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(head) >= 25:
+        b0, b1, b2, b3 = head[21:25]
+        return 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+    if chunk == b"VP8X" and len(head) >= 30:
+        return 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+    return None
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Reads a PNG, GIF, JPEG or WebP image's (width, height) from its header, without decoding pixels.
+
+    Returns:
+        The size, or None if the file isn't one of those formats or is truncated.
+    """
+    with open(path, "rb") as f:
+        head = f.read(30)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR" and len(head) >= 24:
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+            return struct.unpack("<HH", head[6:10])
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+        if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+            return _webp_size(head)
+    return None
+
+
+def is_image(key: str) -> bool:
+    return key.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def variant_name(key: str, width: int) -> str:
+    """images/tolkien.png at 480 pixels wide is written to images/tolkien-480w.png."""
+    stem, extension = os.path.splitext(key)
+    return f"{stem}-{width}w{extension}"
+
+
+def transform_key(source_hash: str, width: int) -> str:
+    """Names a resized image by everything it is made from, so the cache is valid across builds and sites."""
+    return hashlib.sha256(f"{source_hash}:{width}:{JPEG_QUALITY}:{TRANSFORM_VERSION}".encode("utf-8")).hexdigest()
+
+
+def resize_image(job: Tuple[str, str, int]) -> str:
+    """
+    Process pool entry point: writes a (source path, cache path, width) image resized to width.
+
+    The file is written under a temporary name and renamed into place, so
+    an interrupted build never leaves a partial image in the cache.
+    """
+    source_path, cache_path, width = job
+    with Image.open(source_path) as image:
+        height = max(1, round(image.height * width / image.width))
+        resampling = getattr(Image, "Resampling", Image).LANCZOS
+        resized = image.resize((width, height), resampling)
+        fd, tmp_path = tempfile.mkstemp(prefix=".resize-", suffix=os.path.splitext(cache_path)[1],
+                                        dir=os.path.dirname(cache_path))
+        os.close(fd)
+        try:
+            resized.save(tmp_path, format=image.format, quality=JPEG_QUALITY, optimize=True)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return cache_path
+
+
+def _run_resize_jobs(jobs: List[Tuple[str, str, int]], workers: int):
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            resize_image(job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        list(executor.map(resize_image, jobs))
+
+
+def _remove_variants(entry: Optional[Dict], dest_dir: str, keep=()):
+    for _, name in (entry or {}).get("variants", ()):
+        if name not in keep:
+            remove_output(os.path.join(dest_dir, *name.split("/")), dest_dir)
+
+
+def process_images(manifest: BuildManifest, static_dir: str, dest_dir: str, cache_dir: str,
+                   widths: Sequence[int] = DEFAULT_WIDTHS, workers: int = 1, mode: str = "copy") -> Dict[str, int]:
+    """
+    Measures every static image and writes its resized srcset variants.
+
+    Run after the static files were synced, so the manifest's "static"
+    section has each file's content hash. An image whose hash is unchanged
+    keeps its recorded size and variants without being opened. Variants are
+    resized in a process pool (when Pillow is installed) into cache_dir,
+    named by transform_key, and synced from there into dest_dir, so an
+    image is encoded once per source and width, whatever the build.
+
+    Returns:
+        dict: Counts of "images", "measured" and "unchanged" images, and of
+        variants "resized" and taken from the "cached" transforms.
+    """
+    widths = sorted(set(widths)) if Image is not None else []
+    settings = [widths, JPEG_QUALITY, TRANSFORM_VERSION]
+    live = [key for key in manifest.keys("static") if is_image(key)]
+    live_keys = set(live)
+
+    for key in manifest.keys(IMAGES_SECTION):
+        if key not in live_keys:
+            _remove_variants(manifest.pop(IMAGES_SECTION, key), dest_dir)
+
+    measured = unchanged = 0
+    pending = []
+    for key in live:
+        source_hash = manifest.get("static", key)["hash"]
+        previous = manifest.get(IMAGES_SECTION, key)
+        if (previous and previous["hash"] == source_hash and previous["settings"] == settings
+                and all(os.path.exists(os.path.join(dest_dir, *name.split("/"))) for _, name in previous["variants"])):
+            unchanged += 1
+            continue
+        measured += 1
+        size = image_size(os.path.join(static_dir, *key.split("/")))
+        if size is None:
+            _remove_variants(manifest.pop(IMAGES_SECTION, key), dest_dir)
+            continue
+        pending.append((key, source_hash, size, previous))
+
+    jobs = []
+    outputs = []
+    os.makedirs(cache_dir, exist_ok=True)
+    for key, source_hash, (width, height), previous in pending:
+        source_path = os.path.join(static_dir, *key.split("/"))
+        variants = []
+        for variant_width in widths:
+            if variant_width >= width:
+                break
+            cache_path = os.path.join(cache_dir, transform_key(source_hash, variant_width) + os.path.splitext(key)[1])
+            if not os.path.exists(cache_path):
+                jobs.append((source_path, cache_path, variant_width))
+            name = variant_name(key, variant_width)
+            variants.append([variant_width, name])
+            outputs.append((cache_path, name))
+        _remove_variants(previous, dest_dir, keep={name for _, name in variants})
+        manifest.set(IMAGES_SECTION, key, {
+            "hash": source_hash, "settings": settings, "width": width, "height": height, "variants": variants,
+        })
+
+    _run_resize_jobs(jobs, workers)
+    for cache_path, name in outputs:
+        sync_file(cache_path, os.path.join(dest_dir, *name.split("/")), mode)
+
+    return {"images": len(live), "measured": measured, "unchanged": unchanged,
+            "resized": len(jobs), "cached": len(outputs) - len(jobs)}
+
+
+def remove_image_variants(manifest: BuildManifest, dest_dir: str):
+    """Deletes the variants written by an earlier build and forgets its images, for a build without images."""
+    for key in manifest.keys(IMAGES_SECTION):
+        _remove_variants(manifest.pop(IMAGES_SECTION, key), dest_dir)
+
+
+def image_index(manifest: BuildManifest) -> Dict[str, ImageInfo]:
+    """Every measured image by its output path, as recorded by process_images."""
+    index = {}
+    for key in manifest.keys(IMAGES_SECTION):
+        entry = manifest.get(IMAGES_SECTION, key)
+        index[key] = ImageInfo(entry["width"], entry["height"], tuple(tuple(variant) for variant in entry["variants"]))
+    return index
+
+
+def image_digest(info: ImageInfo) -> str:
+    """Changes whenever an image's size or variants do, i.e. whenever pages showing it need re-rendering."""
+    return hashlib.sha256(repr(tuple(info)).encode("utf-8")).hexdigest()
+
+
+def _image_attributes(src: str, info: ImageInfo) -> str:
+    attributes = f' width="{info.width}" height="{info.height}"'
+    if info.variants:
+        # Variants sit next to the original, so they are linked the way the page links it.
+        directory = src[:src.rfind("/") + 1]
+        candidates = [f"{html.escape(directory + name.rsplit('/', 1)[-1])} {width}w" for width, name in info.variants]
+        candidates.append(f"{html.escape(src)} {info.width}w")
+        attributes += f' srcset="{", ".join(candidates)}" sizes="(max-width: {info.width}px) 100vw, {info.width}px"'
+    return attributes
+
+
+def add_image_attributes(page_html: str, url: str, index: Dict[str, ImageInfo]) -> str:
+    """
+    Adds width, height and (if it has variants) srcset and sizes to each
+    <img> of a page whose src is a measured image.
+
+    Args:
+        page_html: The page's HTML fragment.
+        url: The page's URL, that relative srcs are resolved against.
+        index: The image_index.
+
+    Returns:
+        The HTML, unchanged if it has no such images. Tags that already have
+        a width, height or srcset are left alone.
+    """
+    if "<img" not in page_html:
+        return page_html
+
+    def add(match):
+        tag = match.group(0)
+        src_match = _SRC_RE.search(tag)
+        if src_match is None or _SIZED_RE.search(tag):
+            return tag
+        src = html.unescape(src_match.group(1) if src_match.group(1) is not None else src_match.group(2))
+        info = index.get(resolve_link(url, src))
+        if info is None:
+            return tag
+        attributes = _image_attributes(src, info)
+        if tag.endswith("/>"):
+            return tag[:-2].rstrip() + attributes + " />"
+        return tag[:-1] + attributes + ">"
+
+    return _IMG_TAG_RE.sub(add, page_html)
+
+
+# Image attributes of this process: (image_index, output root) or None.
+_image_settings: Optional[Tuple[Dict[str, ImageInfo], str]] = None
+
+
+def enable_image_attributes(index: Dict[str, ImageInfo], dest_dir: str):
+    """Makes generate_page add image attributes, for pages under dest_dir, in this process."""
+    global _image_settings
+    _image_settings = (index, dest_dir)
+
+
+def disable_image_attributes():
+    global _image_settings
+    _image_settings = None
+
+
+def get_image_settings() -> Optional[Tuple[Dict[str, ImageInfo], str]]:
+    return _image_settings
+
+
+def apply_image_attributes(page_html: str, dest_path: str) -> str:
+    """add_image_attributes for the page written to dest_path, if enabled in this process."""
+    if _image_settings is None:
+        return page_html
+    index, dest_dir = _image_settings
+    return add_image_attributes(page_html, page_url(dest_path, dest_dir), index)
@@ -0,0 +1,209 @@
+import os
+import posixpath
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from block_to_block_type import BlockType, block_to_block_type
+from build_manifest import GENERATED_SECTION, BuildManifest
+from front_matter import FrontMatterError, split_front_matter
+from markdown_to_blocks import markdown_to_blocks
+from markdown_utils import extract_markdown_images, extract_markdown_links
+from metadata_index import INDEX_PAGE, MetadataIndex
+
+# Manifest section holding the content hash and URL each page's links were read at.
+LINKS_SECTION = "links"
+
+# Manifest table holding each page's content hash and the link targets found in it.
+PAGE_LINKS_TABLE = "page-links"
+
+# Bump when page_links finds different links in the same markdown, so every page is read again.
+LINKS_VERSION = 1
+
+LINK = "link"
+IMAGE = "image"
+
+# "https:", "mailto:", "//host": not a file of this site.
+_EXTERNAL_RE = re.compile(r"^(?:[A-Za-z][A-Za-z0-9+.-]*:|//)")
+
+
+class BrokenLink(NamedTuple):
+    page: str
+    kind: str
+    target: str
+
+
+class LinkReport(NamedTuple):
+    """The result of check_links: how many internal links were checked, which are broken, and orphaned pages."""
+    links: int
+    broken: List[BrokenLink]
+    orphans: List[str]
+
+
+def page_links(markdown: str) -> List[Tuple[str, str]]:
+    """
+    The (kind, target) of every link and image in a page's markdown, block
+    by block, links before images.
+
+    Fenced code blocks are skipped, so links shown as examples don't count.
+    """
+    links = []
+    for block in markdown_to_blocks(markdown):
+        if '](' not in block or block_to_block_type(block) == BlockType.CODE:
+            continue
+        links.extend((LINK, target.strip()) for _, target in extract_markdown_links(block))
+        links.extend((IMAGE, target.strip()) for _, target in extract_markdown_images(block))
+    return links
+
+
+def resolve_link(page_url: str, target: str) -> Optional[str]:
+    """
+    The output path (relative to the output root, with forward slashes) a
+    link on the page at page_url points to, or None for external links and
+    links to a fragment of the same page.
+
+    Like a browser, ".." never climbs above the site's root.
+    """
+    if not target or target.startswith(("#", "?")) or _EXTERNAL_RE.match(target):
+        return None
+    path = target.split("#", 1)[0].split("?", 1)[0]
+    if "%" in path:
+        path = unquote(path)
+    if not path.startswith("/"):
+        path = page_url[:page_url.rfind("/") + 1] + path
+    resolved = posixpath.normpath(path)
+    if path.endswith("/") or resolved in ("/", "."):
+        resolved = resolved.rstrip("/") + "/" + INDEX_PAGE
+    return resolved[1:] if resolved.startswith("/") else resolved
+
+
+def output_index(manifest: BuildManifest) -> Set[str]:
+    """Every path in the output tree, from the manifest: pages, static files and generated files."""
+    outputs = {manifest.get("pages", key)["output"] for key in manifest.keys("pages")}
+    outputs.update(manifest.keys("static"))
+    outputs.update(manifest.keys(GENERATED_SECTION))
+    return outputs
+
+
+def _link_exists(path: str, outputs: Set[str]) -> bool:
+    # An extensionless link to a directory is served as its index.html.
+    return path in outputs or f"{path}/{INDEX_PAGE}" in outputs
+
+
+def update_link_entries(manifest: BuildManifest, content_dir: str, index: MetadataIndex,
+                        page_keys: Iterable[str]) -> Tuple[int, int]:
+    """
+    Records the links of the pages whose markdown changed since they were last read.
+
+    Each link is stored as [kind, target, output path], the path resolved
+    against the page's URL (None for external links), so later builds
+    resolve nothing for unchanged pages. The links are kept in the
+    PAGE_LINKS_TABLE table; the manifest has the hash, URL and version
+    they were read at.
+
+    Args:
+        manifest: The build manifest; its "pages" section has each page's
+            content hash. Updated in place.
+        content_dir: Root of the markdown content tree.
+        index: The metadata index, for each page's URL.
+        page_keys: The pages to check.
+
+    Returns:
+        tuple[int, int]: Counts of pages read and pages whose links were reused.
+    """
+    page_keys = set(page_keys)
+    table = manifest.table(PAGE_LINKS_TABLE)
+    for key in manifest.keys(LINKS_SECTION):
+        if key not in page_keys:
+            manifest.pop(LINKS_SECTION, key)
+    for key in table.keys():
+        if key not in page_keys:
+            table.pop(key)
+
+    read = unchanged = 0
+    for key in page_keys:
+        content_hash = manifest.get("pages", key)["hash"]
+        url = index.get(key).url
+        previous = manifest.get(LINKS_SECTION, key)
+        if (previous
+                and previous["hash"] == content_hash
+                and previous["url"] == url
+                and previous["version"] == LINKS_VERSION
+                and (table.get(key) or {}).get("hash") == content_hash):
+            unchanged += 1
+            continue
+        with open(os.path.join(content_dir, key), "r", encoding="utf-8") as f:
+            try:
+                _, body = split_front_matter(f.read())
+            except FrontMatterError:
+                body = ""
+        table.set(key, {
+            "hash": content_hash,
+            "links": [[kind, target, resolve_link(url, target)] for kind, target in page_links(body)],
+        })
+        manifest.set(LINKS_SECTION, key, {"hash": content_hash, "url": url, "version": LINKS_VERSION})
+        read += 1
+    return read, unchanged
+
+
+def shown_images(manifest: BuildManifest, key: str) -> Optional[Set[str]]:
+    """
+    The output paths of the images a page shows, as recorded by update_link_entries.
+
+    Returns:
+        The paths, or None if the page's links weren't recorded for the
+        content it was last rendered from.
+    """
+    page = manifest.get("pages", key)
+    recorded = manifest.get(LINKS_SECTION, key)
+    entry = manifest.table(PAGE_LINKS_TABLE).get(key)
+    if (page is None or recorded is None or entry is None
+            or not page["hash"] == recorded["hash"] == entry["hash"]
+            or recorded["version"] != LINKS_VERSION):
+        return None
+    return {path for kind, _, path in entry["links"] if kind == IMAGE and path is not None}
+
+
+def link_graph(manifest: BuildManifest) -> Dict[str, List[List]]:
+    """Each checked page's [kind, target, output path] links, as recorded by update_link_entries."""
+    table = manifest.table(PAGE_LINKS_TABLE)
+    return {key: table.get(key)["links"] for key in manifest.keys(LINKS_SECTION)}
+
+
+def check_links(index: MetadataIndex, content_dir: str, manifest: BuildManifest) -> LinkReport:
+    """
+    Checks every internal link and image of the rendered pages against the output tree.
+
+    Links are read from the markdown only for pages that changed since the
+    last build; everything else comes from the manifest, so the whole
+    check is one pass over the recorded links with set lookups. A link is
+    broken if no page, static file or generated file has its path; a page
+    is orphaned if no other page links to it (the home page never is).
+
+    Returns:
+        LinkReport: The number of internal links, the broken ones by page
+        and the orphaned pages' keys.
+    """
+    page_keys = [key for key in manifest.keys("pages") if key in index]
+    update_link_entries(manifest, content_dir, index, page_keys)
+
+    outputs = output_index(manifest)
+    page_outputs = {manifest.get("pages", key)["output"]: key for key in page_keys}
+
+    links = 0
+    broken = []
+    linked: Set[str] = set()
+    for key, edges in sorted(link_graph(manifest).items()):
+        for kind, target, path in edges:
+            if path is None:
+                continue
+            links += 1
+            if not _link_exists(path, outputs):
+                broken.append(BrokenLink(key, kind, target))
+                continue
+            linked_key = page_outputs.get(path) or page_outputs.get(f"{path}/{INDEX_PAGE}")
+            if linked_key is not None and linked_key != key:
+                linked.add(linked_key)
+
+    orphans = sorted(key for output, key in page_outputs.items() if output != INDEX_PAGE and key not in linked)
+    return LinkReport(links, broken, orphans)
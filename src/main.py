@@ -1,11 +1,41 @@
+import argparse
 import os
 import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-import markdown
+from typing import NamedTuple
 import re
 
 # Assuming textnode.py is in the same directory as main.py or accessible
 from textnode import TextNode, TextType
+from content_walker import MARKDOWN_EXTENSION, content_path_to_dest, find_content_pages
+from dev_server import DevServer, FileWatcher
+from copy_static_to_public import SKIPPED, SYNC_MODES, sync_file
+from build_profiler import disable_profiling, drain_records, enable_profiling, get_profiler, profile_stage
+from page_template import load_template
+from build_manifest import BuildManifest, fingerprint_file, remove_output
+from render_cache import active_render_caches, drain_cache_stats, enable_render_cache, get_render_cache
+from renderers import DEFAULT_RENDERER, RENDERERS, get_renderer, select_renderer
+from highlight_cache import HIGHLIGHT_CACHE, get_highlight_pool_settings, start_highlight_pool
+from front_matter import FrontMatterError, split_front_matter
+from metadata_index import MetadataIndex, build_metadata_index, find_title, page_url, template_values
+from sitemap import remove_sitemaps, write_sitemaps
+from feeds import DEFAULT_FEED_LIMIT, remove_feeds, write_feeds
+from search_index import (
+    apply_search_script, disable_search_script, enable_search_script, remove_search_index, search_script_enabled,
+    write_search_index,
+)
+from link_checker import check_links, shown_images, update_link_entries
+from images import (
+    Image, apply_image_attributes, disable_image_attributes, enable_image_attributes, get_image_settings,
+    image_digest, image_index, process_images, remove_image_variants,
+)
+from asset_fingerprints import (
+    apply_asset_rewrite, asset_map, asset_map_digest, disable_asset_rewrite, enable_asset_rewrite,
+    fingerprint_assets, get_asset_settings, remove_fingerprinted_assets,
+)
 
 # --- Function Definitions ---
 
@@ -21,50 +51,32 @@ def extract_title(markdown: str) -> str:
     if not isinstance(markdown, str):
         raise TypeError("Input 'markdown' must be a string.")
 
-    lines = markdown.splitlines()
-    for line in lines:
-        stripped_line = line.strip()
-        if stripped_line.startswith("# "):
-            title = stripped_line[2:].strip()
-            return title
+    title = find_title(markdown)
+    if title is None:
+        raise ValueError("No H1 header found in the Markdown document.")
+    return title
 
-    raise ValueError("No H1 header found in the Markdown document.")
 
-
-def copy_recursive(source_dir_path: str, dest_dir_path: str):
-    """Recursively copies files and directories from source to destination.
-
-    Args:
-        source_dir_path (str): Path to the source directory.
-        dest_dir_path (str): Path to the destination directory.
-    """
-    print(f"Processing contents of: {source_dir_path}")
-
-    for item_name in os.listdir(source_dir_path):
-        source_item_path = os.path.join(source_dir_path, item_name)
-        dest_item_path = os.path.join(dest_dir_path, item_name)
-
-        if os.path.isfile(source_item_path):
-            print(f"  Copying file: {source_item_path} -> {dest_item_path}")
-            shutil.copy2(source_item_path, dest_item_path)  # Use copy2 to preserve metadata
-        elif os.path.isdir(source_item_path):
-            print(f"  Creating directory and entering: {dest_item_path}")
-            os.makedirs(dest_item_path, exist_ok=True)
-            copy_recursive(source_item_path, dest_item_path)
-        else:
-            print(f"  Skipping item (not file or dir): {source_item_path}")
-
-
-def markdown_to_html_node(markdown_text: str) -> str:
+def markdown_to_html_node(markdown_text: str, page: str = None) -> str:
     """Converts markdown text to an HTML string.
 
+    The document is rendered by the renderer selected with --renderer. If the
+    render cache is enabled, a document rendered before by the same renderer
+    (on any page, in this or an earlier build) is served from the cache; on a
+    miss, the native renderer still reuses each block it rendered before.
+
     Args:
         markdown_text (str): The markdown text to convert.
+        page (str | None): The source file, that the renderer's profiled stages are recorded for.
 
     Returns:
         str: The HTML representation of the markdown text.
     """
-    return markdown.markdown(markdown_text, extensions=['fenced_code', 'codehilite', 'tables'])
+    renderer = get_renderer()
+    cache = get_render_cache()
+    if cache is None:
+        return renderer.render(markdown_text, page)
+    return cache.get_or_render(markdown_text, renderer.version, lambda text: renderer.render(text, page))
 
 
 
@@ -75,61 +87,717 @@ def generate_page(from_path: str, template_path: str, dest_path: str):
         from_path (str): Path to the markdown file.
         template_path (str): Path to the HTML template file.
         dest_path (str): Path to save the generated HTML file.
+
+    Returns:
+        bool: True if the page was written, False if an error was reported.
     """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
     try:
-        with open(from_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
+        with profile_stage("file read", from_path):
+            with open(from_path, 'r', encoding='utf-8') as f:
+                markdown_content = f.read()
     except FileNotFoundError:
         print(f"Error: Markdown file not found at {from_path}")
-        return
+        return False
 
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
+        template = load_template(template_path)
     except FileNotFoundError:
         print(f"Error: Template file not found at {template_path}")
-        return
+        return False
 
-    html_content = markdown_to_html_node(markdown_content)
     try:
-        title = extract_title(markdown_content)
-    except ValueError:
-        title = "Untitled"  # Or some other default title
+        metadata, markdown_content = split_front_matter(markdown_content)
+    except FrontMatterError as e:
+        print(f"Error: invalid front matter in {from_path}: {e}")
+        return False
 
-    full_html = template_content.replace('{{ Title }}', title).replace('{{ Content }}', html_content)
+    with profile_stage("markdown render", from_path):
+        html_content = markdown_to_html_node(markdown_content, from_path)
+    with profile_stage("image attributes", from_path):
+        html_content = apply_image_attributes(html_content, dest_path)
+    title = metadata.get("title")
+    if not title:
+        try:
+            title = extract_title(markdown_content)
+        except ValueError:
+            title = "Untitled"  # Or some other default title
+
+    with profile_stage("template fill", from_path):
+        page_parts = template.fill({**template_values(metadata), "Title": title, "Content": html_content})
+    with profile_stage("asset rewrite", from_path):
+        page_parts = apply_asset_rewrite(page_parts, dest_path)
+    page_parts = apply_search_script(page_parts)
 
     # Ensure the destination directory exists
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
 
     try:
-        with open(dest_path, 'w', encoding='utf-8') as f:
-            f.write(full_html)
+        with profile_stage("write", from_path):
+            with open(dest_path, 'w', encoding='utf-8') as f:
+                f.writelines(page_parts)
     except Exception as e:
         print(f"Error writing to {dest_path}: {e}")
-        return
+        return False
 
     print(f"Successfully generated {dest_path}")
+    return True
 
 
 
-def main():
-    """Main function to generate the website."""
-    # NOTE: Original TextNode example kept from your code
-    print("Original TextNode example:")
-    node = TextNode("Example Text", TextType.LINK, "https://example.com")
-    print(node)
-    print("-" * 30)
+def _generate_page_job(page):
+    """Process pool entry point: renders one (from_path, template_path, dest_path) tuple.
 
-    # --- Configuration ---
-    current_script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root_dir = os.path.dirname(current_script_dir)
-    source_dir = os.path.join(project_root_dir, "static")
-    dest_dir = os.path.join(project_root_dir, "public")
-    content_dir = os.path.join(project_root_dir, "content")  # Added content directory
-    template_file = "template.html"  #  Added template file name
-    index_file = "index.md" # Added index file name
+    Returns generate_page's success flag, the profiler records the page
+    produced in this process ([] unless profiling is enabled) and the render
+    cache counters ({} unless the cache is enabled).
+    """
+    ok = generate_page(*page)
+    return ok, drain_records(), drain_cache_stats()
+
+
+def _init_render_worker(renderer: str, profile: bool, cache_settings: dict, image_settings, asset_settings,
+                        search_script: bool, highlight_settings):
+    """Process pool initializer: mirrors the parent's renderer, profiling, render caches, image attributes,
+    asset rewriting, search script and highlight pool in the worker.
+
+    A worker gets a highlight pool of its own (see start_highlight_pool), so
+    the large code blocks of the page it renders are highlighted while the
+    rest of that page is converted.
+
+    The worker's markdown renderer is built (and Pygments warmed) here, once,
+    rather than while rendering its first page.
+    """
+    select_renderer(renderer)
+    get_renderer()
+    if profile:
+        enable_profiling()
+    for name, settings in cache_settings.items():
+        enable_render_cache(*settings, name=name)
+    if image_settings is not None:
+        enable_image_attributes(*image_settings)
+    if asset_settings is not None:
+        enable_asset_rewrite(*asset_settings)
+    if search_script:
+        enable_search_script()
+    if highlight_settings is not None:
+        start_highlight_pool(*highlight_settings)
+
+
+def render_pages(pages: list, jobs: int = 1) -> list:
+    """Renders (from_path, template_path, dest_path) tuples, in parallel if jobs > 1.
+
+    Pages are independent of each other, so with jobs > 1 they are rendered in
+    a process pool; every page is still produced by the same generate_page
+    call, so the output is byte-identical to a serial build.
+
+    Args:
+        pages (list): The (from_path, template_path, dest_path) tuples to render.
+        jobs (int): Number of worker processes. 1 renders serially in-process.
+
+    Returns:
+        list[bool]: generate_page's success flag for each page, in input order.
+    """
+    profiler = get_profiler()
+    caches = active_render_caches()
+    if jobs <= 1 or len(pages) <= 1:
+        results = [_generate_page_job(page) for page in pages]
+    else:
+        workers = min(jobs, len(pages))
+        # Hand out pages in batches so tens of thousands of small pages don't pay
+        # one inter-process round trip each.
+        chunksize = max(1, len(pages) // (workers * 4))
+        cache_settings = {
+            name: (cache.directory, cache.max_memory_bytes, cache.max_disk_bytes)
+            for name, cache in caches.items()
+        }
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(get_renderer().name, profiler is not None, cache_settings,
+                                           get_image_settings(), get_asset_settings(),
+                                           search_script_enabled(), get_highlight_pool_settings())) as executor:
+            results = list(executor.map(_generate_page_job, pages, chunksize=chunksize))
+
+    for _, records, cache_stats in results:
+        if profiler is not None:
+            profiler.add_records(records)
+        for name, stats in cache_stats.items():
+            caches[name].add_stats(stats)
+    return [ok for ok, _, _ in results]
+
+
+class SitePaths(NamedTuple):
+    """Locations of the site's inputs and outputs."""
+    static_dir: str
+    content_dir: str
+    template_file: str
+    dest_dir: str
+    manifest_file: str
+
+
+def _image_cache_dir(site: SitePaths) -> str:
+    """Where resized images are cached, see process_images."""
+    return os.path.join(os.path.dirname(site.manifest_file), "images")
+
+
+def _manifest_key(path: str, root: str) -> str:
+    """Returns path relative to root with forward slashes, as stored in the manifest."""
+    return Path(os.path.relpath(path, root)).as_posix()
+
+
+def _iter_files(root: str):
+    """Yields every regular file under root, in sorted order."""
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            yield os.path.join(dir_path, file_name)
+
+
+def _is_within(path: str, root: str) -> bool:
+    """Returns True if path is root or lies below it."""
+    path, root = os.path.abspath(path), os.path.abspath(root)
+    return path == root or path.startswith(root + os.sep)
+
+
+def _sync_static_file(source_path: str, source_dir_path: str, dest_dir_path: str, previous, mode: str):
+    """Brings one static file's output up to date.
+
+    Thread-safe: reads only the given previous manifest entry and returns the
+    new one instead of updating the manifest.
+
+    Returns:
+        tuple[str, dict, str]: The manifest key, the new fingerprint and the sync_file action.
+    """
+    key = _manifest_key(source_path, source_dir_path)
+    fingerprint = fingerprint_file(source_path, previous)
+    # Same contents as last build: only re-copy if the output's size or
+    # mtime no longer match (deleted or edited in public/).
+    changed = not previous or previous["hash"] != fingerprint["hash"]
+    action = sync_file(source_path, os.path.join(dest_dir_path, key), mode, force=changed)
+    return key, fingerprint, action
+
+
+def _remove_static_file(key: str, dest_dir_path: str, manifest: BuildManifest):
+    """Deletes the output of a static file that no longer exists in the source tree."""
+    remove_output(os.path.join(dest_dir_path, key), dest_dir_path)
+    manifest.pop("static", key)
+
+
+def copy_static_incremental(source_dir_path: str, dest_dir_path: str, manifest: BuildManifest,
+                            mode: str = "copy", workers: int = None):
+    """Copies only the static files whose contents changed since the last build.
+
+    Files are hashed and copied on a thread pool. Files that were removed
+    from the source tree since the last build are deleted from the
+    destination.
+
+    Args:
+        source_dir_path (str): Path to the static source directory.
+        dest_dir_path (str): Path to the destination directory.
+        manifest (BuildManifest): The build manifest, updated in place.
+        mode (str): "copy" (reflink clone where supported) or "link" (hard links).
+        workers (int | None): Thread count, defaults to ThreadPoolExecutor's default.
+
+    Returns:
+        tuple[int, int, int]: Counts of copied, unchanged and removed files.
+    """
+    copied = unchanged = 0
+    live_keys = set()
+
+    jobs = []
+    for source_path in _iter_files(source_dir_path):
+        key = _manifest_key(source_path, source_dir_path)
+        live_keys.add(key)
+        jobs.append((source_path, manifest.get("static", key)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda job: _sync_static_file(job[0], source_dir_path, dest_dir_path, job[1], mode),
+            jobs,
+        )
+        for key, fingerprint, action in results:
+            manifest.set("static", key, fingerprint)
+            if action == SKIPPED:
+                unchanged += 1
+            else:
+                copied += 1
+
+    removed = 0
+    for key in manifest.keys("static"):
+        if key not in live_keys:
+            _remove_static_file(key, dest_dir_path, manifest)
+            removed += 1
+
+    return copied, unchanged, removed
+
+
+def _check_template(template_path: str, manifest: BuildManifest) -> bool:
+    """Records the template's fingerprint; returns True (and forgets all pages) if it changed."""
+    previous = manifest.get("template", "template")
+    fingerprint = fingerprint_file(template_path, previous)
+    manifest.set("template", "template", fingerprint)
+    if previous and previous["hash"] == fingerprint["hash"]:
+        return False
+    manifest.clear("pages")
+    return True
+
+
+def _check_renderer(manifest: BuildManifest) -> bool:
+    """Records the markdown renderer's version; returns True (and forgets all pages) if it changed."""
+    previous = manifest.get("renderer", "renderer")
+    version = get_renderer().version
+    manifest.set("renderer", "renderer", {"version": version})
+    if previous and previous["version"] == version:
+        return False
+    manifest.clear("pages")
+    return True
+
+
+def _check_images(manifest: BuildManifest) -> bool:
+    """Records the image sizes pages are rendered with; returns True (and forgets the pages showing one) if any changed.
+
+    Which images a page shows comes from its recorded links (see
+    _record_page_links); a page without them is forgotten whenever an image
+    changed.
+    """
+    settings = get_image_settings()
+    digests = {key: image_digest(info) for key, info in (settings[0] if settings is not None else {}).items()}
+    changed = set()
+    for key in manifest.keys("image_index"):
+        if key not in digests:
+            manifest.pop("image_index", key)
+            changed.add(key)
+    for key, digest in digests.items():
+        previous = manifest.get("image_index", key)
+        if not previous or previous["hash"] != digest:
+            manifest.set("image_index", key, {"hash": digest})
+            changed.add(key)
+    if not changed:
+        return False
+    for key in manifest.keys("pages"):
+        shown = shown_images(manifest, key)
+        if shown is None or not shown.isdisjoint(changed):
+            manifest.pop("pages", key)
+    return True
+
+
+def _record_page_links(content_dir: str, manifest: BuildManifest):
+    """Records the links of the rendered pages that changed, so _check_images knows which images each page shows."""
+    index = MetadataIndex.from_manifest(manifest)
+    update_link_entries(manifest, content_dir, index, [key for key in manifest.keys("pages") if key in index])
+
+
+def _check_assets(manifest: BuildManifest) -> bool:
+    """Records the fingerprinted asset names pages are rendered with; returns True (and forgets all pages) if they changed."""
+    settings = get_asset_settings()
+    previous = manifest.get("asset_map", "asset_map")
+    digest = asset_map_digest(settings[0] if settings is not None else None)
+    manifest.set("asset_map", "asset_map", {"hash": digest})
+    if previous and previous["hash"] == digest:
+        return False
+    manifest.clear("pages")
+    return True
+
+
+def _check_search_script(manifest: BuildManifest) -> bool:
+    """Records whether pages link the search client; returns True (and forgets all pages) if that changed."""
+    previous = manifest.get("search_script", "search_script")
+    enabled = search_script_enabled()
+    manifest.set("search_script", "search_script", {"enabled": enabled})
+    if previous and previous["enabled"] == enabled:
+        return False
+    manifest.clear("pages")
+    return True
+
+
+def _render_and_record(stale, template_path: str, manifest: BuildManifest, jobs: int) -> int:
+    """Renders (key, from_path, dest_path, fingerprint) entries and records the successful ones.
+
+    Returns:
+        int: The number of pages rendered.
+    """
+    pages = [(from_path, template_path, dest_path) for _, from_path, dest_path, _ in stale]
+    rendered = 0
+    for (key, _, _, fingerprint), ok in zip(stale, render_pages(pages, jobs)):
+        if ok:
+            manifest.set("pages", key, fingerprint)
+            rendered += 1
+        else:
+            # Leave it out of the manifest so the next build retries it.
+            manifest.pop("pages", key)
+    return rendered
+
+
+def _stale_page(from_path: str, dir_path_content: str, dest_path: str, dest_dir_path: str, manifest: BuildManifest):
+    """Returns a (key, from_path, dest_path, fingerprint) entry if the page must be rendered, else None."""
+    key = _manifest_key(from_path, dir_path_content)
+    previous = manifest.get("pages", key)
+    fingerprint = fingerprint_file(from_path, previous)
+    fingerprint["output"] = _manifest_key(dest_path, dest_dir_path)
+    if previous and previous["hash"] == fingerprint["hash"] and os.path.exists(dest_path):
+        manifest.set("pages", key, fingerprint)
+        return None
+    return key, from_path, dest_path, fingerprint
+
+
+def _remove_page(key: str, dest_dir_path: str, manifest: BuildManifest):
+    """Deletes the HTML of a page whose markdown no longer exists."""
+    entry = manifest.pop("pages", key)
+    if entry:
+        remove_output(os.path.join(dest_dir_path, entry["output"]), dest_dir_path)
+
+
+def generate_pages_incremental(dir_path_content: str, template_path: str, dest_dir_path: str,
+                               manifest: BuildManifest, jobs: int = 1, include_drafts: bool = False):
+    """Re-renders only the pages whose markdown or template changed since the last build.
+
+    Every page's front matter is indexed first (see metadata_index). Draft
+    pages are skipped unless include_drafts is set, and pages whose markdown
+    was deleted or that became drafts since the last build have their HTML
+    removed. A changed template, markdown renderer or fingerprinted asset
+    (see fingerprint_assets), or turning the search script on or off,
+    invalidates every page; a changed image (see process_images) only the
+    pages showing it.
+
+    Args:
+        dir_path_content (str): Root of the markdown content tree.
+        template_path (str): Path to the HTML template file.
+        dest_dir_path (str): Root of the output tree.
+        manifest (BuildManifest): The build manifest, updated in place.
+        jobs (int): Number of worker processes used for rendering.
+        include_drafts (bool): Also render pages whose front matter sets draft: true.
+
+    Returns:
+        tuple[int, int, int]: Counts of rendered, unchanged and removed pages.
+    """
+    _check_template(template_path, manifest)
+    _check_renderer(manifest)
+    _check_images(manifest)
+    _check_assets(manifest)
+    _check_search_script(manifest)
+
+    pages = find_content_pages(dir_path_content, dest_dir_path)
+    with profile_stage("metadata index"):
+        index = build_metadata_index(pages, dir_path_content, dest_dir_path, manifest)
+
+    stale = []
+    live_keys = set()
+    unchanged = 0
+    for from_path, dest_path in pages:
+        key = _manifest_key(from_path, dir_path_content)
+        page = index.get(key)
+        if page is not None and page.draft and not include_drafts:
+            continue
+        live_keys.add(key)
+        entry = _stale_page(from_path, dir_path_content, dest_path, dest_dir_path, manifest)
+        if entry:
+            stale.append(entry)
+        else:
+            unchanged += 1
+
+    rendered = _render_and_record(stale, template_path, manifest, jobs)
+
+    removed = 0
+    for key in manifest.keys("pages"):
+        if key not in live_keys:
+            _remove_page(key, dest_dir_path, manifest)
+            removed += 1
+
+    return rendered, unchanged, removed
+
+
+def rebuild_changed(changed_paths, site: SitePaths, manifest: BuildManifest, jobs: int = 1,
+                    static_mode: str = "copy", include_drafts: bool = False, images: bool = False,
+                    fingerprint: bool = False):
+    """Brings the output up to date for a set of changed input files, without walking the whole site.
+
+    Used by watch mode. A changed template re-renders every page; otherwise
+    only the changed markdown files are re-rendered or removed and only the
+    changed static files are re-copied or removed. If static files changed,
+    the image and asset fingerprint stages run again and the pages showing
+    a changed image or referencing a changed asset are re-rendered.
+
+    Args:
+        changed_paths (Iterable[str]): Added, modified or deleted input files.
+        site (SitePaths): The site's locations.
+        manifest (BuildManifest): The build manifest, updated in place.
+        jobs (int): Number of worker processes used for rendering.
+        static_mode (str): How static files are synced, see copy_static_incremental.
+        include_drafts (bool): Also render pages whose front matter sets draft: true.
+        images (bool): The build processes images, see process_images.
+        fingerprint (bool): The build fingerprints assets, see fingerprint_assets.
+
+    Returns:
+        tuple[int, int]: Counts of pages rendered or removed and static files copied or removed.
+    """
+    changed_paths = sorted(os.path.abspath(path) for path in changed_paths)
+    pages_touched = static_touched = 0
+
+    if os.path.abspath(site.template_file) in changed_paths and _check_template(site.template_file, manifest):
+        rendered, _, removed = generate_pages_incremental(
+            site.content_dir, site.template_file, site.dest_dir, manifest, jobs, include_drafts
+        )
+        pages_touched += rendered + removed
+    else:
+        index = MetadataIndex.from_manifest(manifest)
+        stale = []
+        for path in changed_paths:
+            if not _is_within(path, site.content_dir) or not path.endswith(MARKDOWN_EXTENSION):
+                continue
+            key = _manifest_key(path, site.content_dir)
+            if os.path.isfile(path):
+                dest_path = content_path_to_dest(path, site.content_dir, site.dest_dir)
+                try:
+                    page = index.update_page(path, key, page_url(dest_path, site.dest_dir), manifest)
+                except FrontMatterError:
+                    # generate_page reports it.
+                    page = None
+                if page is not None and page.draft and not include_drafts:
+                    if manifest.get("pages", key):
+                        _remove_page(key, site.dest_dir, manifest)
+                        pages_touched += 1
+                    continue
+                entry = _stale_page(path, site.content_dir, dest_path, site.dest_dir, manifest)
+                if entry:
+                    stale.append(entry)
+            else:
+                index.remove_page(key, manifest)
+                _remove_page(key, site.dest_dir, manifest)
+                pages_touched += 1
+        pages_touched += _render_and_record(stale, site.template_file, manifest, jobs)
+    if images:
+        _record_page_links(site.content_dir, manifest)
+
+    for path in changed_paths:
+        if not _is_within(path, site.static_dir):
+            continue
+        if os.path.isfile(path):
+            key = _manifest_key(path, site.static_dir)
+            _, static_entry, action = _sync_static_file(
+                path, site.static_dir, site.dest_dir, manifest.get("static", key), static_mode
+            )
+            manifest.set("static", key, static_entry)
+            static_touched += action != SKIPPED
+        else:
+            _remove_static_file(_manifest_key(path, site.static_dir), site.dest_dir, manifest)
+            static_touched += 1
+
+    if static_touched and (images or fingerprint):
+        if images:
+            process_images(manifest, site.static_dir, site.dest_dir, _image_cache_dir(site),
+                           workers=jobs, mode=static_mode)
+            enable_image_attributes(image_index(manifest), site.dest_dir)
+        if fingerprint:
+            fingerprint_assets(manifest, site.static_dir, site.dest_dir, mode=static_mode)
+            enable_asset_rewrite(asset_map(manifest), site.dest_dir)
+        # Both checks record the new state, so neither may be skipped.
+        images_changed = _check_images(manifest)
+        if _check_assets(manifest) or images_changed:
+            rendered, _, removed = generate_pages_incremental(
+                site.content_dir, site.template_file, site.dest_dir, manifest, jobs, include_drafts
+            )
+            pages_touched += rendered + removed
+
+    return pages_touched, static_touched
+
+
+def parse_args(argv=None):
+    """Parses the command line options of the site generator.
+
+    Args:
+        argv (list[str] | None): Arguments to parse, defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Generate the static site into public/.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "serve"),
+        default="build",
+        help="build the site (default), or build it and serve public/ with live reload",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes used to render pages (default: CPU count)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore the build manifest, clear public/ and rebuild everything",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also render pages whose front matter sets draft: true (skipped by default)",
+    )
+    parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help="the site's public URL (e.g. https://example.com); "
+             "enables sitemap.xml, rss.xml and atom.xml, which need absolute URLs",
+    )
+    parser.add_argument(
+        "--feed-limit",
+        type=int,
+        default=DEFAULT_FEED_LIMIT,
+        metavar="N",
+        help=f"with --base-url: number of newest dated pages in the feeds (default: {DEFAULT_FEED_LIMIT})",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a full-text search index and search/search.js, and load search.js in every page's <head> "
+             "so its scripts can call SiteSearch.search(query)",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report internal links and images that point nowhere, and pages no other page links to",
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="add width and height to <img> tags from the static images' headers, and with Pillow "
+             "installed, srcset variants resized into .cache/images",
+    )
+    parser.add_argument(
+        "--fingerprint-assets",
+        action="store_true",
+        help="also write static CSS, JS, images and fonts as name.<hash>.ext and point the pages at those names",
+    )
+    parser.add_argument(
+        "--static-mode",
+        choices=SYNC_MODES,
+        default="copy",
+        help="copy static files (reflink clone where the filesystem supports it) "
+             "or hard-link them into public/ (default: copy)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="with serve: rebuild changed content, static files and template, and reload open pages",
+    )
+    parser.add_argument("--host", default="localhost", help="with serve: address to bind (default: localhost)")
+    parser.add_argument("--port", type=int, default=8888, help="with serve: port to listen on (default: 8888)")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.1,
+        help="with --watch: seconds between checks for changed files (default: 0.1)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every pipeline stage per page and write a JSON report",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=os.path.join(".cache", "build-profile.json"),
+        help="with --profile: where to write the JSON report (default: .cache/build-profile.json)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="with --profile: number of slowest pages to list (default: 10)",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        metavar="PATH",
+        help="with --profile: also write a Chrome trace-event file for chrome://tracing or Perfetto",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        metavar="PATH",
+        help="also dump cProfile stats of the main process (use -j 1 to include page rendering)",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=sorted(RENDERERS),
+        default=DEFAULT_RENDERER,
+        help="markdown renderer: python-markdown, the in-house native pipeline, or auto "
+             "(native for simple pages, python-markdown for pages with tables or code) "
+             f"(default: {DEFAULT_RENDERER})",
+    )
+    parser.add_argument(
+        "--no-render-cache",
+        action="store_true",
+        help="render every page's markdown afresh instead of reusing fragments cached in .cache/fragments",
+    )
+    parser.add_argument(
+        "--render-cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="size limit of each on-disk render cache (page fragments, highlighted code); "
+             "least recently used entries are evicted (default: 256)",
+    )
+    parser.add_argument(
+        "--no-highlight-cache",
+        action="store_true",
+        help="highlight every fenced code block afresh instead of reusing .cache/highlight",
+    )
+    parser.add_argument(
+        "--highlight-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="highlight large code blocks in a pool of N processes while the rest of the page "
+             "is converted (default: 0, highlight inline). Each page waits for its own blocks "
+             "before it is written, so this helps pages with several large blocks. With --jobs J "
+             "every render process has its own pool, so up to J x N processes highlight at once: "
+             "keep N small, or use --jobs 1 and a larger N",
+    )
+    parser.add_argument(
+        "--defer-highlight-lines",
+        type=int,
+        default=1000,
+        metavar="LINES",
+        help="with --highlight-workers: smallest code block, in lines, sent to the pool (default: 1000)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.watch and args.command != "serve":
+        parser.error("--watch requires the serve command")
+    if args.render_cache_size < 0:
+        parser.error("--render-cache-size must not be negative")
+    if args.highlight_workers < 0:
+        parser.error("--highlight-workers must not be negative")
+    if args.feed_limit < 0:
+        parser.error("--feed-limit must not be negative")
+    return args
+
+
+def build_site(site: SitePaths, jobs: int = 1, full: bool = False, static_mode: str = "copy",
+               include_drafts: bool = False, base_url: str = None, feed_limit: int = DEFAULT_FEED_LIMIT,
+               search: bool = False, link_check: bool = False, images: bool = False,
+               fingerprint: bool = False):
+    """Copies static files and renders pages into site.dest_dir.
+
+    Args:
+        site (SitePaths): The site's locations.
+        jobs (int): Number of worker processes used for rendering.
+        full (bool): Ignore the manifest and rebuild from an empty destination.
+        static_mode (str): How static files are synced, see copy_static_incremental.
+        include_drafts (bool): Also render pages whose front matter sets draft: true.
+        base_url (str | None): The site's public URL; if set, sitemap.xml, rss.xml and atom.xml are written.
+        feed_limit (int): Number of newest dated pages in the feeds.
+        search (bool): Write the search index of the rendered pages under search/
+            and load search/search.js in every page.
+        link_check (bool): Report broken internal links and orphaned pages, see check_links.
+        images (bool): Measure static images and resize their variants, see process_images.
+        fingerprint (bool): Write content-hashed copies of static assets and reference them, see fingerprint_assets.
+
+    Returns:
+        BuildManifest | None: The saved manifest, or None if the build failed.
+    """
+    source_dir = site.static_dir
+    dest_dir = site.dest_dir
 
     # --- Preparation ---
     print("Starting static directory copy process...")
@@ -139,50 +807,293 @@ def main():
     print(f"Validating source: '{source_dir}'")
     if not os.path.exists(source_dir):
         print(f"❌ Error: Source directory '{source_dir}' does not exist. Aborting copy.")
-        return
+        return None
     if not os.path.isdir(source_dir):
         print(f"❌ Error: Source path '{source_dir}' is not a directory. Aborting copy.")
-        return
+        return None
     print("✅ Source directory validated.")
 
     print(f"Preparing destination: '{dest_dir}'")
-    if os.path.exists(dest_dir):
-        print(f"  Destination '{dest_dir}' exists. Clearing it first...")
-        try:
-            shutil.rmtree(dest_dir)
-            print(f"  Successfully cleared '{dest_dir}'.")
-        except OSError as e:
-            print(f"❌ Error clearing destination directory '{dest_dir}': {e}")
-            return
+    if full:
+        manifest = BuildManifest(site.manifest_file)
+        if os.path.exists(dest_dir):
+            print(f"  Full build requested. Clearing '{dest_dir}' first...")
+            try:
+                shutil.rmtree(dest_dir)
+                print(f"  Successfully cleared '{dest_dir}'.")
+            except OSError as e:
+                print(f"❌ Error clearing destination directory '{dest_dir}': {e}")
+                return None
+    else:
+        manifest = BuildManifest.load(site.manifest_file)
 
     try:
-        print(f"  Creating empty destination directory '{dest_dir}'...")
-        os.makedirs(dest_dir)
-        print(f"  Successfully created '{dest_dir}'.")
+        os.makedirs(dest_dir, exist_ok=True)
     except OSError as e:
         print(f"❌ Error creating destination directory '{dest_dir}': {e}")
-        return
+        return None
 
     # --- Copy Static Files ---
     try:
-        print("\n🚀 Starting recursive copy...")
-        copy_recursive(source_dir, dest_dir)
-        print("\n✅ Copy process completed successfully.")
+        print("\n🚀 Syncing static files...")
+        with profile_stage("static copy"):
+            copied, unchanged, removed = copy_static_incremental(source_dir, dest_dir, manifest, mode=static_mode)
+        print(f"✅ Static files: {copied} copied, {unchanged} unchanged, {removed} removed.")
     except Exception as e:
         print(f"\n❌ An error occurred during the copy process: {e}")
-        return  # Important: Exit if copying fails
+        return None  # Important: Exit if copying fails
+
+    # --- Images ---
+    if images:
+        print("\n🖼️ Processing images...")
+        try:
+            with profile_stage("images"):
+                counts = process_images(manifest, source_dir, dest_dir, _image_cache_dir(site),
+                                        workers=jobs, mode=static_mode)
+        except OSError as e:
+            print(f"❌ Error processing images: {e}")
+            return None
+        print(f"✅ Images: {counts['images']} images ({counts['measured']} measured, {counts['unchanged']} unchanged), "
+              f"{counts['resized']} variant(s) resized, {counts['cached']} from cache.")
+        if Image is None:
+            print("  Pillow is not installed: images get width and height but no srcset variants.")
+        enable_image_attributes(image_index(manifest), dest_dir)
+    else:
+        remove_image_variants(manifest, dest_dir)
+        disable_image_attributes()
+
+    # --- Asset fingerprints ---
+    if fingerprint:
+        try:
+            with profile_stage("asset fingerprints"):
+                counts = fingerprint_assets(manifest, source_dir, dest_dir, mode=static_mode)
+        except OSError as e:
+            print(f"❌ Error fingerprinting assets: {e}")
+            return None
+        print(f"✅ Assets: {counts['assets']} fingerprinted ({counts['written']} written, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed).")
+        enable_asset_rewrite(asset_map(manifest), dest_dir)
+    else:
+        remove_fingerprinted_assets(manifest, dest_dir)
+        disable_asset_rewrite()
+    if search:
+        enable_search_script()
+    else:
+        disable_search_script()
+
+    # --- Generate pages ---
+    print(f"\nGenerating pages from '{site.content_dir}' with {jobs} job(s)...")
+    try:
+        rendered, unchanged, removed = generate_pages_incremental(
+            site.content_dir, site.template_file, dest_dir, manifest, jobs=jobs, include_drafts=include_drafts
+        )
+    except (ValueError, OSError) as e:
+        print(f"❌ Error: {e}")
+        return None
+    print(f"Pages: {rendered} rendered, {unchanged} unchanged, {removed} removed.")
+    if images:
+        try:
+            with profile_stage("page links"):
+                _record_page_links(site.content_dir, manifest)
+        except OSError as e:
+            print(f"❌ Error recording the pages' images: {e}")
+            return None
+    index = MetadataIndex.from_manifest(manifest)
+    drafts = index.drafts()
+    if drafts:
+        print(f"Drafts: {len(drafts)} {'included' if include_drafts else 'skipped (use --drafts to render them)'}.")
+
+    if base_url:
+        try:
+            with profile_stage("sitemap and feeds"):
+                sitemap = write_sitemaps(index, dest_dir, base_url, manifest)
+                feeds = write_feeds(index, dest_dir, base_url, manifest, limit=feed_limit)
+        except OSError as e:
+            print(f"❌ Error writing the sitemap or feeds: {e}")
+            return None
+        print(f"Sitemap: {sitemap['urls']} URLs, {sitemap['written']} file(s) written, {sitemap['reused']} unchanged.")
+        print(f"Feeds: {feeds['entries']} entries, {feeds['written']} file(s) written, {feeds['reused']} unchanged.")
+    else:
+        remove_sitemaps(manifest, dest_dir)
+        remove_feeds(manifest, dest_dir)
+
+    if search:
+        try:
+            with profile_stage("search index"):
+                counts = write_search_index(index, site.content_dir, dest_dir, manifest)
+        except OSError as e:
+            print(f"❌ Error writing the search index: {e}")
+            return None
+        print(f"Search: {counts['pages']} pages ({counts['indexed']} indexed, {counts['unchanged']} unchanged), "
+              f"{counts['written']} shard(s) written, {counts['reused']} unchanged.")
+    else:
+        remove_search_index(manifest, dest_dir)
+
+    if link_check:
+        try:
+            with profile_stage("link check"):
+                report = check_links(index, site.content_dir, manifest)
+        except OSError as e:
+            print(f"❌ Error checking links: {e}")
+            return None
+        _print_link_report(report)
+
+    for name, cache in active_render_caches().items():
+        cache.prune()
+        print(f"Render cache ({name}): {cache.format_stats()}")
+
+    manifest.save()
+    return manifest
+
+
+def _print_link_report(report, limit: int = 50):
+    """Prints the link check's counts, then up to limit broken links and orphaned pages."""
+    print(f"Links: {report.links} internal links, {len(report.broken)} broken, "
+          f"{len(report.orphans)} orphaned page(s).")
+    for page, kind, target in report.broken[:limit]:
+        print(f"  ⚠️ {page}: broken {kind} '{target}'")
+    if len(report.broken) > limit:
+        print(f"  ... and {len(report.broken) - limit} more broken links")
+    for page in report.orphans[:limit]:
+        print(f"  ⚠️ {page}: no other page links here")
+    if len(report.orphans) > limit:
+        print(f"  ... and {len(report.orphans) - limit} more orphaned pages")
+
+
+def serve(site: SitePaths, manifest: BuildManifest, host: str, port: int,
+          watch: bool = False, poll_interval: float = 0.1, jobs: int = 1, static_mode: str = "copy",
+          include_drafts: bool = False, images: bool = False, fingerprint: bool = False):
+    """Serves site.dest_dir over HTTP until interrupted.
+
+    With watch, content/, static/ and the template are polled for changes;
+    only the affected outputs are rebuilt, then open pages are told to reload.
+    """
+    server = DevServer((host, port), site.dest_dir)
+    server.start()
+    print(f"Serving '{site.dest_dir}' at http://{host}:{server.server_port}/ (Ctrl+C to stop)")
+
+    try:
+        if watch:
+            _watch_and_rebuild(site, manifest, server, poll_interval, jobs, static_mode, include_drafts,
+                               images, fingerprint)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nStopping server.")
+    finally:
+        server.stop()
+
+
+def _watch_and_rebuild(site: SitePaths, manifest: BuildManifest, server: DevServer, poll_interval: float,
+                       jobs: int, static_mode: str, include_drafts: bool = False, images: bool = False,
+                       fingerprint: bool = False):
+    """Polls the site's inputs forever, rebuilding changed outputs and notifying live-reload clients."""
+    watcher = FileWatcher([site.content_dir, site.static_dir, site.template_file])
+    print("Watching for changes...")
+    while True:
+        time.sleep(poll_interval)
+        changed = watcher.poll()
+        if not changed:
+            continue
+        started = time.perf_counter()
+        try:
+            pages, static_files = rebuild_changed(changed, site, manifest, jobs, static_mode, include_drafts,
+                                                  images, fingerprint)
+            manifest.save()
+        except (ValueError, OSError) as e:
+            print(f"❌ Rebuild failed: {e}")
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"🔁 Rebuilt {pages} page(s), {static_files} static file(s) in {elapsed_ms:.0f} ms")
+        server.broadcaster.notify()
+
+
+def _report_profile(profiler, args, wall_time: float):
+    """Prints the per-stage and slowest-page tables and writes the requested profile files."""
+    print(f"\n⏱  Build profile ({wall_time:.3f} s wall)")
+    print(profiler.format_stage_table())
+    print(f"\nSlowest {args.profile_top} page(s):")
+    print(profiler.format_slowest_pages(args.profile_top))
+    profiler.write_report(args.profile_output, wall_time)
+    print(f"\nProfile report written to {args.profile_output}")
+    if args.profile_trace:
+        profiler.write_chrome_trace(args.profile_trace)
+        print(f"Chrome trace written to {args.profile_trace}")
 
-    # --- Generate index.html ---
-    print("\nGenerating index.html...")
-    generate_page(
-        from_path=os.path.join(content_dir, index_file),  # Use os.path.join
-        template_path=template_file,
-        dest_path=os.path.join(dest_dir, "index.html"),  #  Use os.path.join
-    )
-    print("Finished generating index.html")
 
+def main(argv=None):
+    """Main function to generate the website."""
+    args = parse_args(argv)
+
+    # NOTE: Original TextNode example kept from your code
+    print("Original TextNode example:")
+    node = TextNode("Example Text", TextType.LINK, "https://example.com")
+    print(node)
     print("-" * 30)
-    print("Script finished.")
+
+    # --- Configuration ---
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root_dir = os.path.dirname(current_script_dir)
+    site = SitePaths(
+        static_dir=os.path.join(project_root_dir, "static"),
+        content_dir=os.path.join(project_root_dir, "content"),  # Added content directory
+        template_file="template.html",  #  Added template file name
+        dest_dir=os.path.join(project_root_dir, "public"),
+        manifest_file=os.path.join(project_root_dir, ".cache", "build-manifest.json"),
+    )
+
+    select_renderer(args.renderer)
+    cache_dir = os.path.join(project_root_dir, ".cache")
+    if not args.no_render_cache:
+        enable_render_cache(
+            os.path.join(cache_dir, "fragments"),
+            max_disk_bytes=args.render_cache_size * 1024 * 1024,
+        )
+    if not args.no_highlight_cache:
+        enable_render_cache(
+            os.path.join(cache_dir, "highlight"),
+            max_disk_bytes=args.render_cache_size * 1024 * 1024,
+            name=HIGHLIGHT_CACHE,
+        )
+    highlight_pool = None
+    if args.highlight_workers:
+        highlight_pool = start_highlight_pool(args.highlight_workers, args.defer_highlight_lines)
+
+    profiler = enable_profiling() if args.profile else None
+    cprofiler = None
+    if args.profile_cprofile:
+        import cProfile
+        cprofiler = cProfile.Profile()
+        cprofiler.enable()
+    started = time.perf_counter()
+
+    try:
+        manifest = build_site(site, jobs=args.jobs, full=args.full, static_mode=args.static_mode,
+                              include_drafts=args.drafts, base_url=args.base_url, feed_limit=args.feed_limit,
+                              search=args.search, link_check=args.check_links,
+                              images=args.images, fingerprint=args.fingerprint_assets)
+
+        if cprofiler is not None:
+            cprofiler.disable()
+            cprofiler.dump_stats(args.profile_cprofile)
+            print(f"cProfile stats written to {args.profile_cprofile}")
+        if profiler is not None:
+            _report_profile(profiler, args, time.perf_counter() - started)
+            disable_profiling()
+
+        if manifest is None:
+            return
+
+        print("-" * 30)
+        print("Script finished.")
+
+        if args.command == "serve":
+            serve(site, manifest, args.host, args.port, watch=args.watch,
+                  poll_interval=args.poll_interval, jobs=args.jobs, static_mode=args.static_mode,
+                  include_drafts=args.drafts, images=args.images, fingerprint=args.fingerprint_assets)
+    finally:
+        if highlight_pool is not None:
+            highlight_pool.shutdown()
 
 
 
@@ -0,0 +1,113 @@
+import markdown
+from markdown.extensions import codehilite
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from highlight_cache import cached_highlighting, install_highlight_cache, resolve_deferred_highlights
+
+try:
+    import pygments
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    _PYGMENTS_VERSION = pygments.__version__
+except ImportError:
+    pygments = None
+    _PYGMENTS_VERSION = "none"
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'codehilite', 'tables']
+
+# Rendered fragments are cached per parser version: upgrading python-markdown
+# or Pygments, or changing the extensions, renders everything afresh.
+PARSER_VERSION = f"python-markdown {markdown.__version__}; {','.join(MARKDOWN_EXTENSIONS)}; pygments {_PYGMENTS_VERSION}"
+
+# Lexers loaded when a renderer is created, so the first page using them
+# doesn't pay for importing the lexer module.
+DEFAULT_WARM_LANGUAGES = ("text", "python", "bash", "javascript", "html", "css", "json")
+
+_UNKNOWN_LEXER = object()
+_lexers: Dict[Tuple, object] = {}
+_formatters: Dict[Tuple, object] = {}
+
+
+def _options_key(options: Dict) -> Tuple:
+    # Option values can be lists (hl_lines), so key on their reprs.
+    return tuple(sorted((name, repr(value)) for name, value in options.items()))
+
+
+def cached_lexer_by_name(alias: str, **options):
+    """
+    pygments.lexers.get_lexer_by_name, remembering the lexer per alias and options.
+
+    Lexers hold no per-document state, so one instance is reused for every
+    block. Unknown aliases are remembered too and raise ValueError again.
+    """
+    key = (alias, _options_key(options))
+    lexer = _lexers.get(key)
+    if lexer is None:
+        try:
+            lexer = get_lexer_by_name(alias, **options)
+        except ValueError:
+            lexer = _UNKNOWN_LEXER
+        _lexers[key] = lexer
+    if lexer is _UNKNOWN_LEXER:
+        raise ValueError(f"no lexer for alias {alias!r} found")
+    return lexer
+
+
+def cached_html_formatter(lang_str: str = None, **options):
+    """
+    codehilite pygments_formatter factory returning one HtmlFormatter per set of options.
+
+    Builds the same formatter as codehilite's default ('html'); building it
+    (its style tables in particular) costs more than highlighting a short
+    snippet, so it is built once and reused. lang_str is not used by
+    HtmlFormatter.
+    """
+    key = _options_key(options)
+    formatter = _formatters.get(key)
+    if formatter is None:
+        formatter = _formatters[key] = HtmlFormatter(**options)
+    return formatter
+
+
+class MarkdownRenderer:
+    """
+    Converts markdown to HTML with one reusable markdown.Markdown instance.
+
+    markdown.markdown() builds a new Markdown object, registering every
+    extension, for each call. The renderer builds it once and reset()s it
+    between documents, which gives the same HTML. Codehilite's Pygments
+    lexers and formatter are cached for the life of the process, and its
+    highlighting goes through highlight_cache (a no-op unless enabled).
+
+    A renderer is not thread-safe; use get_markdown_renderer() for the one
+    belonging to the current process.
+    """
+
+    def __init__(self, extensions: Sequence[str] = MARKDOWN_EXTENSIONS,
+                 warm_languages: Iterable[str] = DEFAULT_WARM_LANGUAGES):
+        extension_configs = {}
+        if pygments is not None:
+            # codehilite calls get_lexer_by_name by its module-level name.
+            codehilite.get_lexer_by_name = cached_lexer_by_name
+            extension_configs['codehilite'] = {'pygments_formatter': cached_html_formatter}
+        install_highlight_cache()
+        self._markdown = markdown.Markdown(extensions=list(extensions), extension_configs=extension_configs)
+        for language in warm_languages:
+            # Bypasses the highlight cache: only Pygments needs warming.
+            self._markdown.reset().convert(f"```{language}\n\n```")
+
+    def render(self, markdown_text: str) -> str:
+        with cached_highlighting():
+            html = self._markdown.reset().convert(markdown_text)
+        return resolve_deferred_highlights(html)
+
+
+_renderer: Optional[MarkdownRenderer] = None
+
+
+def get_markdown_renderer() -> MarkdownRenderer:
+    """Returns this process's renderer, creating it (and warming Pygments) on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = MarkdownRenderer()
+    return _renderer
@@ -1,4 +1,58 @@
-from typing import List
+from typing import Iterable, Iterator, List
+
+FENCE = '```'
+
+
+def _toggles_fence(line: str) -> bool:
+    """Returns True if line opens or closes a fenced code block."""
+    stripped = line.strip()
+    if not stripped.startswith(FENCE):
+        return False
+    # ```code``` on one line opens and closes the fence.
+    return not (len(stripped) >= 2 * len(FENCE) and stripped.endswith(FENCE))
+
+
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the blocks of a Markdown document one at a time, reading it line by line.
+
+    A block ends at an empty line, outside fenced code. Inside a ``` fence,
+    empty lines belong to the code block, so the whole fence is one block.
+    An unclosed fence runs to the end of the document. Leading/trailing
+    whitespace is stripped from each block and whitespace-only blocks are
+    skipped. Without fences the blocks are the same as markdown_to_blocks'
+    '\\n\\n' split.
+
+    Only the current block is held in memory, so a file object can be
+    passed directly to process documents larger than memory.
+
+    Args:
+        lines: An iterable of lines with or without their trailing '\\n',
+            such as an open text file.
+
+    Yields:
+        Each non-empty stripped block, in document order.
+    """
+    current: List[str] = []
+    in_fence = False
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        if not line and not in_fence:
+            if current:
+                block = '\n'.join(current).strip()
+                if block:
+                    yield block
+                current = []
+            continue
+        current.append(line)
+        if _toggles_fence(line):
+            in_fence = not in_fence
+    if current:
+        block = '\n'.join(current).strip()
+        if block:
+            yield block
+
 
 def markdown_to_blocks(markdown: str) -> List[str]:
     """
@@ -6,11 +60,16 @@ def markdown_to_blocks(markdown: str) -> List[str]:
 
     Blocks are separated by double newlines. Leading/trailing whitespace
     is stripped from each block, and empty blocks (resulting from
-    multiple double newlines or whitespace) are removed.
+    multiple double newlines or whitespace) are removed. A fenced code
+    block containing blank lines stays one block (see iter_markdown_blocks).
     """
     if not isinstance(markdown, str):
         raise TypeError("Input must be a string")
 
+    if FENCE in markdown:
+        return list(iter_markdown_blocks(markdown.split('\n')))
+
+    # No fences: the C-level split gives the same blocks, faster.
     blocks = markdown.split('\n\n')
 
     processed_blocks = []
@@ -19,4 +78,4 @@ def markdown_to_blocks(markdown: str) -> List[str]:
         if stripped_block:
             processed_blocks.append(stripped_block)
 
-    return processed_blocks
\ No newline at end of file
+    return processed_blocks
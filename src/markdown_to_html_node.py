@@ -1,5 +1,10 @@
 import enum
-from typing import List, Union
+import re
+from typing import Iterable, Iterator, List, Union
+
+from block_to_block_type import BlockType, block_to_block_type
+from html_escape import escape_attribute, escape_text
+from markdown_to_blocks import markdown_to_blocks
 
 class HTMLNodeType(enum.Enum):
     TEXT = 1
@@ -18,144 +23,280 @@ class HTMLNodeType(enum.Enum):
     UL = 14
     OL = 15
     LI = 16
+    P = 17
+    A = 18
+    IMG = 19
+
+# TEXT nodes are leaves and share one immutable empty children tuple;
+# every other node type gets its own list so blocks can append to it.
+_NO_CHILDREN = ()
 
 class HTMLNode:
+    """
+    A node of the in-house tree. text is a TEXT node's text, or the URL of
+    an A or IMG node; an A node's children are its link text, and an IMG
+    node's alt text is its one TEXT child.
+    """
+    __slots__ = ("node_type", "children", "text")
+
     def __init__(self, node_type: HTMLNodeType, children: List['HTMLNode'] = None, text: str = None):
         self.node_type = node_type
-        self.children = children or []
-        self.text = text
-
-def markdown_to_blocks(markdown: str) -> List[str]:
-    if not isinstance(markdown, str):
-        raise TypeError("Input must be a string")
-    blocks = markdown.split('\n\n')
-    processed_blocks = []
-    for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:
-            processed_blocks.append(stripped_block)
-    return processed_blocks
-
-class BlockType(enum.Enum):
-    PARAGRAPH = 1
-    HEADING = 2
-    CODE = 3
-    QUOTE = 4
-    UNORDERED_LIST = 5
-    ORDERED_LIST = 6
-
-def block_to_block_type(block: str) -> BlockType:
-    lines = block.splitlines()
-    if not lines:
-        return BlockType.PARAGRAPH
-    if lines[0].startswith('#'):
-        if lines[0].startswith('###### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('##### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('#### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('### '):
-          return BlockType.HEADING
-        elif lines[0].startswith('## '):
-          return BlockType.HEADING
-        elif lines[0].startswith('# '):
-          return BlockType.HEADING
-        else:
-          return BlockType.PARAGRAPH
-    if block.startswith('```'):
-        if block.endswith('```'):
-            if block.count('```') == 2:
-                if block.count('\n') == 0 or block.startswith('```\n') or block.endswith('\n```'):
-                    return BlockType.CODE
-                else:
-                    return BlockType.PARAGRAPH
-            else:
-                return BlockType.PARAGRAPH
+        if children:
+            self.children = children
+        elif node_type is HTMLNodeType.TEXT:
+            self.children = _NO_CHILDREN
         else:
-            return BlockType.PARAGRAPH
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
-    if all(line.startswith(f'{i+1}. ') for i, line in enumerate(lines)):
-        return BlockType.ORDERED_LIST
-    return BlockType.PARAGRAPH
+            self.children = []
+        self.text = text
 
 def text_node_to_html_node(text_node: str) -> HTMLNode:
     return HTMLNode(HTMLNodeType.TEXT, text=text_node)
 
+# Matches every inline delimiter, and a whole link or image with its
+# text and URL as groups 2 and 3; a single '*' is plain text.
+_INLINE_DELIMITER_RE = re.compile(r"\*\*|[_`]|(!?)\[([^\[\]]*)\]\(([^)]*)\)")
+
+_EMPHASIS_NODE_TYPES = {
+    '**': HTMLNodeType.STRONG,
+    '_': HTMLNodeType.EM,
+}
+
+def _append_text(children: List[HTMLNode], text: str) -> None:
+    """Appends text to children, extending the last node if it is already a TEXT run."""
+    if not text:
+        return
+    if children and children[-1].node_type == HTMLNodeType.TEXT:
+        children[-1].text += text
+    else:
+        children.append(text_node_to_html_node(text))
+
+def _extend_children(children: List[HTMLNode], more: List[HTMLNode]) -> None:
+    """Moves the nodes of more onto children, merging TEXT runs across the seam."""
+    if more and more[0].node_type == HTMLNodeType.TEXT:
+        _append_text(children, more[0].text)
+        more = more[1:]
+    children.extend(more)
+
+def _flanks(outside: str, inside: str) -> bool:
+    """
+    Returns True if a delimiter with these neighbouring characters can open
+    (outside before it, inside after it) or close (the other way round).
+    """
+    if not inside or inside.isspace():
+        return False
+    # Punctuation inside needs whitespace or punctuation outside.
+    return inside.isalnum() or not outside.isalnum()
+
 def text_to_children(text: str) -> List[HTMLNode]:
-        children = []
-        i = 0
-        while i < len(text):
-            # Check for **bold**
-            if text[i:i+2] == '**':
-                end = text.find('**', i + 2)
-                if end != -1:
-                    content = text[i+2:end]
-                    children.append(HTMLNode(HTMLNodeType.STRONG, children=text_to_children(content)))
-                    i = end + 2
-                    continue
-
-            # Check for _italic_ (Corrected condition)
-            elif text[i:i+1] == '_': # Check the single character at index i
-                end = text.find('_', i + 1) # Find the *next* single underscore
-                if end != -1:
-                    content = text[i+1:end] # Content is between i+1 and end
-                    children.append(HTMLNode(HTMLNodeType.EM, children=text_to_children(content)))
-                    i = end + 1 # Move index past the closing underscore
-                    continue
-
-            # Check for `code`
-            elif text[i:i+1] == '`':
-                end = text.find('`', i + 1)
-                if end != -1:
-                    content = text[i+1:end]
-                    # Code content is usually literal text, no recursive call needed
-                    children.append(HTMLNode(HTMLNodeType.CODE, children=[text_node_to_html_node(content)]))
-                    i = end + 1
-                    continue
-
-            # If no delimiter matched, append the current character as a text node
-            children.append(text_node_to_html_node(text[i]))
-            i += 1 # Move to the next character
-
-        return children
+    """
+    Parses inline markdown (**bold**, _italic_, `code`, links and images) into HTMLNodes.
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
-    blocks = markdown_to_blocks(markdown)
-    parent_node = HTMLNode(HTMLNodeType.DIV)
+    A single left-to-right scan over the delimiters with a delimiter stack:
+    an opener pushes a frame holding the children collected so far, and the
+    next delimiter of the same kind closes it, wrapping everything collected
+    since into a STRONG or EM node; a delimiter that cannot close opens a new
+    frame instead. Frames left open when another one closes, or at the end of
+    the text, are put back as literal text. As in
+    python-markdown, a delimiter followed by whitespace cannot open, one after
+    whitespace cannot close, and one between a word and punctuation only
+    opens or closes towards the word; the others stay literal. Code spans
+    are literal, run to the next backtick and lose surrounding whitespace.
+    A link or image is matched whole; link text is parsed on its own, alt
+    text is kept as is. Plain text between delimiters is emitted as one TEXT
+    node per run, never per character.
+
+    Raises:
+        ValueError: If an image has no URL or no alt text.
+    """
+    children: List[HTMLNode] = []
+    # Each frame is (delimiter, children of the enclosing level).
+    stack = []
+    # Open frames per delimiter.
+    open_delimiters = dict.fromkeys(_EMPHASIS_NODE_TYPES, 0)
+    has_closing_backtick = True
+    i = 0
+
+    for match in _INLINE_DELIMITER_RE.finditer(text):
+        start = match.start()
+        if start < i:
+            # Inside a code span consumed below.
+            continue
+        _append_text(children, text[i:start])
+        delimiter = match.group()
+        i = match.end()
+
+        if delimiter == '`':
+            end = text.find('`', i) if has_closing_backtick else -1
+            if end == -1:
+                # No later backtick can close anything either.
+                has_closing_backtick = False
+                _append_text(children, delimiter)
+                continue
+            children.append(HTMLNode(HTMLNodeType.CODE, children=[text_node_to_html_node(text[i:end].strip())]))
+            i = end + 1
+            continue
+
+        if delimiter[0] in '![':
+            bang, label, url = match.groups()
+            if bang:
+                if not url or not label:
+                    raise ValueError("Image requires both url and alt text.")
+                children.append(HTMLNode(HTMLNodeType.IMG, children=[text_node_to_html_node(label)], text=url))
+            else:
+                children.append(HTMLNode(HTMLNodeType.A, children=text_to_children(label), text=url))
+            continue
+
+        if not (open_delimiters[delimiter] and _flanks(text[i:i + 1], text[start - 1:start])):
+            if not _flanks(text[start - 1:start], text[i:i + 1]):
+                _append_text(children, delimiter)
+                continue
+            stack.append((delimiter, children))
+            open_delimiters[delimiter] += 1
+            children = []
+            continue
+
+        # Close the matching frame; any frame opened after it stays unmatched.
+        while True:
+            opener, parent = stack.pop()
+            open_delimiters[opener] -= 1
+            if opener == delimiter:
+                parent.append(HTMLNode(_EMPHASIS_NODE_TYPES[opener], children=children))
+                children = parent
+                break
+            _append_text(parent, opener)
+            _extend_children(parent, children)
+            children = parent
+
+    _append_text(children, text[i:])
+
+    while stack:
+        opener, parent = stack.pop()
+        _append_text(parent, opener)
+        _extend_children(parent, children)
+        children = parent
+
+    return children
+
+def iter_block_nodes(blocks: Iterable[str]) -> Iterator[HTMLNode]:
+    """
+    Yields the HTMLNode of each block as it is converted.
+
+    With iter_markdown_blocks over an open file, a document is converted
+    one block at a time instead of being built into a single tree:
+    iter_block_nodes(iter_markdown_blocks(f)).
+    """
     for block in blocks:
         block_type = block_to_block_type(block)
         if block_type == BlockType.PARAGRAPH:
-            parent_node.children.append(HTMLNode(HTMLNodeType.DIV, children=text_to_children(block)))
+            yield HTMLNode(HTMLNodeType.DIV, children=text_to_children(block))
         elif block_type == BlockType.HEADING:
             level = block.count('#', 0, block.find(' '))
             if level == 1:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H1, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H1, children=text_to_children(block[block.find(' ')+1:]))
             elif level == 2:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H2, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H2, children=text_to_children(block[block.find(' ')+1:]))
             elif level == 3:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H3, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H3, children=text_to_children(block[block.find(' ')+1:]))
             elif level == 4:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H4, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H4, children=text_to_children(block[block.find(' ')+1:]))
             elif level == 5:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H5, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H5, children=text_to_children(block[block.find(' ')+1:]))
             elif level == 6:
-                parent_node.children.append(HTMLNode(HTMLNodeType.H6, children=text_to_children(block[block.find(' ')+1:])))
+                yield HTMLNode(HTMLNodeType.H6, children=text_to_children(block[block.find(' ')+1:]))
         elif block_type == BlockType.CODE:
-            parent_node.children.append(HTMLNode(HTMLNodeType.PRE, children=[HTMLNode(HTMLNodeType.CODE, children=[text_node_to_html_node(block[3:-3] if block.endswith('```') else block[3:])])]))
+            yield HTMLNode(HTMLNodeType.PRE, children=[HTMLNode(HTMLNodeType.CODE, children=[text_node_to_html_node(block[3:-3] if block.endswith('```') else block[3:])])])
         elif block_type == BlockType.QUOTE:
-            parent_node.children.append(HTMLNode(HTMLNodeType.BLOCKQUOTE, children=text_to_children('\n'.join([line[2:] for line in block.splitlines()]))))
+            yield HTMLNode(HTMLNodeType.BLOCKQUOTE, children=text_to_children('\n'.join([line[2:] for line in block.splitlines()])))
         elif block_type == BlockType.UNORDERED_LIST:
             list_node = HTMLNode(HTMLNodeType.UL)
             for line in block.splitlines():
                 list_node.children.append(HTMLNode(HTMLNodeType.LI, children=text_to_children(line[2:])))
-            parent_node.children.append(list_node)
+            yield list_node
         elif block_type == BlockType.ORDERED_LIST:
             list_node = HTMLNode(HTMLNodeType.OL)
             for line in block.splitlines():
                 list_node.children.append(HTMLNode(HTMLNodeType.LI, children=text_to_children(line[line.find('.')+2:])))
-            parent_node.children.append(list_node)
-    return parent_node
\ No newline at end of file
+            yield list_node
+
+def markdown_to_html_node(markdown: str) -> HTMLNode:
+    return HTMLNode(HTMLNodeType.DIV, children=list(iter_block_nodes(markdown_to_blocks(markdown))))
+
+# The element each HTMLNodeType serializes to; TEXT nodes are bare text,
+# and A and IMG nodes also carry their URL (see _open_tag).
+HTML_TAGS = {
+    HTMLNodeType.EM: "em",
+    HTMLNodeType.STRONG: "strong",
+    HTMLNodeType.CODE: "code",
+    HTMLNodeType.DIV: "div",
+    HTMLNodeType.H1: "h1",
+    HTMLNodeType.H2: "h2",
+    HTMLNodeType.H3: "h3",
+    HTMLNodeType.H4: "h4",
+    HTMLNodeType.H5: "h5",
+    HTMLNodeType.H6: "h6",
+    HTMLNodeType.PRE: "pre",
+    HTMLNodeType.BLOCKQUOTE: "blockquote",
+    HTMLNodeType.UL: "ul",
+    HTMLNodeType.OL: "ol",
+    HTMLNodeType.LI: "li",
+    HTMLNodeType.P: "p",
+    HTMLNodeType.A: "a",
+    HTMLNodeType.IMG: "img",
+}
+_OPEN_TAGS = {node_type: f"<{tag}>" for node_type, tag in HTML_TAGS.items()}
+_CLOSE_TAGS = {node_type: f"</{tag}>" for node_type, tag in HTML_TAGS.items()}
+
+def _open_tag(node: HTMLNode) -> str:
+    if node.node_type is HTMLNodeType.A:
+        return f'<a href="{escape_attribute(node.text)}">'
+    return _OPEN_TAGS[node.node_type]
+
+def _image_tag(node: HTMLNode) -> str:
+    alt = ''.join(child.text for child in node.children)
+    return f'<img alt="{escape_attribute(alt)}" src="{escape_attribute(node.text)}" />'
+
+def _write_nodes(nodes: Iterable[HTMLNode], parts: List[str]) -> None:
+    """
+    Appends the HTML of nodes and their descendants to parts, escaping each run of adjacent TEXT nodes once.
+
+    Walks the tree with an explicit stack of child iterators, like
+    htmlnode.iter_html, so deeply nested documents can't overflow the call
+    stack.
+    """
+    # Each entry is (iterator over remaining siblings, closing tag of their parent).
+    stack = [(iter(nodes), None)]
+    text_run = []
+    while stack:
+        siblings, closing_tag = stack[-1]
+        child = next(siblings, None)
+        if child is not None and child.node_type is HTMLNodeType.TEXT:
+            if child.text:
+                text_run.append(child.text)
+            continue
+        if text_run:
+            parts.append(escape_text(''.join(text_run)))
+            text_run = []
+        if child is None:
+            stack.pop()
+            if closing_tag is not None:
+                parts.append(closing_tag)
+        elif child.node_type is HTMLNodeType.IMG:
+            parts.append(_image_tag(child))
+        else:
+            parts.append(_open_tag(child))
+            stack.append((iter(child.children), _CLOSE_TAGS[child.node_type]))
+
+def html_node_to_html(node: HTMLNode) -> str:
+    """
+    Serializes an HTMLNode tree to an HTML string.
+
+    One walk over the tree appends precomputed open and close tags to a list
+    that is joined once at the end; text is escaped per run of adjacent TEXT
+    nodes, not per node.
+    """
+    parts = []
+    _write_nodes((node,), parts)
+    return ''.join(parts)
+
+def markdown_to_html(markdown: str) -> str:
+    return html_node_to_html(markdown_to_html_node(markdown))
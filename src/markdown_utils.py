@@ -1,5 +1,8 @@
 import re
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[(.*?)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text):
     """
     Extracts markdown image URLs and alt text from a given string.
@@ -10,9 +13,7 @@ def extract_markdown_images(text):
     Returns:
         list: A list of tuples, where each tuple contains (alt_text, url).
     """
-    image_pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(image_pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
     """
@@ -24,6 +25,4 @@ def extract_markdown_links(text):
     Returns:
         list: A list of tuples, where each tuple contains (link_text, url).
     """
-    link_pattern = r"(?<!!)\[(.*?)\]\(([^\(\)]*)\)"
-    matches = re.findall(link_pattern, text)
-    return matches
\ No newline at end of file
+    return LINK_PATTERN.findall(text)
\ No newline at end of file
@@ -0,0 +1,263 @@
+import datetime
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from front_matter import FrontMatterError, read_front_matter
+
+# Manifest section holding each page's metadata, with the size and mtime it was read at.
+METADATA_SECTION = "metadata"
+
+DEFAULT_TITLE = "Untitled"
+INDEX_PAGE = "index.html"
+
+# The first line that is "# " followed by text, ignoring surrounding whitespace.
+_TITLE_RE = re.compile(r"^[^\S\n]*# [^\S\n]*(\S[^\n]*)", re.MULTILINE)
+
+
+def find_title(markdown: str) -> Optional[str]:
+    """
+    Returns the text of the first "# " heading in markdown, or None.
+
+    One regex search instead of splitting the whole document into lines.
+    """
+    match = _TITLE_RE.search(markdown)
+    return match.group(1).strip() if match else None
+
+
+def _line_title(line: str) -> Optional[str]:
+    stripped = line.strip()
+    if stripped.startswith("# "):
+        return stripped[2:].strip()
+    return None
+
+
+class PageMetadata(NamedTuple):
+    """What the site needs to know about a page without rendering it."""
+    key: str
+    url: str
+    title: str
+    date: Optional[str]
+    tags: Tuple[str, ...]
+    draft: bool
+
+    def to_entry(self, size: int, mtime_ns: int) -> Dict:
+        return {
+            "size": size, "mtime_ns": mtime_ns, "url": self.url, "title": self.title,
+            "date": self.date, "tags": list(self.tags), "draft": self.draft,
+        }
+
+    @classmethod
+    def from_entry(cls, key: str, entry: Dict) -> "PageMetadata":
+        return cls(key, entry["url"], entry["title"], entry["date"], tuple(entry["tags"]), entry["draft"])
+
+
+def parse_datetime(value: str) -> Optional[datetime.datetime]:
+    """An ISO 8601 date or datetime as a timezone-aware datetime (UTC unless it says otherwise), or None."""
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def page_datetime(page: PageMetadata) -> Optional[datetime.datetime]:
+    """The page's date as a timezone-aware datetime, or None if missing or unparsable."""
+    return parse_datetime(page.date) if page.date else None
+
+
+def page_url(dest_path: str, dest_dir: str) -> str:
+    """The site-relative URL of an output page; an index.html is served as its directory."""
+    relative = Path(os.path.relpath(dest_path, dest_dir)).as_posix()
+    if relative == INDEX_PAGE:
+        return "/"
+    if relative.endswith("/" + INDEX_PAGE):
+        return "/" + relative[:-len(INDEX_PAGE)]
+    return "/" + relative
+
+
+def _normalise_date(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _normalise_tags(value) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return tuple(tag.strip() for tag in value.split(",") if tag.strip())
+    return tuple(str(tag) for tag in value)
+
+
+def _template_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_template_value(item) for item in value)
+    return str(value)
+
+
+def template_values(metadata: Dict) -> Dict[str, str]:
+    """
+    A page's front matter as template slot values: dates as ISO 8601 text, lists joined with ", ".
+
+    Each key also fills the slot named with its first letter capitalised, so
+    "author: Tolkien" fills {{ author }} and {{ Author }}; a key written in
+    both forms keeps its own value.
+    """
+    values = {}
+    for key, value in metadata.items():
+        key = str(key)
+        text = _template_value(value)
+        values[key] = text
+        values.setdefault(key[:1].upper() + key[1:], text)
+    return values
+
+
+_TRUE_STRINGS = ("true", "yes", "on", "1")
+_FALSE_STRINGS = ("false", "no", "off", "0", "")
+
+
+def _normalise_flag(name: str, value) -> bool:
+    """A boolean front matter value; quoted strings like "false" are read by their meaning, not their truthiness."""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+        raise FrontMatterError(f"{name} must be true or false, not {value!r}")
+    return bool(value)
+
+
+def read_page_metadata(path: str, key: str, url: str) -> PageMetadata:
+    """
+    Reads a page's metadata from its front matter, without reading its body.
+
+    Only the front matter is read, plus the body up to the first "# "
+    heading when the front matter has no title.
+
+    Raises:
+        FrontMatterError: If the page's front matter is unclosed or invalid.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        metadata, body_lines = read_front_matter(f)
+        title = metadata.get("title")
+        if not title:
+            title = next(filter(None, map(_line_title, body_lines)), None) or DEFAULT_TITLE
+    return PageMetadata(
+        key=key,
+        url=url,
+        title=str(title),
+        date=_normalise_date(metadata.get("date")),
+        tags=_normalise_tags(metadata.get("tags")),
+        draft=_normalise_flag("draft", metadata.get("draft")),
+    )
+
+
+class MetadataIndex:
+    """
+    The metadata of every page of the site, keyed like the manifest's pages.
+
+    Built in one cheap pass before rendering, and kept in the build manifest
+    so unchanged pages aren't read again. Listings, feeds and sitemaps use it
+    instead of parsing page bodies.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, PageMetadata]] = None):
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def from_manifest(cls, manifest) -> "MetadataIndex":
+        return cls({key: PageMetadata.from_entry(key, manifest.get(METADATA_SECTION, key))
+                    for key in manifest.keys(METADATA_SECTION)})
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def __iter__(self) -> Iterator[PageMetadata]:
+        return (self.pages[key] for key in sorted(self.pages))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.pages
+
+    def get(self, key: str) -> Optional[PageMetadata]:
+        return self.pages.get(key)
+
+    def update_page(self, path: str, key: str, url: str, manifest=None) -> PageMetadata:
+        """
+        Returns the page's metadata, reading it only if the file changed since it was indexed.
+
+        Raises:
+            FrontMatterError: If the page's front matter is unclosed or invalid.
+        """
+        stat = os.stat(path)
+        previous = manifest.get(METADATA_SECTION, key) if manifest is not None else None
+        if (previous
+                and previous.get("size") == stat.st_size
+                and previous.get("mtime_ns") == stat.st_mtime_ns
+                and previous.get("url") == url):
+            page = PageMetadata.from_entry(key, previous)
+        else:
+            page = read_page_metadata(path, key, url)
+        self.pages[key] = page
+        if manifest is not None:
+            manifest.set(METADATA_SECTION, key, page.to_entry(stat.st_size, stat.st_mtime_ns))
+        return page
+
+    def remove_page(self, key: str, manifest=None):
+        self.pages.pop(key, None)
+        if manifest is not None:
+            manifest.pop(METADATA_SECTION, key)
+
+    def published(self) -> List[PageMetadata]:
+        """Pages that aren't drafts, newest first (undated pages last, by key)."""
+        pages = [page for page in self if not page.draft]
+        pages.sort(key=lambda page: page.date or "", reverse=True)
+        return pages
+
+    def drafts(self) -> List[PageMetadata]:
+        return [page for page in self if page.draft]
+
+    def by_tag(self) -> Dict[str, List[PageMetadata]]:
+        """Published pages per tag, newest first."""
+        tags: Dict[str, List[PageMetadata]] = {}
+        for page in self.published():
+            for tag in page.tags:
+                tags.setdefault(tag, []).append(page)
+        return tags
+
+
+def build_metadata_index(pages: Iterable[Tuple[str, str]], content_dir: str, dest_dir: str,
+                         manifest=None) -> MetadataIndex:
+    """
+    Indexes every (markdown path, html path) page, reusing the manifest's entries for unchanged files.
+
+    Entries of pages that no longer exist are dropped from the manifest. A
+    page with invalid front matter is reported and left out of the index;
+    rendering it reports the error again.
+    """
+    index = MetadataIndex()
+    for source_path, dest_path in pages:
+        key = Path(os.path.relpath(source_path, content_dir)).as_posix()
+        try:
+            index.update_page(source_path, key, page_url(dest_path, dest_dir), manifest)
+        except FrontMatterError as e:
+            print(f"Error: invalid front matter in {source_path}: {e}")
+    if manifest is not None:
+        for key in list(manifest.keys(METADATA_SECTION)):
+            if key not in index:
+                manifest.pop(METADATA_SECTION, key)
+    return index
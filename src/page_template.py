@@ -0,0 +1,86 @@
+import os
+import re
+from typing import Dict, List, Mapping, Optional, TextIO, Tuple
+
+# {{ Name }} with optional whitespace inside the braces.
+SLOT_RE = re.compile(r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}")
+
+
+class PageTemplate:
+    """
+    An HTML template parsed once into literal text and {{ Name }} slots.
+
+    Rendering fills the slots from a context mapping. A slot with no value in
+    the context is left exactly as written in the template.
+    """
+
+    __slots__ = ("path", "segments", "slots")
+
+    def __init__(self, source: str, path: Optional[str] = None):
+        self.path = path
+        # Literal text and slot placeholders alternate; slots holds
+        # (index in segments, slot name) for each placeholder.
+        self.segments: List[str] = []
+        self.slots: List[Tuple[int, str]] = []
+
+        last_end = 0
+        for match in SLOT_RE.finditer(source):
+            self.segments.append(source[last_end:match.start()])
+            self.slots.append((len(self.segments), match.group(1)))
+            self.segments.append(match.group(0))
+            last_end = match.end()
+        self.segments.append(source[last_end:])
+
+    @property
+    def slot_names(self) -> List[str]:
+        return [name for _, name in self.slots]
+
+    def fill(self, context: Mapping[str, str]) -> List[str]:
+        """Returns the template pieces with slots filled in, ready to be joined or written in order."""
+        parts = list(self.segments)
+        for index, name in self.slots:
+            value = context.get(name)
+            if value is not None:
+                parts[index] = str(value)
+        return parts
+
+    def render(self, context: Mapping[str, str]) -> str:
+        """Returns the filled-in template as one string."""
+        return "".join(self.fill(context))
+
+    def render_to(self, stream: TextIO, context: Mapping[str, str]) -> None:
+        """Writes the filled-in template to a text stream piece by piece, without joining it first."""
+        for part in self.fill(context):
+            if part:
+                stream.write(part)
+
+
+# path -> (mtime_ns, size, PageTemplate)
+_template_cache: Dict[str, Tuple[int, int, PageTemplate]] = {}
+
+
+def load_template(path: str) -> PageTemplate:
+    """
+    Returns the compiled template at path, parsing it only when it changed.
+
+    Templates are cached per process by absolute path, and re-read only when
+    the file's mtime or size differs from the cached copy, so every page of a
+    build (or of a worker process) shares one PageTemplate.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    cached = _template_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(key, "r", encoding="utf-8") as f:
+        template = PageTemplate(f.read(), path=key)
+    _template_cache[key] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
+
+
+def clear_template_cache() -> None:
+    _template_cache.clear()
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Part of every key; bump it when cached fragments must no longer be reused.
+RENDER_CACHE_VERSION = 1
+
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+_FRAGMENT_SUFFIX = ".html"
+_STAT_NAMES = ("memory_hits", "disk_hits", "misses", "memory_evictions", "disk_evictions")
+
+
+def fragment_key(text: str, parser_version: str) -> str:
+    """Returns the content address of text rendered by the given parser version."""
+    digest = hashlib.sha256(f"{RENDER_CACHE_VERSION}\0{parser_version}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered HTML fragments.
+
+    Fragments are looked up by fragment_key(text, parser_version): identical
+    markdown rendered by the same parser shares one entry, whichever page it
+    came from. Entries live in an in-memory LRU bounded by max_memory_bytes
+    (counted as fragment lengths in characters) and, if directory is given,
+    in one file per key under it, so later builds reuse them. The disk tier
+    is bounded by prune(), which deletes the least recently used files; it
+    is safe to share between processes.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self.stats: Dict[str, int] = dict.fromkeys(_STAT_NAMES, 0)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + _FRAGMENT_SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached fragment for key, or None."""
+        html = self._memory.get(key)
+        if html is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return html
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    html = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                try:
+                    # Mark it recently used for prune().
+                    os.utime(path)
+                except OSError:
+                    pass
+                self.stats["disk_hits"] += 1
+                self._remember(key, html)
+                return html
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, html: str):
+        """Stores a fragment in memory and, atomically, on disk."""
+        self._remember(key, html)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".fragment-", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_or_render(self, text: str, parser_version: str, render: Callable[[str], str]) -> str:
+        """Returns the cached fragment for text, calling render(text) and caching the result on a miss."""
+        key = fragment_key(text, parser_version)
+        html = self.get(key)
+        if html is None:
+            html = render(text)
+            self.put(key, html)
+        return html
+
+    def _remember(self, key: str, html: str):
+        if len(html) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = html
+        self._memory_bytes += len(html)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["memory_evictions"] += 1
+
+    def prune(self) -> int:
+        """
+        Deletes the least recently used fragment files until the disk tier fits max_disk_bytes.
+
+        Returns:
+            The number of files deleted.
+        """
+        if self.directory is None or not os.path.isdir(self.directory):
+            return 0
+        entries = []
+        total = 0
+        for dir_path, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                if not file_name.endswith(_FRAGMENT_SUFFIX):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self.stats["disk_evictions"] += removed
+        return removed
+
+    def drain_stats(self) -> Dict[str, int]:
+        """Returns and resets the counters."""
+        stats, self.stats = self.stats, dict.fromkeys(_STAT_NAMES, 0)
+        return stats
+
+    def add_stats(self, stats: Dict[str, int]):
+        for name, count in stats.items():
+            self.stats[name] = self.stats.get(name, 0) + count
+
+    def format_stats(self) -> str:
+        stats = self.stats
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hit_rate = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return (
+            f"{stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+            f"{stats['misses']} misses ({hit_rate:.0%} hit rate), "
+            f"{stats['memory_evictions']} memory / {stats['disk_evictions']} disk evictions"
+        )
+
+
+# The enabled caches of this process, by name (e.g. "fragments", "highlight").
+_active_caches: Dict[str, RenderCache] = {}
+
+FRAGMENT_CACHE = "fragments"
+
+
+def enable_render_cache(directory: Optional[str] = None,
+                        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                        name: str = FRAGMENT_CACHE) -> RenderCache:
+    """Enables the named cache in this process and returns it."""
+    cache = RenderCache(directory, max_memory_bytes, max_disk_bytes)
+    _active_caches[name] = cache
+    return cache
+
+
+def disable_render_cache(name: str = FRAGMENT_CACHE):
+    _active_caches.pop(name, None)
+
+
+def get_render_cache(name: str = FRAGMENT_CACHE) -> Optional[RenderCache]:
+    return _active_caches.get(name)
+
+
+def active_render_caches() -> Dict[str, RenderCache]:
+    """Returns the enabled caches by name."""
+    return dict(_active_caches)
+
+
+def drain_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Returns and resets the counters of every enabled cache, by name ({} when none is enabled)."""
+    return {name: cache.drain_stats() for name, cache in _active_caches.items()}
@@ -0,0 +1,162 @@
+"""
+Renders markdown files with two renderers and diffs their HTML.
+
+    python3 src/renderer_parity.py content/
+    python3 src/renderer_parity.py --left python-markdown --right native --diff notes.md
+
+Each file is reported as identical (the same bytes), equivalent (the same
+markup once whitespace between block tags, attribute order, entity
+spelling and <x> versus <x /> are normalised away) or different. Equivalent
+files are listed as warnings, with the raw diff under --diff, and fail the
+run under --strict; different files get a unified diff of the normalised
+HTML. Exits 1 if any file differs, so it can guard changes to either
+renderer.
+"""
+import argparse
+import difflib
+import html
+import os
+import sys
+from html.parser import HTMLParser
+from typing import Iterator, List, Tuple
+
+from renderers import RENDERERS, get_renderer
+
+IDENTICAL = "identical"
+EQUIVALENT = "equivalent"
+DIFFERENT = "different"
+
+_BLOCK_TAGS = {"blockquote", "div", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "li", "ol", "p", "pre",
+               "table", "tbody", "td", "th", "thead", "tr", "ul"}
+
+
+class _Normaliser(HTMLParser):
+    """Rewrites HTML into one token per line in a canonical spelling."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.lines: List[str] = []
+        self._pre_depth = 0
+        # Text since the last tag; entities split it in one renderer's output only.
+        self._text: List[str] = []
+
+    def _start(self, tag, attrs):
+        attributes = "".join(f' {name}="{value or ""}"' for name, value in sorted(attrs))
+        return tag, f"<{tag}{attributes}>"
+
+    def _flush_text(self):
+        text = "".join(self._text)
+        self._text = []
+        # Whitespace-only text between block tags isn't rendered.
+        if not text or (not self._pre_depth and not text.strip() and self._after_block()):
+            return
+        self.lines.append(repr(text))
+
+    def _after_block(self):
+        if not self.lines:
+            return True
+        last = self.lines[-1].lstrip("</").split(">")[0].split(" ")[0]
+        return last in _BLOCK_TAGS
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        tag, text = self._start(tag, attrs)
+        if tag == "pre":
+            self._pre_depth += 1
+        self.lines.append(text)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        self.lines.append(self._start(tag, attrs)[1])
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag == "pre":
+            self._pre_depth -= 1
+        self.lines.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_entityref(self, name):
+        self._text.append(html.unescape(f"&{name};"))
+
+    def handle_charref(self, name):
+        self._text.append(html.unescape(f"&#{name};"))
+
+    def handle_comment(self, data):
+        self._flush_text()
+        self.lines.append(f"<!--{data}-->")
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+
+def normalise_html(html_text: str) -> List[str]:
+    """The canonical token lines of html_text, compared to decide equivalence."""
+    parser = _Normaliser()
+    parser.feed(html_text)
+    parser.close()
+    return parser.lines
+
+
+def compare(markdown_text: str, left: str, right: str) -> Tuple[str, List[str]]:
+    """
+    Renders markdown_text with the left and right renderers.
+
+    Returns:
+        tuple[str, list[str]]: IDENTICAL, EQUIVALENT or DIFFERENT, and a
+        unified diff: of the raw HTML if EQUIVALENT, so what was normalised
+        away can be seen, of the normalised HTML if DIFFERENT, else [].
+    """
+    left_html = get_renderer(left).render(markdown_text)
+    right_html = get_renderer(right).render(markdown_text)
+    if left_html == right_html:
+        return IDENTICAL, []
+    left_lines, right_lines = normalise_html(left_html), normalise_html(right_html)
+    if left_lines == right_lines:
+        return EQUIVALENT, list(difflib.unified_diff(left_html.splitlines(), right_html.splitlines(),
+                                                     left, right, lineterm=""))
+    return DIFFERENT, list(difflib.unified_diff(left_lines, right_lines, left, right, lineterm=""))
+
+
+def iter_markdown_files(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".md"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff the HTML two markdown renderers produce for the same files.")
+    parser.add_argument("paths", nargs="*", default=["content"], help="markdown files or directories (default: content)")
+    parser.add_argument("--left", choices=sorted(RENDERERS), default="python-markdown")
+    parser.add_argument("--right", choices=sorted(RENDERERS), default="native")
+    parser.add_argument("--diff", action="store_true", help="print the diff of every file that isn't identical")
+    parser.add_argument("--strict", action="store_true", help="fail on equivalent files too: compare the raw HTML")
+    args = parser.parse_args(argv)
+
+    counts = {IDENTICAL: 0, EQUIVALENT: 0, DIFFERENT: 0}
+    for path in iter_markdown_files(args.paths):
+        with open(path, "r", encoding="utf-8") as f:
+            markdown_text = f.read()
+        result, diff = compare(markdown_text, args.left, args.right)
+        counts[result] += 1
+        if result == EQUIVALENT:
+            print(f"{path}: warning: {result} only after normalising the HTML")
+        elif result == DIFFERENT:
+            print(f"{path}: {result}")
+        if diff and args.diff:
+            print("\n".join(diff))
+    print(", ".join(f"{count} {result}" for result, count in counts.items()))
+    return 1 if counts[DIFFERENT] or (args.strict and counts[EQUIVALENT]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+import re
+from typing import Dict, List, Optional
+
+try:
+    from typing import Protocol
+except ImportError:  # Python < 3.8
+    Protocol = object
+
+from block_to_block_type import BlockType, block_to_block_type
+from build_profiler import profile_stage
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html_node import HTMLNode, HTMLNodeType, html_node_to_html, text_node_to_html_node, text_to_children
+from render_cache import fragment_key, get_render_cache
+
+# Bump when NativeRenderer's output changes, so cached fragments are re-rendered.
+NATIVE_RENDERER_VERSION = 5
+
+
+class Renderer(Protocol):
+    """
+    Converts one markdown document to an HTML fragment.
+
+    name is what --renderer selects it by; version changes whenever the
+    renderer's output for the same markdown may change, and is used as the
+    render cache's parser version.
+    """
+
+    name: str
+    version: str
+
+    def render(self, markdown_text: str, page: Optional[str] = None) -> str:
+        """page is the source file being rendered, for the build profiler."""
+        ...
+
+
+class PythonMarkdownRenderer:
+    """The python-markdown pipeline (fenced_code, codehilite, tables), one reused instance per process."""
+
+    name = "python-markdown"
+
+    def __init__(self):
+        # Imported here so the native renderer works without python-markdown.
+        from markdown_renderer import PARSER_VERSION, get_markdown_renderer
+        self.version = PARSER_VERSION
+        self._markdown = get_markdown_renderer()
+
+    def render(self, markdown_text: str, page: Optional[str] = None) -> str:
+        return self._markdown.render(markdown_text)
+
+
+_HEADING_TYPES = (HTMLNodeType.H1, HTMLNodeType.H2, HTMLNodeType.H3,
+                  HTMLNodeType.H4, HTMLNodeType.H5, HTMLNodeType.H6)
+
+
+def _on_own_lines(nodes: List[HTMLNode]) -> List[HTMLNode]:
+    """nodes with a newline before each and after the last, as python-markdown lays out block children."""
+    children = [text_node_to_html_node('\n')]
+    for node in nodes:
+        children += [node, text_node_to_html_node('\n')]
+    return children
+
+
+def _code_text(block: str) -> str:
+    """The code between a fenced block's fences, without the opening fence line (and its language)."""
+    first_newline = block.find('\n')
+    if first_newline == -1:
+        return block[3:-3]
+    return block[first_newline + 1:-3]
+
+
+class NativeRenderer:
+    """
+    The in-house pipeline: markdown_to_blocks, block_to_block_type and
+    text_to_children into markdown_to_html_node's HTMLNodeType trees,
+    serialized by html_node_to_html.
+
+    Supports headings, paragraphs, quotes, '-' and '1.' lists, fenced code
+    (not highlighted) and **bold**, _italic_, `code`, links and images.
+    Each pipeline stage is recorded by the build profiler when it is enabled,
+    nested in the caller's "markdown render" stage.
+
+    Blocks render independently of each other, so with the render cache
+    enabled each block is cached on its own: a block shared by different
+    pages (a license notice, a standard footer) is converted once.
+    """
+
+    name = "native"
+    version = f"native {NATIVE_RENDERER_VERSION}"
+    # The render cache's parser version for single blocks, apart from whole documents.
+    block_version = f"{version} block"
+
+    def block_node(self, block: str, block_type: BlockType) -> HTMLNode:
+        if block_type == BlockType.HEADING:
+            level = block.find(' ')
+            return HTMLNode(_HEADING_TYPES[level - 1], text_to_children(block[level + 1:]))
+        if block_type == BlockType.CODE:
+            code = HTMLNode(HTMLNodeType.CODE, [text_node_to_html_node(_code_text(block))])
+            return HTMLNode(HTMLNodeType.PRE, [code])
+        if block_type == BlockType.QUOTE:
+            text = '\n'.join(line[1:].lstrip(' ') for line in block.splitlines())
+            return HTMLNode(HTMLNodeType.BLOCKQUOTE, _on_own_lines([HTMLNode(HTMLNodeType.P, text_to_children(text))]))
+        if block_type == BlockType.UNORDERED_LIST:
+            return HTMLNode(HTMLNodeType.UL, _on_own_lines([
+                HTMLNode(HTMLNodeType.LI, text_to_children(line[2:])) for line in block.splitlines()
+            ]))
+        if block_type == BlockType.ORDERED_LIST:
+            return HTMLNode(HTMLNodeType.OL, _on_own_lines([
+                HTMLNode(HTMLNodeType.LI, text_to_children(line[line.find('. ') + 2:])) for line in block.splitlines()
+            ]))
+        return HTMLNode(HTMLNodeType.P, text_to_children(block))
+
+    def render(self, markdown_text: str, page: Optional[str] = None) -> str:
+        with profile_stage("markdown_to_blocks", page):
+            blocks = markdown_to_blocks(markdown_text)
+        cache = get_render_cache()
+        if cache is None:
+            html_blocks = [None] * len(blocks)
+        else:
+            keys = [fragment_key(block, self.block_version) for block in blocks]
+            html_blocks = [cache.get(key) for key in keys]
+        missing = [index for index, html in enumerate(html_blocks) if html is None]
+        with profile_stage("block typing", page):
+            block_types = [block_to_block_type(blocks[index]) for index in missing]
+        with profile_stage("inline parsing", page):
+            nodes = [self.block_node(blocks[index], block_type) for index, block_type in zip(missing, block_types)]
+        with profile_stage("html serialization", page):
+            for index, node in zip(missing, nodes):
+                html_blocks[index] = html_node_to_html(node)
+                if cache is not None:
+                    cache.put(keys[index], html_blocks[index])
+        return '\n'.join(html_blocks)
+
+
+# Markdown the native pipeline renders differently from python-markdown, or
+# not at all: fenced/indented code (highlighted by codehilite), tables, '*'
+# and '+' lists, blocks nested in lists and quotes, blank or indented quote
+# lines, raw HTML and entities, reference links, link titles, nested
+# brackets (linked images among them), an odd number of backticks in link
+# text, setext headings, rules (also inside list items), hard line breaks,
+# tabs and trailing spaces, backslash escapes, single-'*' emphasis,
+# intraword '_', double backtick code spans, empty link text, alt text or
+# emphasis, closing '#'s, empty headings, headings without a space or with
+# several, and indented headings and quotes.
+_PYTHON_MARKDOWN_ONLY_RE = re.compile(
+    r"""
+      ^[ \t]*```
+    | ^[ \t]*\|
+    | \|[ \t]*$
+    | ^[ \t]*[*+][ \t]
+    | ^(?:[ ]{4}|\t)
+    | ^[ \t]+(?:[-*+]|\d+\.)[ \t]
+    | ^(?:>|[-*+][ \t]|\d+\.[ \t])[ \t]*(?:>|\#|[-*+][ \t]|\d+\.[ \t])
+    | ^(?:[-*+]|\d+\.)[ ]{2}
+    | ^>[ \t]*$
+    | ^>[ ]{2}
+    | [&<]
+    | ^[ \t]*\[[^\]]*\]:
+    | \]\([^)]*\s
+    | \[[^\]]*\[
+    | \[[^\]`]*(?:`[^\]`]*`[^\]`]*)*`[^\]`]*\]\(
+    | ^[ \t]*(?:(?:[-*+]|\d+\.)[ \t]+)?(?:=+|-+|\*+|_+|(?:[-*_][ \t]*){3,})[ \t]*$
+    | [ \t]$
+    | \t
+    | \\
+    | (?<!\*)\*(?!\*)
+    | \w_\w
+    | ``
+    | \[\]\(
+    | __
+    | \*\*\*
+    | ^\#.*\#[ \t]*$
+    | ^\#+[^\#\s]
+    | ^\#+[ \t]*$
+    | ^\#+[ ]{2}
+    | ^[ ]+[\#>]
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+_LIST_TYPES = (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST)
+# A paragraph line that python-markdown would read as the start of another block.
+_BLOCK_START_RE = re.compile(r"^(?:#{1,6}[ \t]|>|[-*+][ \t]|\d+\.[ \t])", re.MULTILINE)
+
+
+def needs_python_markdown(markdown_text: str) -> bool:
+    """Returns True if the page uses markdown the native renderer doesn't render like python-markdown."""
+    if _PYTHON_MARKDOWN_ONLY_RE.search(markdown_text):
+        return True
+    previous_type = None
+    for block in markdown_to_blocks(markdown_text):
+        block_type = block_to_block_type(block)
+        if block_type == BlockType.PARAGRAPH and _BLOCK_START_RE.search(block):
+            return True
+        # python-markdown only takes the first line of a block as the heading.
+        if block_type == BlockType.HEADING and '\n' in block:
+            return True
+        # python-markdown merges adjacent lists into one loose list, and adjacent quotes into one quote.
+        if block_type in _LIST_TYPES and previous_type in _LIST_TYPES:
+            return True
+        if block_type == previous_type == BlockType.QUOTE:
+            return True
+        previous_type = block_type
+    return False
+
+
+class AutoRenderer:
+    """
+    Renders simple pages with the native renderer and falls back to
+    python-markdown for pages that use tables, fenced code (codehilite) or
+    other markdown the native renderer doesn't support. Pages rendered
+    natively share the native renderer's per-block cache.
+    """
+
+    name = "auto"
+
+    def __init__(self):
+        self.native = NativeRenderer()
+        self.fallback = PythonMarkdownRenderer()
+        self.version = f"auto ({self.native.version}; {self.fallback.version})"
+
+    def render(self, markdown_text: str, page: Optional[str] = None) -> str:
+        if needs_python_markdown(markdown_text):
+            return self.fallback.render(markdown_text, page)
+        try:
+            return self.native.render(markdown_text, page)
+        except ValueError:
+            # e.g. an image without a url, which text_node_to_html rejects.
+            return self.fallback.render(markdown_text, page)
+
+
+RENDERERS = {
+    PythonMarkdownRenderer.name: PythonMarkdownRenderer,
+    NativeRenderer.name: NativeRenderer,
+    AutoRenderer.name: AutoRenderer,
+}
+DEFAULT_RENDERER = PythonMarkdownRenderer.name
+
+_selected = DEFAULT_RENDERER
+_instances: Dict[str, Renderer] = {}
+
+
+def select_renderer(name: str):
+    """Makes get_renderer() return the named renderer in this process."""
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {name}")
+    global _selected
+    _selected = name
+
+
+def get_renderer(name: Optional[str] = None) -> Renderer:
+    """Returns this process's instance of the named (default: selected) renderer, creating it on first use."""
+    name = name or _selected
+    renderer = _instances.get(name)
+    if renderer is None:
+        renderer = _instances[name] = RENDERERS[name]()
+    return renderer
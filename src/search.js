@@ -0,0 +1,133 @@
+// Client for the search index written by search_index.py.
+//
+// Loads search/docs.json once, then fetches only the shards of the query's
+// term prefixes, caching each. Building with --search adds
+//
+//   <script src="/search/search.js" defer></script>
+//
+// to every page's <head>, so page scripts (deferred too, or run after
+// DOMContentLoaded) can call
+//
+//   SiteSearch.search("static site").then(results => ...);  // [{url, title, score}]
+(function (global) {
+  "use strict";
+
+  var script = document.currentScript;
+  var base = script ? script.src.replace(/[^/]*$/, "") : "/search/";
+  var termPattern = /[\p{L}\p{M}\p{N}\p{Pc}]+/gu;
+  var maxTermLength = 64;
+  var meta = null;
+  var shards = {};
+
+  function tokenize(text) {
+    return (text.toLowerCase().match(termPattern) || []).filter(function (term) {
+      return Array.from(term).length <= maxTermLength;
+    });
+  }
+
+  function prefixOf(term, length) {
+    return Array.from(term).slice(0, length).join("");
+  }
+
+  function shardFile(prefix) {
+    var hex = "";
+    new TextEncoder().encode(prefix).forEach(function (byte) {
+      hex += (byte < 16 ? "0" : "") + byte.toString(16);
+    });
+    // Prefix length 0 puts every term in one shard, index.bin.
+    return base + (hex || "index") + ".bin";
+  }
+
+  // Mirrors decode_shard: varint counts, front-coded terms, delta-coded postings.
+  function decodeShard(buffer) {
+    var data = new Uint8Array(buffer);
+    var decoder = new TextDecoder();
+    var pos = 0;
+    function varint() {
+      var value = 0, scale = 1, byte;
+      do {
+        byte = data[pos++];
+        value += (byte & 0x7f) * scale;
+        scale *= 128;
+      } while (byte >= 0x80);
+      return value;
+    }
+    var terms = new Map();
+    var previous = new Uint8Array(0);
+    for (var count = varint(); count > 0; count--) {
+      var shared = varint();
+      var length = varint();
+      var bytes = new Uint8Array(shared + length);
+      bytes.set(previous.subarray(0, shared));
+      bytes.set(data.subarray(pos, pos + length), shared);
+      pos += length;
+      previous = bytes;
+      var postings = [];
+      for (var entries = varint(), doc = 0; entries > 0; entries--) {
+        doc += varint();
+        postings.push([doc, varint()]);
+      }
+      terms.set(decoder.decode(bytes), postings);
+    }
+    return terms;
+  }
+
+  function load() {
+    if (!meta) {
+      meta = fetch(base + "docs.json").then(function (response) { return response.json(); });
+    }
+    return meta;
+  }
+
+  function loadShard(prefix) {
+    if (!shards[prefix]) {
+      shards[prefix] = fetch(shardFile(prefix))
+        .then(function (response) { return response.arrayBuffer(); })
+        .then(decodeShard);
+    }
+    return shards[prefix];
+  }
+
+  // Documents containing a term starting with token, with summed frequencies.
+  function matches(index, token) {
+    var prefix = prefixOf(token, index.prefixLength);
+    var wanted = index.shards.filter(function (shard) {
+      return prefix.length < index.prefixLength ? shard.indexOf(prefix) === 0 : shard === prefix;
+    });
+    return Promise.all(wanted.map(loadShard)).then(function (loaded) {
+      var scores = new Map();
+      loaded.forEach(function (terms) {
+        terms.forEach(function (postings, term) {
+          if (term.indexOf(token) !== 0) return;
+          postings.forEach(function (posting) {
+            scores.set(posting[0], (scores.get(posting[0]) || 0) + posting[1]);
+          });
+        });
+      });
+      return scores;
+    });
+  }
+
+  // Pages containing every word of query (the last one may be incomplete), best first.
+  function search(query) {
+    var tokens = tokenize(query);
+    if (!tokens.length) return Promise.resolve([]);
+    return load().then(function (index) {
+      return Promise.all(tokens.map(function (token) { return matches(index, token); }))
+        .then(function (perToken) {
+          var results = [];
+          perToken[0].forEach(function (score, doc) {
+            for (var i = 1; i < perToken.length; i++) {
+              if (!perToken[i].has(doc)) return;
+              score += perToken[i].get(doc);
+            }
+            var page = index.docs[doc];
+            if (page) results.push({ url: page[0], title: page[1], score: score });
+          });
+          return results.sort(function (a, b) { return b.score - a.score; });
+        });
+    });
+  }
+
+  global.SiteSearch = { search: search, tokenize: tokenize };
+})(window);
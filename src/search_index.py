@@ -0,0 +1,405 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from block_to_block_type import BlockType, block_to_block_type
+from build_manifest import GENERATED_SECTION, BuildManifest, remove_generated, write_generated
+from front_matter import FrontMatterError, split_front_matter
+from markdown_to_blocks import markdown_to_blocks
+from metadata_index import MetadataIndex
+from textnode import TextType
+from text_to_textnodes import text_to_textnodes
+
+# Manifest section holding each indexed page's content hash and document number.
+SEARCH_SECTION = "search"
+# Manifest table holding each indexed page's content hash and term counts.
+SEARCH_TERMS_TABLE = "search-terms"
+# Manifest section recording the format and prefix length the shards on disk were written with.
+SEARCH_FORMAT_SECTION = "search_format"
+
+# Bump when the tokenizer or the shard layout changes, so every page is re-indexed.
+SEARCH_FORMAT_VERSION = 1
+
+SEARCH_DIR = "search"
+DOCS_FILE = f"{SEARCH_DIR}/docs.json"
+CLIENT_FILE = f"{SEARCH_DIR}/search.js"
+# Terms are sharded by their first few characters, as many as it takes to
+# keep shards at about TERMS_PER_SHARD terms: a small site gets a single
+# shard, and the prefix grows up to MAX_PREFIX_LENGTH as the vocabulary does.
+TERMS_PER_SHARD = 2000
+MAX_PREFIX_LENGTH = 3
+# Longer "words" are mostly hashes and URLs nobody searches for.
+MAX_TERM_LENGTH = 64
+
+_CLIENT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search.js")
+
+# Added to the <head> of every page while the index is built, so pages can call SiteSearch.search.
+SEARCH_SCRIPT = f'<script src="/{CLIENT_FILE}" defer></script>'
+
+_TERM_RE = re.compile(r"\w+")
+# Link text, image alt text and inline code are not indexed.
+_INDEXED_TEXT_TYPES = (TextType.TEXT, TextType.BOLD, TextType.ITALIC)
+
+# (document number, term frequency), by ascending document number
+Postings = List[Tuple[int, int]]
+
+
+def tokenize(text: str) -> List[str]:
+    """The lower-cased words of text, as search.js splits a query."""
+    return [term for term in _TERM_RE.findall(text.lower()) if len(term) <= MAX_TERM_LENGTH]
+
+
+def _block_texts(block: str, block_type: BlockType) -> List[str]:
+    """The inline markdown of a block, without its block markers (as NativeRenderer reads it)."""
+    if block_type == BlockType.HEADING:
+        return [block[block.find(' ') + 1:]]
+    if block_type == BlockType.QUOTE:
+        return [line[1:].lstrip(' ') for line in block.splitlines()]
+    if block_type == BlockType.UNORDERED_LIST:
+        return [line[2:] for line in block.splitlines()]
+    if block_type == BlockType.ORDERED_LIST:
+        return [line[line.find('. ') + 2:] for line in block.splitlines()]
+    return [block]
+
+
+def page_terms(markdown: str) -> Dict[str, int]:
+    """
+    Counts the terms of a page's text, skipping code.
+
+    The text is what the inline pipeline produces: the TEXT, BOLD and ITALIC
+    nodes text_to_textnodes returns for each non-code block.
+    """
+    counts: Counter = Counter()
+    for block in markdown_to_blocks(markdown):
+        block_type = block_to_block_type(block)
+        if block_type == BlockType.CODE:
+            continue
+        for text in _block_texts(block, block_type):
+            for node in text_to_textnodes(text):
+                if node.text_type in _INDEXED_TEXT_TYPES:
+                    counts.update(tokenize(node.text))
+    return dict(counts)
+
+
+def encode_varint(value: int, out: bytearray):
+    """Appends value as an unsigned LEB128 varint: 7 bits per byte, high bit set on all but the last."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Reads a varint at pos; returns (value, position after it)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_shard(terms: Dict[str, Postings]) -> bytes:
+    """
+    Encodes the posting lists of a shard's terms.
+
+    Layout, all integers varints: the number of terms, then for each term in
+    sorted order the bytes it shares with the previous term, the length and
+    UTF-8 bytes of the rest, the number of postings, and each posting as the
+    gap from the previous document number and the term frequency.
+    """
+    out = bytearray()
+    encode_varint(len(terms), out)
+    previous = b""
+    for term in sorted(terms):
+        encoded = term.encode("utf-8")
+        shared = 0
+        limit = min(len(previous), len(encoded))
+        while shared < limit and previous[shared] == encoded[shared]:
+            shared += 1
+        encode_varint(shared, out)
+        encode_varint(len(encoded) - shared, out)
+        out += encoded[shared:]
+        previous = encoded
+
+        postings = terms[term]
+        encode_varint(len(postings), out)
+        last_doc = 0
+        for doc, frequency in postings:
+            encode_varint(doc - last_doc, out)
+            encode_varint(frequency, out)
+            last_doc = doc
+    return bytes(out)
+
+
+def decode_shard(data: bytes) -> Dict[str, Postings]:
+    """The inverse of encode_shard."""
+    terms: Dict[str, Postings] = {}
+    count, pos = decode_varint(data, 0)
+    previous = b""
+    for _ in range(count):
+        shared, pos = decode_varint(data, pos)
+        length, pos = decode_varint(data, pos)
+        encoded = previous[:shared] + data[pos:pos + length]
+        pos += length
+        previous = encoded
+
+        postings: Postings = []
+        doc = 0
+        entries, pos = decode_varint(data, pos)
+        for _ in range(entries):
+            gap, pos = decode_varint(data, pos)
+            frequency, pos = decode_varint(data, pos)
+            doc += gap
+            postings.append((doc, frequency))
+        terms[encoded.decode("utf-8")] = postings
+    return terms
+
+
+def term_prefix(term: str, prefix_length: int) -> str:
+    return term[:prefix_length]
+
+
+def shard_name(prefix: str) -> str:
+    """
+    The shard of a prefix, named by its UTF-8 bytes in hex so any script is a
+    safe file name; the single shard of prefix length 0 is search/index.bin.
+    """
+    return f"{SEARCH_DIR}/{prefix.encode('utf-8').hex() or 'index'}.bin"
+
+
+def choose_prefix_length(vocabulary: Set[str], terms_per_shard: int = TERMS_PER_SHARD) -> int:
+    """The shortest prefix length whose shards hold at most terms_per_shard terms on average."""
+    for prefix_length in range(MAX_PREFIX_LENGTH):
+        if len(vocabulary) <= terms_per_shard * len(_prefixes(vocabulary, prefix_length)):
+            return prefix_length
+    return MAX_PREFIX_LENGTH
+
+
+def _check_format(manifest: BuildManifest):
+    """
+    Forgets every indexed page if the shards were written in another format,
+    or if the terms of an indexed page are missing from the terms table
+    (then the shards its terms went into are unknown).
+    """
+    settings = {"version": SEARCH_FORMAT_VERSION}
+    table = manifest.table(SEARCH_TERMS_TABLE)
+    if manifest.get(SEARCH_FORMAT_SECTION, "format") != settings or any(
+            (table.get(key) or {}).get("hash") != manifest.get(SEARCH_SECTION, key)["hash"]
+            for key in manifest.keys(SEARCH_SECTION)):
+        manifest.clear(SEARCH_SECTION)
+        manifest.set(SEARCH_FORMAT_SECTION, "format", settings)
+    # Terms of pages the manifest no longer indexes (e.g. after a full build).
+    for key in table.keys():
+        if manifest.get(SEARCH_SECTION, key) is None:
+            table.pop(key)
+
+
+def _prefixes(terms: Iterable[str], prefix_length: int) -> Set[str]:
+    return {term_prefix(term, prefix_length) for term in terms}
+
+
+def update_search_entries(manifest: BuildManifest, content_dir: str,
+                          page_keys: Iterable[str]) -> Tuple[Set[str], int, int]:
+    """
+    Re-indexes the pages whose markdown changed since they were last indexed.
+
+    Each page keeps its document number for as long as it exists, so a
+    changed page only touches the postings of the terms it had or has now.
+    Pages that are gone are dropped and their numbers reused. The terms
+    are kept in the SEARCH_TERMS_TABLE table, the number in the manifest.
+
+    Args:
+        manifest: The build manifest; its "pages" section says which pages
+            were rendered and their content hashes. Updated in place.
+        content_dir: Root of the markdown content tree.
+        page_keys: The pages to index.
+
+    Returns:
+        tuple[set[str], int, int]: The terms whose postings changed, and
+        counts of indexed and unchanged pages.
+    """
+    page_keys = set(page_keys)
+    table = manifest.table(SEARCH_TERMS_TABLE)
+    changed: Set[str] = set()
+    for key in manifest.keys(SEARCH_SECTION):
+        if key not in page_keys:
+            manifest.pop(SEARCH_SECTION, key)
+            changed.update(table.pop(key)["terms"])
+
+    used = {manifest.get(SEARCH_SECTION, key)["doc"] for key in manifest.keys(SEARCH_SECTION)}
+    free_docs = (doc for doc in range(len(used) + len(page_keys)) if doc not in used)
+
+    indexed = unchanged = 0
+    for key in sorted(page_keys):
+        content_hash = manifest.get("pages", key)["hash"]
+        previous = manifest.get(SEARCH_SECTION, key)
+        if previous and previous["hash"] == content_hash:
+            unchanged += 1
+            continue
+        with open(os.path.join(content_dir, key), "r", encoding="utf-8") as f:
+            try:
+                _, body = split_front_matter(f.read())
+            except FrontMatterError:
+                body = ""
+        terms = page_terms(body)
+        doc = previous["doc"] if previous else next(free_docs)
+        if previous:
+            changed.update(table.get(key)["terms"])
+        changed.update(terms)
+        manifest.set(SEARCH_SECTION, key, {"hash": content_hash, "doc": doc})
+        table.set(key, {"hash": content_hash, "terms": terms})
+        indexed += 1
+    return changed, indexed, unchanged
+
+
+def build_postings(manifest: BuildManifest, prefixes: Set[str],
+                   prefix_length: int) -> Dict[str, Dict[str, Postings]]:
+    """The posting lists of every term in the given shards, grouped by shard prefix."""
+    shards: Dict[str, Dict[str, Postings]] = {prefix: {} for prefix in prefixes}
+    table = manifest.table(SEARCH_TERMS_TABLE)
+    docs = sorted((manifest.get(SEARCH_SECTION, key)["doc"], key) for key in manifest.keys(SEARCH_SECTION))
+    for doc, key in docs:
+        for term, frequency in table.get(key)["terms"].items():
+            shard = shards.get(term[:prefix_length])
+            if shard is not None:
+                shard.setdefault(term, []).append((doc, frequency))
+    return shards
+
+
+def write_search_index(index: MetadataIndex, content_dir: str, dest_dir: str, manifest: BuildManifest,
+                       prefix_length: Optional[int] = None) -> Dict[str, int]:
+    """
+    Writes the site's search index under search/ for search.js to query.
+
+    docs.json lists each document's URL and title and the shards that
+    exist; search/<hex prefix>.bin holds the posting lists of the terms
+    starting with that prefix (see encode_shard). Only the rendered pages
+    are indexed, and only shards whose terms changed are rewritten, unless
+    the prefix length changed: then every shard is rebuilt from the terms
+    table, without reading the pages again.
+
+    Args:
+        prefix_length: Characters of a term that pick its shard; None
+            chooses it from the size of the vocabulary (see
+            choose_prefix_length).
+
+    Returns:
+        dict: Counts of "pages", "indexed" and "unchanged" pages and of
+        shard files "written" and "reused".
+    """
+    _check_format(manifest)
+    page_keys = [key for key in manifest.keys("pages") if key in index]
+    changed_terms, indexed, unchanged = update_search_entries(manifest, content_dir, page_keys)
+
+    docs: List = []
+    vocabulary: Set[str] = set()
+    table = manifest.table(SEARCH_TERMS_TABLE)
+    for key in manifest.keys(SEARCH_SECTION):
+        entry = manifest.get(SEARCH_SECTION, key)
+        page = index.get(key)
+        docs.extend([None] * (entry["doc"] + 1 - len(docs)))
+        docs[entry["doc"]] = [page.url, page.title]
+        vocabulary.update(table.get(key)["terms"])
+
+    if prefix_length is None:
+        prefix_length = choose_prefix_length(vocabulary)
+    live = _prefixes(vocabulary, prefix_length)
+    if manifest.get(SEARCH_FORMAT_SECTION, "prefix_length") == {"length": prefix_length}:
+        changed = _prefixes(changed_terms, prefix_length)
+    else:
+        changed = set(live)
+        manifest.set(SEARCH_FORMAT_SECTION, "prefix_length", {"length": prefix_length})
+
+    # Shards missing from disk or from the manifest are rebuilt too.
+    for prefix in live - changed:
+        name = shard_name(prefix)
+        if (manifest.get(GENERATED_SECTION, name) is None
+                or not os.path.exists(os.path.join(dest_dir, *name.split("/")))):
+            changed.add(prefix)
+
+    written = 0
+    for prefix, terms in build_postings(manifest, changed & live, prefix_length).items():
+        data = encode_shard(terms)
+
+        def write_shard(path, data=data):
+            with open(path, "wb") as f:
+                f.write(data)
+        if write_generated(manifest, dest_dir, shard_name(prefix), hashlib.sha256(data).hexdigest(), write_shard):
+            written += 1
+
+    live_names = {shard_name(prefix) for prefix in live}
+    for name in manifest.keys(GENERATED_SECTION):
+        if name.startswith(SEARCH_DIR + "/") and name.endswith(".bin") and name not in live_names:
+            remove_generated(manifest, dest_dir, name)
+
+    docs_json = json.dumps({"version": SEARCH_FORMAT_VERSION, "prefixLength": prefix_length,
+                            "shards": sorted(live), "docs": docs}, ensure_ascii=False, separators=(",", ":"))
+
+    def write_docs(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(docs_json)
+    write_generated(manifest, dest_dir, DOCS_FILE, hashlib.sha256(docs_json.encode("utf-8")).hexdigest(), write_docs)
+
+    with open(_CLIENT_SOURCE, "rb") as f:
+        client = f.read()
+
+    def write_client(path):
+        with open(path, "wb") as f:
+            f.write(client)
+    write_generated(manifest, dest_dir, CLIENT_FILE, hashlib.sha256(client).hexdigest(), write_client)
+
+    return {"pages": len(page_keys), "indexed": indexed, "unchanged": unchanged,
+            "written": written, "reused": len(live) - written}
+
+
+def remove_search_index(manifest: BuildManifest, dest_dir: str):
+    """Deletes the search index written by an earlier build, and its manifest sections, for a build without search."""
+    for name in manifest.keys(GENERATED_SECTION):
+        if name.startswith(SEARCH_DIR + "/"):
+            remove_generated(manifest, dest_dir, name)
+    manifest.clear(SEARCH_SECTION)
+    manifest.clear(SEARCH_FORMAT_SECTION)
+    manifest.table(SEARCH_TERMS_TABLE).clear()
+
+
+_search_script = False
+
+
+def enable_search_script():
+    """Makes generate_page add SEARCH_SCRIPT to the pages it writes in this process."""
+    global _search_script
+    _search_script = True
+
+
+def disable_search_script():
+    global _search_script
+    _search_script = False
+
+
+def search_script_enabled() -> bool:
+    return _search_script
+
+
+def apply_search_script(page_parts: List[str]) -> List[str]:
+    """
+    Inserts SEARCH_SCRIPT before the page's first </head>, if enabled.
+
+    A page without a head gets it before its last </body> instead, or at
+    the end.
+    """
+    if not _search_script:
+        return page_parts
+    page = "".join(page_parts)
+    lowered = page.lower()
+    index = lowered.find("</head>")
+    if index == -1:
+        index = lowered.rfind("</body>")
+    if index == -1:
+        return [page, SEARCH_SCRIPT]
+    return [page[:index], SEARCH_SCRIPT, page[index:]]
@@ -0,0 +1,184 @@
+import datetime
+import hashlib
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+from urllib.parse import quote
+
+from build_manifest import GENERATED_SECTION, BuildManifest, remove_generated, write_generated
+from html_escape import escape_attribute
+from metadata_index import MetadataIndex, PageMetadata, parse_datetime
+
+SITEMAP_FILE = "sitemap.xml"
+# The sitemaps protocol's limit of URLs per file.
+SITEMAP_URL_LIMIT = 50_000
+
+_SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# (absolute URL, W3C datetime of the last change or None)
+SitemapEntry = Tuple[str, Optional[str]]
+
+
+_URL_SAFE = "/:@!$&'()*+,;=-._~%"
+_URL_NEEDS_QUOTING_RE = re.compile(r"[^A-Za-z0-9" + re.escape(_URL_SAFE) + "]")
+
+
+def absolute_url(base_url: str, url: str) -> str:
+    """Joins the site's base URL and a site-relative page URL, percent-encoding the path."""
+    if _URL_NEEDS_QUOTING_RE.search(url):
+        url = quote(url, safe=_URL_SAFE)
+    return base_url.rstrip("/") + url
+
+
+@lru_cache(maxsize=4096)
+def _lastmod(date: str) -> Optional[str]:
+    if len(date) == 10:
+        # A plain date stays a plain date.
+        try:
+            datetime.date.fromisoformat(date)
+        except ValueError:
+            return None
+        return date
+    value = parse_datetime(date)
+    return value.isoformat() if value is not None else None
+
+
+def page_lastmod(page: PageMetadata) -> Optional[str]:
+    """
+    The page's front matter date in the W3C datetime format sitemaps use, if it has a valid one.
+
+    Pages share few distinct dates, so each is converted once.
+    """
+    return _lastmod(page.date) if page.date else None
+
+
+def sitemap_entries(index: MetadataIndex, base_url: str) -> List[SitemapEntry]:
+    """Every published page of the index as a sitemap entry."""
+    return [(absolute_url(base_url, page.url), page_lastmod(page)) for page in index if not page.draft]
+
+
+def url_hashes(entries: List[SitemapEntry]) -> List[int]:
+    """The hash that assigns each entry to a shard."""
+    return [zlib.crc32(url.encode("utf-8")) for url, _ in entries]
+
+
+def shard_count(hashes: List[int], limit: int = SITEMAP_URL_LIMIT) -> int:
+    """
+    The number of shards the entries with these url_hashes are split into:
+    the smallest power of two that keeps every shard within limit.
+
+    Entries go to shards by a hash of their URL rather than by position, so
+    adding, removing or changing a page changes only its own shard. The
+    count only grows (doubling) when a shard would overflow, which moves
+    about half of the URLs once.
+    """
+    count = 1
+    while count * limit < len(hashes):
+        count *= 2
+    # One shard holds at most limit URLs; more shards may still be uneven.
+    while count > 1:
+        sizes = [0] * count
+        for url_hash in hashes:
+            sizes[url_hash % count] += 1
+        if max(sizes) <= limit:
+            break
+        count *= 2
+    return count
+
+
+def shard_entries(entries: List[SitemapEntry], hashes: List[int], count: int) -> List[List[SitemapEntry]]:
+    """Splits entries into count shards by their url_hashes, each sorted by URL."""
+    shards: List[List[SitemapEntry]] = [[] for _ in range(count)]
+    for entry, url_hash in zip(entries, hashes):
+        shards[url_hash % count].append(entry)
+    for shard in shards:
+        shard.sort()
+    return shards
+
+
+def _entries_digest(kind: str, entries: Iterable[SitemapEntry]) -> str:
+    lines = "".join(f"\n{url}\t{lastmod or ''}" for url, lastmod in entries)
+    return hashlib.sha256((kind + lines).encode("utf-8")).hexdigest()
+
+
+def _write_entries(stream: TextIO, root: str, element: str, entries: Iterable[SitemapEntry]):
+    """Streams one <element><loc/><lastmod/></element> per entry inside <root>."""
+    stream.write(_XML_DECLARATION)
+    stream.write(f'<{root} xmlns="{_SITEMAP_NAMESPACE}">\n')
+    for url, lastmod in entries:
+        if lastmod:
+            stream.write(f"<{element}><loc>{escape_attribute(url)}</loc><lastmod>{lastmod}</lastmod></{element}>\n")
+        else:
+            stream.write(f"<{element}><loc>{escape_attribute(url)}</loc></{element}>\n")
+    stream.write(f"</{root}>\n")
+
+
+def write_urlset(path: str, entries: Iterable[SitemapEntry]):
+    """Writes a sitemap of page URLs, one entry at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        _write_entries(f, "urlset", "url", entries)
+
+
+def write_sitemap_index(path: str, sitemaps: Iterable[SitemapEntry]):
+    """Writes a sitemap index pointing at shard sitemaps."""
+    with open(path, "w", encoding="utf-8") as f:
+        _write_entries(f, "sitemapindex", "sitemap", sitemaps)
+
+
+def shard_name(number: int) -> str:
+    return f"sitemap-{number}.xml"
+
+
+def write_sitemaps(index: MetadataIndex, dest_dir: str, base_url: str, manifest: BuildManifest,
+                   limit: int = SITEMAP_URL_LIMIT) -> Dict[str, int]:
+    """
+    Writes sitemap.xml for the published pages of index.
+
+    Up to limit URLs go in sitemap.xml itself. A larger site gets
+    sitemap-1.xml, sitemap-2.xml, ... shards and a sitemap.xml index of
+    them. Shards and the index are rewritten only when their entries
+    changed since the last build, and shards no longer produced are removed.
+
+    Returns:
+        dict: Counts of "urls", "written" and "reused" files.
+    """
+    entries = sitemap_entries(index, base_url)
+    hashes = url_hashes(entries)
+    count = shard_count(hashes, limit)
+    written = reused = 0
+    outputs = set()
+
+    if count == 1:
+        entries.sort()
+        files = [(SITEMAP_FILE, "urlset", entries, write_urlset)]
+    else:
+        files = []
+        shard_urls = []
+        for number, shard in enumerate(shard_entries(entries, hashes, count), 1):
+            name = shard_name(number)
+            files.append((name, "urlset", shard, write_urlset))
+            # Shards hold no dates of their own; a shard's digest stands in for its last change.
+            shard_urls.append((absolute_url(base_url, "/" + name), None))
+        files.append((SITEMAP_FILE, "sitemapindex", shard_urls, write_sitemap_index))
+
+    for name, kind, file_entries, write in files:
+        outputs.add(name)
+        digest = _entries_digest(kind, file_entries)
+        if write_generated(manifest, dest_dir, name, digest, lambda path: write(path, file_entries)):
+            written += 1
+        else:
+            reused += 1
+
+    for name in manifest.keys(GENERATED_SECTION):
+        if name.startswith("sitemap-") and name not in outputs:
+            remove_generated(manifest, dest_dir, name)
+    return {"urls": len(entries), "written": written, "reused": reused}
+
+
+def remove_sitemaps(manifest: BuildManifest, dest_dir: str):
+    """Deletes the sitemap and its shards written by an earlier build, for a build without a base URL."""
+    for name in manifest.keys(GENERATED_SECTION):
+        if name == SITEMAP_FILE or (name.startswith("sitemap-") and name.endswith(".xml")):
+            remove_generated(manifest, dest_dir, name)
@@ -0,0 +1,178 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from asset_fingerprints import (
+    ASSET_MANIFEST_FILE, apply_asset_rewrite, disable_asset_rewrite, enable_asset_rewrite, fingerprint_assets,
+    fingerprinted_name, rewrite_asset_references,
+)
+from build_manifest import BuildManifest, fingerprint_file
+from images import IMAGES_SECTION
+from main import SitePaths, build_site, generate_page, rebuild_changed
+
+ASSETS = {"index.css": "index.0123456789.css", "images/logo.png": "images/logo.abcdef0123.png"}
+
+
+class TestRewrite(unittest.TestCase):
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("css/site.min.css", "0123456789abcdef"), "css/site.min.0123456789.css")
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_references_keep_their_form(self):
+        page = ('<link href="/index.css" rel="stylesheet" /><link href=\'../index.css?v=1\'>'
+                '<img src="../images/logo.png#top" srcset="/images/logo.png 1x, /images/logo-2x.png 2x">')
+        self.assertEqual(rewrite_asset_references(page, "/blog/post.html", ASSETS), (
+            '<link href="/index.0123456789.css" rel="stylesheet" /><link href=\'../index.0123456789.css?v=1\'>'
+            '<img src="../images/logo.abcdef0123.png#top" '
+            'srcset="/images/logo.abcdef0123.png 1x, /images/logo-2x.png 2x">'
+        ))
+
+    def test_attributes_filled_from_slots(self):
+        enable_asset_rewrite(ASSETS, "/site")
+        self.addCleanup(disable_asset_rewrite)
+        parts = ['<link href="', "/index.css", '" /><img src="/images/', "logo.png", '">']
+        self.assertEqual(apply_asset_rewrite(parts, "/site/index.html"),
+                         ['<link href="/index.0123456789.css" /><img src="/images/logo.abcdef0123.png">'])
+
+    def test_other_references_are_untouched(self):
+        page = '<a href="https://example.com/index.css">x</a><a href="/about.html">y</a><p>href="/index.css"</p>'
+        self.assertEqual(rewrite_asset_references(page, "/", ASSETS), page)
+
+
+class TestFingerprintAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.add("index.css", "body { color: red; }")
+        self.add("robots.txt", "User-agent: *")
+        self.addCleanup(disable_asset_rewrite)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, key, text):
+        path = os.path.join(self.static, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # What copy_static_incremental records for a synced file.
+        self.manifest.set("static", key, fingerprint_file(path))
+
+    def asset_manifest(self):
+        with open(os.path.join(self.public, ASSET_MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_only_changed_assets_are_written(self):
+        self.assertEqual(fingerprint_assets(self.manifest, self.static, self.public),
+                         {"assets": 1, "written": 1, "unchanged": 0, "removed": 0})
+        first = self.asset_manifest()["index.css"]
+        self.assertTrue(os.path.exists(os.path.join(self.public, first)))
+        self.assertEqual(fingerprint_assets(self.manifest, self.static, self.public)["unchanged"], 1)
+
+        self.add("index.css", "body { color: blue; }")
+        self.assertEqual(fingerprint_assets(self.manifest, self.static, self.public),
+                         {"assets": 1, "written": 1, "unchanged": 0, "removed": 1})
+        second = self.asset_manifest()["index.css"]
+        self.assertNotEqual(first, second)
+        self.assertFalse(os.path.exists(os.path.join(self.public, first)))
+
+    def test_image_variants_are_fingerprinted(self):
+        # What process_images records and writes for a resized image.
+        variant = os.path.join(self.public, "photo-480w.png")
+        os.makedirs(self.public)
+        with open(variant, "wb") as f:
+            f.write(b"480")
+        entry = {"hash": "0" * 64, "settings": [], "width": 960, "height": 480, "variants": [[480, "photo-480w.png"]]}
+        self.manifest.set(IMAGES_SECTION, "photo.png", entry)
+        self.assertEqual(fingerprint_assets(self.manifest, self.static, self.public)["assets"], 2)
+        first = self.asset_manifest()["photo-480w.png"]
+        with open(os.path.join(self.public, first), "rb") as f:
+            self.assertEqual(f.read(), b"480")
+
+        # A changed source image gets a new name for the same width.
+        self.manifest.set(IMAGES_SECTION, "photo.png", {**entry, "hash": "1" * 64})
+        self.assertEqual(fingerprint_assets(self.manifest, self.static, self.public)["removed"], 1)
+        self.assertNotEqual(self.asset_manifest()["photo-480w.png"], first)
+        self.assertFalse(os.path.exists(os.path.join(self.public, first)))
+
+    def test_template_and_content_reference_fingerprinted_names(self):
+        fingerprint_assets(self.manifest, self.static, self.public)
+        enable_asset_rewrite({"index.css": self.asset_manifest()["index.css"]}, self.public)
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write('<link href="/index.css" />{{ Content }}')
+        page = os.path.join(self.tmp.name, "page.md")
+        with open(page, "w", encoding="utf-8") as f:
+            f.write("# Title\n\n[Styles](../index.css)")
+        dest = os.path.join(self.public, "blog", "page.html")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(generate_page(page, template, dest))
+        with open(dest, encoding="utf-8") as f:
+            html = f.read()
+        name = self.asset_manifest()["index.css"]
+        self.assertIn(f'<link href="/{name}" />', html)
+        self.assertIn(f'<a href="../{name}">Styles</a>', html)
+
+
+class TestSiteBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.site = SitePaths(os.path.join(root, "static"), os.path.join(root, "content"),
+                              os.path.join(root, "template.html"), os.path.join(root, "public"),
+                              os.path.join(root, ".cache", "build-manifest.json"))
+        self.write(self.site.template_file, '<link href="/index.css" />{{ Content }}')
+        self.write(os.path.join(self.site.content_dir, "index.md"), "# Home")
+        self.css = os.path.join(self.site.static_dir, "index.css")
+        self.write(self.css, "body { color: red; }")
+        self.addCleanup(disable_asset_rewrite)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def linked_stylesheet(self):
+        with open(os.path.join(self.site.dest_dir, "index.html"), encoding="utf-8") as f:
+            return f.read().split('"')[1]
+
+    def test_changed_asset_re_renders_the_pages(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            manifest = build_site(self.site, fingerprint=True)
+            first = self.linked_stylesheet()
+            self.write(self.css, "body { color: blue; }")
+            self.assertEqual(rebuild_changed([self.css], self.site, manifest, fingerprint=True), (1, 1))
+        second = self.linked_stylesheet()
+        self.assertNotEqual(first, second)
+        self.assertTrue(os.path.exists(os.path.join(self.site.dest_dir, second.lstrip("/"))))
+        self.assertFalse(os.path.exists(os.path.join(self.site.dest_dir, first.lstrip("/"))))
+
+    def outputs(self):
+        return sorted(os.path.relpath(os.path.join(directory, name), self.site.dest_dir).replace(os.sep, "/")
+                      for directory, _, names in os.walk(self.site.dest_dir) for name in names)
+
+    def test_building_without_fingerprints_removes_them(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_site(self.site, fingerprint=True)
+            self.assertIn(ASSET_MANIFEST_FILE, self.outputs())
+            manifest = build_site(self.site)
+        self.assertEqual(self.outputs(), ["index.css", "index.html"])
+        self.assertEqual(self.linked_stylesheet(), "/index.css")
+        self.assertEqual(list(manifest.keys("assets")), [])
+        self.assertEqual(list(manifest.keys("generated")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import io
+import random
 import unittest
-from markdown_to_blocks import markdown_to_blocks
+from markdown_to_blocks import iter_markdown_blocks, markdown_to_blocks
 
 class TestMarkdownToBlocks(unittest.TestCase):
 
@@ -110,5 +112,39 @@ Content Block 2
         with self.assertRaises(TypeError):
             markdown_to_blocks(["list", "of", "strings"])
 
+    def test_fenced_code_with_blank_lines_is_one_block(self):
+        md = "Intro\n\n```\ndef f():\n\n    return 1\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\ndef f():\n\n    return 1\n```", "Outro"],
+        )
+
+
+class TestIterMarkdownBlocks(unittest.TestCase):
+
+    def test_reads_a_file_object_lazily(self):
+        source = io.StringIO("# Title\n\nFirst\nparagraph\n\n\n- a\n- b\n")
+        blocks = iter_markdown_blocks(source)
+        self.assertEqual(next(blocks), "# Title")
+        # Only the first block has been consumed so far.
+        self.assertEqual(source.readline(), "First\n")
+        self.assertEqual(list(blocks), ["paragraph", "- a\n- b"])
+
+    def test_matches_double_newline_split_without_fences(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            md = "".join(rng.choice("ab \t\n\n") for _ in range(rng.randint(0, 30)))
+            expected = [block.strip() for block in md.split("\n\n") if block.strip()]
+            self.assertEqual(list(iter_markdown_blocks(io.StringIO(md, newline="\n"))), expected, repr(md))
+
+    def test_one_line_fence_does_not_open_a_block(self):
+        md = "```code```\n\nnext"
+        self.assertEqual(list(iter_markdown_blocks(md.split("\n"))), ["```code```", "next"])
+
+    def test_unclosed_fence_runs_to_the_end(self):
+        md = "```\ncode\n\nstill code"
+        self.assertEqual(list(iter_markdown_blocks(md.split("\n"))), ["```\ncode\n\nstill code"])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import random
 import unittest
 from block_to_block_type import BlockType, block_to_block_type
 
@@ -48,5 +49,50 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type("0. Item A"), BlockType.PARAGRAPH)
         self.assertEqual(block_to_block_type("a. Item A"), BlockType.PARAGRAPH)
 
+    def test_other_line_breaks_split_lines(self):
+        # str.splitlines() also breaks on \r, \x0c, \u2028, ...
+        self.assertEqual(block_to_block_type("> a\r> b"), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type("- a\u2028b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- a\n- b\n"), BlockType.UNORDERED_LIST)
+
+    def test_long_ordered_list(self):
+        block = "\n".join(f"{number}. item" for number in range(1, 1001))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type(block.replace("500. ", "501. ")), BlockType.PARAGRAPH)
+
+
+def sequential_block_to_block_type(block):
+    """Reference: the classifier as it was before first-character dispatch."""
+    lines = block.splitlines()
+    if not lines:
+        return BlockType.PARAGRAPH
+    if lines[0].startswith('#'):
+        for prefix in ('###### ', '##### ', '#### ', '### ', '## ', '# '):
+            if lines[0].startswith(prefix):
+                return BlockType.HEADING
+        return BlockType.PARAGRAPH
+    if block.startswith('```'):
+        if block.endswith('```') and block.count('```') == 2:
+            if block.count('\n') == 0 or block.startswith('```\n') or block.endswith('\n```'):
+                return BlockType.CODE
+        return BlockType.PARAGRAPH
+    if all(line.startswith('>') for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith('- ') for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(line.startswith(f'{i+1}. ') for i, line in enumerate(lines)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+class TestDispatchParity(unittest.TestCase):
+
+    def test_random_blocks_match_sequential_checks(self):
+        pieces = ["#", "```", "`", ">", "- ", "-", "1. ", "2. ", "1", " ", "a", "\n", "\n- ", "\n>", "\r", "\x0c", "\u2028"]
+        rng = random.Random(0)
+        for _ in range(20000):
+            block = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+            self.assertEqual(block_to_block_type(block), sequential_block_to_block_type(block), repr(block))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
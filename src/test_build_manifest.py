@@ -0,0 +1,166 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from build_manifest import BuildManifest, fingerprint_file, remove_output
+from main import generate_pages_incremental
+
+
+class TestFingerprintFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("# Title\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_contents_same_hash(self):
+        first = fingerprint_file(self.path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("# Title\n")
+        self.assertEqual(fingerprint_file(self.path)["hash"], first["hash"])
+
+    def test_changed_contents_changed_hash(self):
+        first = fingerprint_file(self.path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("# Other title\n")
+        self.assertNotEqual(fingerprint_file(self.path)["hash"], first["hash"])
+
+    def test_reuses_previous_hash_when_stat_matches(self):
+        previous = dict(fingerprint_file(self.path), hash="cached")
+        self.assertEqual(fingerprint_file(self.path, previous)["hash"], "cached")
+
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, ".cache", "build-manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.path)
+        manifest.set("pages", "index.md", {"hash": "abc", "output": "index.html"})
+        manifest.save()
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.get("pages", "index.md"), {"hash": "abc", "output": "index.html"})
+        self.assertEqual(list(loaded.keys("pages")), ["index.md"])
+
+    def test_load_missing_is_empty(self):
+        self.assertEqual(BuildManifest.load(self.path).sections, {})
+
+    def test_load_corrupt_is_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertEqual(BuildManifest.load(self.path).sections, {})
+
+    def test_load_other_version_is_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"version": -1, "sections": {"pages": {"a.md": {}}}}')
+        self.assertEqual(BuildManifest.load(self.path).sections, {})
+
+    def test_pop_and_clear(self):
+        manifest = BuildManifest(self.path)
+        manifest.set("pages", "a.md", {"hash": "1"})
+        manifest.set("pages", "b.md", {"hash": "2"})
+        self.assertEqual(manifest.pop("pages", "a.md"), {"hash": "1"})
+        self.assertIsNone(manifest.pop("pages", "a.md"))
+        manifest.clear("pages")
+        self.assertIsNone(manifest.get("pages", "b.md"))
+
+
+class TestRemoveOutput(unittest.TestCase):
+
+    def test_removes_file_and_empty_parents_but_not_root(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "blog", "tom", "index.html")
+            os.makedirs(os.path.dirname(path))
+            open(path, "w").close()
+            remove_output(path, root)
+            self.assertFalse(os.path.exists(os.path.join(root, "blog")))
+            self.assertTrue(os.path.isdir(root))
+
+    def test_keeps_non_empty_parents(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "blog"))
+            keep = os.path.join(root, "blog", "keep.html")
+            gone = os.path.join(root, "blog", "gone.html")
+            open(keep, "w").close()
+            open(gone, "w").close()
+            remove_output(gone, root)
+            self.assertTrue(os.path.exists(keep))
+            self.assertFalse(os.path.exists(gone))
+
+
+class TestIncrementalPages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for key in ("index.md", "blog/first.md", "blog/second.md"):
+            self.write(os.path.join(self.content, key), f"# {key}\n\nBody\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self):
+        """Returns generate_pages_incremental's counts and the pages it rendered."""
+        with contextlib.redirect_stdout(io.StringIO()), \
+                mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate:
+            counts = generate_pages_incremental(self.content, self.template, self.public, self.manifest)
+        rendered = sorted(os.path.relpath(call.args[0], self.content).replace(os.sep, "/")
+                          for call in generate.call_args_list)
+        return counts, rendered
+
+    def test_only_changed_pages_are_rendered(self):
+        self.assertEqual(self.build(), ((3, 0, 0), ["blog/first.md", "blog/second.md", "index.md"]))
+        self.assertEqual(self.build(), ((0, 3, 0), []))
+        self.write(os.path.join(self.content, "blog", "first.md"), "# First\n\nEdited\n")
+        self.assertEqual(self.build(), ((1, 2, 0), ["blog/first.md"]))
+        with open(os.path.join(self.public, "blog", "first.html"), encoding="utf-8") as f:
+            self.assertIn("<p>Edited</p>", f.read())
+
+    def test_changed_template_renders_every_page(self):
+        self.build()
+        self.write(self.template, "<h6>{{ Title }}</h6>{{ Content }}")
+        self.assertEqual(self.build()[0], (3, 0, 0))
+        # Saving the template with the same contents changes nothing.
+        self.write(self.template, "<h6>{{ Title }}</h6>{{ Content }}")
+        self.assertEqual(self.build()[0], (0, 3, 0))
+
+    def test_deleted_source_removes_its_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "second.md"))
+        self.assertEqual(self.build(), ((0, 2, 1), []))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "second.html")))
+        self.assertIsNone(self.manifest.get("pages", "blog/second.md"))
+
+    def test_deleted_output_is_rendered_again(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.assertEqual(self.build(), ((1, 2, 0), ["index.md"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
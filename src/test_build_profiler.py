@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+
+import build_profiler
+from build_profiler import BuildProfiler, profile_stage
+
+
+class TestBuildProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = BuildProfiler(track_memory=False)
+        for page, stages in (("a.md", ("file read", "markdown render")), ("b.md", ("file read",))):
+            for stage in stages:
+                with self.profiler.stage(stage, page):
+                    pass
+        with self.profiler.stage("static copy"):
+            pass
+
+    def test_stage_totals_in_pipeline_order(self):
+        totals = self.profiler.stage_totals()
+        self.assertEqual(list(totals), ["static copy", "file read", "markdown render"])
+        self.assertEqual(totals["file read"]["count"], 2)
+
+    def test_page_totals_skip_site_wide_stages(self):
+        pages = self.profiler.page_totals()
+        self.assertEqual(set(pages), {"a.md", "b.md"})
+        self.assertEqual(set(pages["a.md"]["stages"]), {"file read", "markdown render"})
+
+    def test_drain_and_add_records(self):
+        records = self.profiler.drain()
+        self.assertEqual(len(records), 4)
+        self.assertEqual(self.profiler.records, [])
+        self.profiler.add_records(records)
+        self.assertEqual(len(self.profiler.records), 4)
+
+    def test_slowest_pages_table(self):
+        table = self.profiler.format_slowest_pages(top=1).splitlines()
+        self.assertEqual(len(table), 2)
+
+    def test_report_and_trace_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, "out", "profile.json")
+            trace_path = os.path.join(tmp, "trace.json")
+            self.profiler.write_report(report_path, wall_time=1.5)
+            self.profiler.write_chrome_trace(trace_path)
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+            with open(trace_path, encoding="utf-8") as f:
+                trace = json.load(f)
+        self.assertEqual(report["wall_time"], 1.5)
+        self.assertIn("markdown render", report["stages"])
+        self.assertEqual(len(trace["traceEvents"]), 4)
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+    def test_memory_tracking(self):
+        profiler = BuildProfiler(track_memory=True)
+        try:
+            with profiler.stage("markdown render", "a.md"):
+                data = [bytes(1024) for _ in range(100)]
+            self.assertGreater(profiler.records[0]["peak_bytes"], 100 * 1024)
+            del data
+        finally:
+            build_profiler.tracemalloc.stop()
+
+    def test_nested_stages(self):
+        profiler = BuildProfiler(track_memory=True)
+        try:
+            with profiler.stage("markdown render", "a.md"):
+                data = [bytes(1024) for _ in range(100)]
+                with profiler.stage("inline parsing", "a.md"):
+                    pass
+            del data
+        finally:
+            build_profiler.tracemalloc.stop()
+        inner, outer = profiler.records
+        self.assertEqual((inner["parent"], outer["parent"]), ("markdown render", None))
+        # The nested stage's reset of the traced peak doesn't hide the outer stage's allocations.
+        self.assertGreater(outer["peak_bytes"], 100 * 1024)
+        self.assertLess(inner["peak_bytes"], 100 * 1024)
+        page = profiler.page_totals()["a.md"]
+        self.assertEqual(page["wall"], outer["wall"])
+        self.assertEqual(set(page["stages"]), {"markdown render", "inline parsing"})
+        self.assertEqual(profiler.format_stage_table().splitlines()[2].split()[0], "inline")
+
+
+class TestProfileStage(unittest.TestCase):
+
+    def tearDown(self):
+        build_profiler.disable_profiling()
+
+    def test_no_op_when_disabled(self):
+        with profile_stage("file read", "a.md"):
+            pass
+        self.assertEqual(build_profiler.drain_records(), [])
+
+    def test_records_when_enabled(self):
+        build_profiler.enable_profiling(track_memory=False)
+        with profile_stage("file read", "a.md"):
+            pass
+        records = build_profiler.drain_records()
+        self.assertEqual([record["stage"] for record in records], ["file read"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from content_walker import content_path_to_dest, find_content_pages
+from main import SitePaths, build_site
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to **the** site, see [the blog](/blog/).\n",
+    "about.md": "# About\n\n> A quote\n\n1. one\n2. two\n",
+    "blog/index.md": "# Blog\n\n- [First](first.html)\n- [Second](second.html)\n",
+    "blog/first.md": "# First\n\n```\nprint('hi')\n```\n\n![Logo](/images/logo.png)\n",
+    "blog/second.md": "# Second\n\n_Some_ `code` and text.\n",
+}
+
+
+class TestContentWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.dest_dir = os.path.join(self.tmp.name, "public")
+        for relative_path in ["index.md", "blog/tom/index.md", "blog/glorfindel/index.md", "notes.txt", "about.md"]:
+            path = os.path.join(self.content_dir, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# Title\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_path_to_dest(self):
+        source = os.path.join(self.content_dir, "blog", "tom", "index.md")
+        self.assertEqual(
+            content_path_to_dest(source, self.content_dir, self.dest_dir),
+            os.path.join(self.dest_dir, "blog", "tom", "index.html"),
+        )
+
+    def test_finds_nested_markdown_in_sorted_order(self):
+        pages = find_content_pages(self.content_dir, self.dest_dir)
+        relative_sources = [os.path.relpath(source, self.content_dir) for source, _ in pages]
+        self.assertEqual(relative_sources, [
+            "about.md",
+            os.path.join("blog", "glorfindel", "index.md"),
+            os.path.join("blog", "tom", "index.md"),
+            "index.md",
+        ])
+
+    def test_skips_non_markdown_files(self):
+        pages = find_content_pages(self.content_dir, self.dest_dir)
+        self.assertFalse(any(source.endswith(".txt") for source, _ in pages))
+
+    def test_missing_content_dir_raises(self):
+        with self.assertRaises(ValueError):
+            find_content_pages(os.path.join(self.tmp.name, "missing"), self.dest_dir)
+
+
+class TestParallelBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for relative_path, text in {**{f"content/{key}": text for key, text in PAGES.items()},
+                                    "static/index.css": "body {}",
+                                    "template.html": "<title>{{ Title }}</title>{{ Content }}"}.items():
+            path = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, jobs):
+        dest = os.path.join(self.root, f"public-{jobs}")
+        site = SitePaths(os.path.join(self.root, "static"), os.path.join(self.root, "content"),
+                         os.path.join(self.root, "template.html"), dest,
+                         os.path.join(self.root, f"cache-{jobs}", "build-manifest.json"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNotNone(build_site(site, jobs=jobs, full=True))
+        tree = {}
+        for directory, _, names in os.walk(dest):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    tree[os.path.relpath(path, dest)] = f.read()
+        return tree
+
+    def test_parallel_output_is_byte_identical(self):
+        serial = self.build(1)
+        self.assertEqual(len(serial), len(PAGES) + 1)
+        self.assertEqual(self.build(2), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
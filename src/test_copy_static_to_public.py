@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from copy_static_to_public import (
+    CLONED,
+    COPIED,
+    LINKED,
+    SKIPPED,
+    copy_recursive,
+    is_up_to_date,
+    sync_file,
+    sync_tree,
+)
+
+
+class TestSyncFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static", "images", "pic.png")
+        self.dest = os.path.join(self.tmp.name, "public", "images", "pic.png")
+        os.makedirs(os.path.dirname(self.source))
+        with open(self.source, "wb") as f:
+            f.write(b"\x89PNG" + bytes(range(256)) * 64)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_copy_creates_identical_file_with_same_mtime(self):
+        self.assertIn(sync_file(self.source, self.dest), (CLONED, COPIED))
+        self.assertEqual(self._read(self.dest), self._read(self.source))
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, os.stat(self.source).st_mtime_ns)
+        self.assertFalse(os.path.samefile(self.source, self.dest))
+
+    def test_unchanged_file_is_skipped(self):
+        sync_file(self.source, self.dest)
+        self.assertTrue(is_up_to_date(self.source, self.dest))
+        self.assertEqual(sync_file(self.source, self.dest), SKIPPED)
+
+    def test_force_copies_unchanged_file(self):
+        sync_file(self.source, self.dest)
+        self.assertNotEqual(sync_file(self.source, self.dest, force=True), SKIPPED)
+
+    def test_modified_source_is_copied_again(self):
+        sync_file(self.source, self.dest)
+        with open(self.source, "ab") as f:
+            f.write(b"more")
+        self.assertNotEqual(sync_file(self.source, self.dest), SKIPPED)
+        self.assertEqual(self._read(self.dest), self._read(self.source))
+
+    def test_link_mode_hard_links(self):
+        self.assertEqual(sync_file(self.source, self.dest, mode="link"), LINKED)
+        self.assertTrue(os.path.samefile(self.source, self.dest))
+        self.assertEqual(sync_file(self.source, self.dest, mode="link"), SKIPPED)
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            sync_file(self.source, self.dest, mode="teleport")
+
+
+class TestSyncTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source_dir = os.path.join(self.tmp.name, "static")
+        self.dest_dir = os.path.join(self.tmp.name, "public")
+        for relative_path in ["index.css", "images/a.png", "images/deep/b.png"]:
+            path = os.path.join(self.source_dir, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(relative_path)
+        os.makedirs(self.dest_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_everything_then_skips(self):
+        first = sync_tree(self.source_dir, self.dest_dir)
+        self.assertEqual(sum(first.values()), 3)
+        self.assertEqual(first[SKIPPED], 0)
+        with open(os.path.join(self.dest_dir, "images", "deep", "b.png"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "images/deep/b.png")
+        self.assertEqual(sync_tree(self.source_dir, self.dest_dir)[SKIPPED], 3)
+
+    def test_copy_recursive_validates_paths(self):
+        with self.assertRaises(ValueError):
+            copy_recursive(os.path.join(self.tmp.name, "missing"), self.dest_dir)
+        with self.assertRaises(ValueError):
+            copy_recursive(self.source_dir, os.path.join(self.tmp.name, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+
+from dev_server import DevServer, FileWatcher, LIVE_RELOAD_SNIPPET, ReloadBroadcaster, inject_live_reload
+
+
+class TestInjectLiveReload(unittest.TestCase):
+
+    def test_inserts_before_closing_body(self):
+        html = b"<html><body><p>x</p></body></html>"
+        self.assertEqual(
+            inject_live_reload(html),
+            b"<html><body><p>x</p>" + LIVE_RELOAD_SNIPPET + b"</body></html>",
+        )
+
+    def test_closing_body_is_case_insensitive(self):
+        self.assertIn(LIVE_RELOAD_SNIPPET + b"</BODY>", inject_live_reload(b"<BODY>x</BODY>"))
+
+    def test_appends_without_body(self):
+        self.assertEqual(inject_live_reload(b"<p>x</p>"), b"<p>x</p>" + LIVE_RELOAD_SNIPPET)
+
+
+class TestReloadBroadcaster(unittest.TestCase):
+
+    def test_wait_returns_after_notify(self):
+        broadcaster = ReloadBroadcaster()
+        threading.Timer(0.01, broadcaster.notify).start()
+        self.assertEqual(broadcaster.wait(0, timeout=5), 1)
+
+    def test_wait_times_out(self):
+        self.assertEqual(ReloadBroadcaster().wait(0, timeout=0.01), 0)
+
+    def test_close_wakes_without_new_version(self):
+        broadcaster = ReloadBroadcaster()
+        threading.Timer(0.01, broadcaster.close).start()
+        self.assertEqual(broadcaster.wait(0, timeout=5), 0)
+        self.assertTrue(broadcaster.closed)
+
+
+class TestFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.existing = os.path.join(self.root, "a.md")
+        self._write(self.existing, "a")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_no_changes(self):
+        self.assertEqual(FileWatcher([self.root]).poll(), set())
+
+    def test_detects_added_modified_and_removed(self):
+        watcher = FileWatcher([self.root])
+        added = os.path.join(self.root, "blog", "b.md")
+        self._write(added, "b")
+        self._write(self.existing, "a changed")
+        self.assertEqual(watcher.poll(), {added, self.existing})
+        os.remove(added)
+        self.assertEqual(watcher.poll(), {added})
+
+    def test_watches_single_file(self):
+        watcher = FileWatcher([self.existing])
+        self._write(self.existing, "longer contents")
+        self.assertEqual(watcher.poll(), {self.existing})
+
+
+class TestDevServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "index.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body>hi</body></html>")
+        with open(os.path.join(self.tmp.name, "index.css"), "w", encoding="utf-8") as f:
+            f.write("body {}")
+        self.server = DevServer(("127.0.0.1", 0), self.tmp.name, quiet=True)
+        self.server.start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_html_gets_live_reload_script(self):
+        with urllib.request.urlopen(self.base + "/") as response:
+            self.assertIn(LIVE_RELOAD_SNIPPET, response.read())
+
+    def test_other_files_are_served_unchanged(self):
+        with urllib.request.urlopen(self.base + "/index.css") as response:
+            self.assertEqual(response.read(), b"body {}")
+
+    def test_reload_event_is_pushed(self):
+        with urllib.request.urlopen(self.base + "/__livereload", timeout=5) as response:
+            # Give the handler time to start waiting before announcing a rebuild.
+            time.sleep(0.05)
+            self.server.broadcaster.notify()
+            self.assertEqual(response.readline(), b"event: reload\n")
+            self.assertEqual(response.readline(), b"data: 1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
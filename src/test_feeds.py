@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from build_manifest import BuildManifest
+from feeds import ATOM_FILE, RSS_FILE, feed_pages, remove_feeds, write_feeds
+from metadata_index import MetadataIndex, PageMetadata
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def page(key, url, title, date, tags=(), draft=False):
+    return key, PageMetadata(key, url, title, date, tags, draft)
+
+
+class TestFeeds(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+        self.manifest = BuildManifest(os.path.join(self.dest, "manifest.json"))
+        self.index = MetadataIndex(dict([
+            page("index.md", "/", "My <Site>", None),
+            page("old.md", "/old.html", "Old", "2023-01-01"),
+            page("new.md", "/new.html", "New & shiny", "2024-06-01T12:30:00+02:00", ("python",)),
+            page("draft.md", "/draft.html", "Draft", "2025-01-01", draft=True),
+            page("bad-date.md", "/bad.html", "Bad", "last tuesday"),
+        ]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_feed_pages_are_newest_dated_published(self):
+        self.assertEqual([p.key for p in feed_pages(self.index)], ["new.md", "old.md"])
+        self.assertEqual([p.key for p in feed_pages(self.index, limit=1)], ["new.md"])
+
+    def test_rss(self):
+        write_feeds(self.index, self.dest, "https://example.com", self.manifest)
+        channel = ET.parse(os.path.join(self.dest, RSS_FILE)).getroot().find("channel")
+        self.assertEqual(channel.findtext("title"), "My <Site>")
+        items = channel.findall("item")
+        self.assertEqual([item.findtext("title") for item in items], ["New & shiny", "Old"])
+        self.assertEqual(items[0].findtext("link"), "https://example.com/new.html")
+        self.assertEqual(items[0].findtext("pubDate"), "Sat, 01 Jun 2024 12:30:00 +0200")
+        self.assertEqual(items[0].findtext("category"), "python")
+
+    def test_atom(self):
+        write_feeds(self.index, self.dest, "https://example.com", self.manifest)
+        feed = ET.parse(os.path.join(self.dest, ATOM_FILE)).getroot()
+        self.assertEqual(feed.findtext(ATOM + "updated"), "2024-06-01T12:30:00+02:00")
+        entries = feed.findall(ATOM + "entry")
+        self.assertEqual([entry.findtext(ATOM + "id") for entry in entries],
+                         ["https://example.com/new.html", "https://example.com/old.html"])
+        self.assertEqual(entries[1].findtext(ATOM + "updated"), "2023-01-01T00:00:00Z")
+
+    def test_unchanged_feeds_are_reused(self):
+        self.assertEqual(write_feeds(self.index, self.dest, "https://example.com", self.manifest)["written"], 2)
+        self.assertEqual(write_feeds(self.index, self.dest, "https://example.com", self.manifest)["written"], 0)
+        self.index.pages["old.md"] = self.index.pages["old.md"]._replace(title="Renamed")
+        self.assertEqual(write_feeds(self.index, self.dest, "https://example.com", self.manifest)["written"], 2)
+
+    def test_remove_feeds(self):
+        write_feeds(self.index, self.dest, "https://example.com", self.manifest)
+        remove_feeds(self.manifest, self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, RSS_FILE)))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, ATOM_FILE)))
+        self.assertEqual(list(self.manifest.keys("generated")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
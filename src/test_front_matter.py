@@ -0,0 +1,102 @@
+import datetime
+import io
+import unittest
+
+import front_matter
+from front_matter import FrontMatterError, read_front_matter, split_front_matter
+
+YAML_PAGE = """---
+title: "Hello: world"
+date: 2024-05-01
+tags: [python, ssg]
+draft: true
+---
+# Body heading
+
+Text
+"""
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+
+    def test_yaml(self):
+        metadata, body = split_front_matter(YAML_PAGE)
+        self.assertEqual(metadata["title"], "Hello: world")
+        self.assertEqual(metadata["tags"], ["python", "ssg"])
+        self.assertIs(metadata["draft"], True)
+        self.assertEqual(body, "# Body heading\n\nText\n")
+
+    def test_toml(self):
+        metadata, body = split_front_matter('+++\ntitle = "T"\ndate = 2024-05-01\ntags = ["a"]\n+++\nBody')
+        self.assertEqual(metadata, {"title": "T", "date": datetime.date(2024, 5, 1), "tags": ["a"]})
+        self.assertEqual(body, "Body")
+
+    def test_no_front_matter(self):
+        text = "# Title\n\n---\n\nnot front matter\n"
+        self.assertEqual(split_front_matter(text), ({}, text))
+        self.assertEqual(split_front_matter("----\nrule"), ({}, "----\nrule"))
+
+    def test_empty_front_matter_and_crlf(self):
+        self.assertEqual(split_front_matter("---\r\n---\r\nBody"), ({}, "Body"))
+
+    def test_errors(self):
+        for text in ("---\ntitle: [unclosed\n---\n", "+++\ntitle = \n+++\n"):
+            with self.assertRaises(FrontMatterError, msg=text):
+                split_front_matter(text)
+
+    def test_thematic_break_is_body(self):
+        # Never closed, or closed around something that isn't a mapping: a rule, not front matter.
+        for text in ("---\ntitle: x\n", "---\n\nA paragraph between rules.\n\n---\n\nMore\n", "---\n- a list\n---\n"):
+            self.assertEqual(split_front_matter(text), ({}, text), text)
+
+
+class TestReadFrontMatter(unittest.TestCase):
+
+    def test_stops_at_closing_delimiter(self):
+        stream = io.StringIO(YAML_PAGE)
+        metadata, body_lines = read_front_matter(stream)
+        self.assertEqual(metadata["title"], "Hello: world")
+        # Nothing past the closing delimiter has been consumed.
+        self.assertEqual(next(body_lines), "# Body heading\n")
+
+    def test_thematic_break_keeps_every_line(self):
+        text = "---\n\nA paragraph between rules.\n\n---\n\nMore\n"
+        metadata, body_lines = read_front_matter(io.StringIO(text))
+        self.assertEqual(metadata, {})
+        self.assertEqual("".join(body_lines), text)
+        metadata, body_lines = read_front_matter(io.StringIO("---\ntitle: x\n"))
+        self.assertEqual((metadata, list(body_lines)), ({}, ["---\n", "title: x\n"]))
+
+    def test_without_front_matter_keeps_first_line(self):
+        metadata, body_lines = read_front_matter(io.StringIO("# Title\nText\n"))
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(body_lines), ["# Title\n", "Text\n"])
+
+
+class TestSimpleYaml(unittest.TestCase):
+
+    def setUp(self):
+        self.yaml = front_matter.yaml
+        front_matter.yaml = None
+
+    def tearDown(self):
+        front_matter.yaml = self.yaml
+
+    def test_without_pyyaml(self):
+        metadata, _ = split_front_matter(
+            "---\ntitle: 'Quoted'\ndate: 2024-05-01\ndraft: false\ncount: 3\ntags:\n  - a\n  - b\nempty:\n---\n"
+        )
+        self.assertEqual(metadata, {"title": "Quoted", "date": "2024-05-01", "draft": False, "count": 3,
+                                    "tags": ["a", "b"], "empty": None})
+
+    def test_unsupported_yaml_is_an_error(self):
+        with self.assertRaises(FrontMatterError):
+            split_front_matter("---\nnested:\n  key: value\n---\n")
+
+    def test_text_between_rules_is_body(self):
+        text = "---\nJust a paragraph.\n---\n"
+        self.assertEqual(split_front_matter(text), ({}, text))
+
+
+if __name__ == "__main__":
+    unittest.main()
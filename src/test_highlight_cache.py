@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import markdown
+
+from highlight_cache import (
+    HIGHLIGHT_CACHE,
+    disable_deferred_highlighting,
+    enable_deferred_highlighting,
+    get_highlight_pool_settings,
+    start_highlight_pool,
+)
+from main import _init_render_worker, parse_args, render_pages
+from markdown_renderer import MARKDOWN_EXTENSIONS, MarkdownRenderer
+from render_cache import disable_render_cache, enable_render_cache
+
+CODE = "```python\ndef f():\n    return 1\n```"
+
+
+class FailingExecutor:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(RuntimeError("worker died"))
+        return future
+
+
+class TestHighlightCache(unittest.TestCase):
+
+    def setUp(self):
+        self.renderer = MarkdownRenderer(warm_languages=())
+        self.cache = enable_render_cache(name=HIGHLIGHT_CACHE)
+
+    def tearDown(self):
+        disable_render_cache(HIGHLIGHT_CACHE)
+        disable_deferred_highlighting()
+
+    def expected(self, text):
+        return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+    def test_repeated_block_is_highlighted_once(self):
+        first = self.renderer.render(CODE)
+        second = self.renderer.render("Intro\n\n" + CODE)
+        self.assertEqual(first, self.expected(CODE))
+        self.assertEqual(second, self.expected("Intro\n\n" + CODE))
+        self.assertEqual(self.cache.stats["misses"], 1)
+        self.assertEqual(self.cache.stats["memory_hits"], 1)
+
+    def test_language_is_part_of_the_key(self):
+        self.renderer.render(CODE)
+        bash = CODE.replace("python", "bash")
+        self.assertEqual(self.renderer.render(bash), self.expected(bash))
+        self.assertEqual(self.cache.stats["misses"], 2)
+
+    def test_deferred_blocks_are_filled_in(self):
+        text = "# Title\n\n" + CODE + "\n\nBetween\n\n" + CODE.replace("1", "2") + "\n\n" + CODE
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            enable_deferred_highlighting(executor, min_lines=2)
+            html = self.renderer.render(text)
+        self.assertEqual(html, self.expected(text))
+        self.assertNotIn("deferred-highlight", html)
+
+    def test_small_blocks_are_not_deferred(self):
+        enable_deferred_highlighting(FailingExecutor(), min_lines=100)
+        self.assertEqual(self.renderer.render(CODE), self.expected(CODE))
+
+    def test_failed_pool_highlights_inline(self):
+        enable_deferred_highlighting(FailingExecutor(), min_lines=1)
+        self.assertEqual(self.renderer.render(CODE), self.expected(CODE))
+
+
+class TestHighlightWorkersOption(unittest.TestCase):
+
+    def tearDown(self):
+        disable_deferred_highlighting()
+
+    def test_allowed_with_several_render_processes(self):
+        self.assertEqual(parse_args(["--highlight-workers", "2", "-j", "4"]).highlight_workers, 2)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--highlight-workers", "-1"])
+
+    def test_render_worker_starts_its_own_pool(self):
+        _init_render_worker("python-markdown", False, {}, None, None, False, (3, 50))
+        self.assertEqual(get_highlight_pool_settings(), (3, 50))
+
+    def test_parallel_pages_match_inline_highlighting(self):
+        with tempfile.TemporaryDirectory() as root:
+            template = os.path.join(root, "template.html")
+            with open(template, "w", encoding="utf-8") as f:
+                f.write("{{ Content }}")
+            pages = []
+            for number in range(4):
+                source = os.path.join(root, f"page{number}.md")
+                with open(source, "w", encoding="utf-8") as f:
+                    f.write(f"# Page {number}\n\n" + CODE.replace("1", str(number)) + "\n\nText\n\n" + CODE)
+                pages.append((source, template, os.path.join(root, "public", f"page{number}.html")))
+
+            def rendered():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertEqual(render_pages(pages, jobs=2), [True] * len(pages))
+                outputs = []
+                for _, _, dest in pages:
+                    with open(dest, encoding="utf-8") as f:
+                        outputs.append(f.read())
+                return outputs
+
+            inline = rendered()
+            start_highlight_pool(1, min_lines=2).shutdown()
+            deferred = rendered()
+        self.assertEqual(deferred, inline)
+        self.assertFalse(any("deferred-highlight" in page for page in deferred))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 # test_htmlnode.py
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+import sys
+
+from html_escape import escape_attribute, escape_text, render_attributes
+from htmlnode import HTMLNode, LeafNode, ParentNode, iter_html, write_html
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_empty(self):
@@ -90,6 +94,13 @@ class TestLeafNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             LeafNode("p", None).to_html()
 
+    def test_leaves_share_empty_children_and_props(self):
+        first = LeafNode("b", "one")
+        second = LeafNode("i", "two")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+        self.assertFalse(hasattr(first, "__dict__"))
+
 class TestParentNode(unittest.TestCase):
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
@@ -142,3 +153,54 @@ class TestParentNode(unittest.TestCase):
         child = LeafNode("p", "test") # changed to LeafNode
         node = ParentNode("div", [child])
         self.assertEqual(node.to_html(), "<div><p>test</p></div>")
+
+class TestStreamingSerializer(unittest.TestCase):
+    def test_write_html_matches_to_html(self):
+        node = ParentNode("div", [
+            LeafNode("b", "bold"),
+            ParentNode("p", [LeafNode(None, "text "), LeafNode("a", "link", {"href": "/x"})], {"class": "c"}),
+        ])
+        stream = io.StringIO()
+        write_html(node, stream)
+        self.assertEqual(stream.getvalue(), node.to_html())
+        self.assertEqual(stream.getvalue(), '<div><b>bold</b><p class="c">text <a href="/x">link</a></p></div>')
+
+    def test_deep_tree_does_not_recurse(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode(None, "leaf")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * depth + "leaf"))
+        self.assertTrue(html.endswith("</span>" * depth))
+
+    def test_iter_html_raises_for_parent_without_tag(self):
+        node = ParentNode("div", [ParentNode(None, [LeafNode("p", "x")])])
+        with self.assertRaises(ValueError):
+            list(iter_html(node))
+
+class TestEscaping(unittest.TestCase):
+    def test_leaf_values_are_escaped(self):
+        self.assertEqual(LeafNode("code", "a < b && c > d").to_html(), "<code>a &lt; b &amp;&amp; c &gt; d</code>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
+    def test_attribute_values_are_escaped(self):
+        node = LeafNode("a", "x", {"href": '/search?q="a"&b=<c>', "data-count": 10})
+        self.assertEqual(node.props_to_html(), ' href="/search?q=&quot;a&quot;&amp;b=&lt;c&gt;" data-count="10"')
+
+    def test_text_without_specials_is_returned_as_is(self):
+        text = "plain text " * 10
+        self.assertIs(escape_text(text), text)
+        self.assertEqual(escape_attribute(True), "True")
+
+    def test_attribute_strings_are_cached(self):
+        first = render_attributes({"href": "/same", "title": "t"})
+        self.assertIs(render_attributes({"href": "/same", "title": "t"}), first)
+        self.assertEqual(render_attributes({"id": 1}), ' id="1"')
+        self.assertEqual(render_attributes({"id": True}), ' id="True"')
+        self.assertEqual(render_attributes({"class": ["a", "b"]}), ' class="[\'a\', \'b\']"')
+
+    def test_adjacent_text_leaves_are_one_run(self):
+        node = ParentNode("p", [LeafNode(None, "a &"), LeafNode(None, " b"), LeafNode("b", "c"), LeafNode(None, "<")])
+        self.assertEqual(list(iter_html(node)), ["<p>", "a &amp; b", "<b>c</b>", "&lt;", "</p>"])
+        self.assertEqual(node.to_html(), "<p>a &amp; b<b>c</b>&lt;</p>")
@@ -0,0 +1,209 @@
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import images
+from build_manifest import BuildManifest, fingerprint_file
+from images import (
+    IMAGES_SECTION, ImageInfo, add_image_attributes, disable_image_attributes, image_size, process_images,
+    remove_image_variants,
+)
+from main import SitePaths, build_site, rebuild_changed
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\0\0\0"
+
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    sof = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 3) + b"\0" * 3
+    return b"\xff\xd8" + app0 + sof + b"\xff\xda"
+
+
+class TestImageSize(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return image_size(path)
+
+    def test_formats(self):
+        self.assertEqual(self.size(png_header(1026, 388)), (1026, 388))
+        self.assertEqual(self.size(b"GIF89a" + struct.pack("<HH", 320, 200) + b"\0" * 20), (320, 200))
+        self.assertEqual(self.size(jpeg_header(4000, 3000)), (4000, 3000))
+        vp8x = b"RIFF\0\0\0\0WEBPVP8X" + b"\0" * 8 + (799).to_bytes(3, "little") + (599).to_bytes(3, "little")
+        self.assertEqual(self.size(vp8x), (800, 600))
+        # 14 bits each of width - 1 and height - 1 after the 0x2f signature.
+        vp8l = b"RIFF\0\0\0\0WEBPVP8L\0\0\0\0\x2f" + (63 | 299 << 14).to_bytes(4, "little")
+        self.assertEqual(self.size(vp8l), (64, 300))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size(b"<svg xmlns='http://www.w3.org/2000/svg'/>"))
+        self.assertIsNone(self.size(jpeg_header(10, 10)[:24]))
+
+    def test_jpeg_segment_shorter_than_its_length_field(self):
+        for length in (0, 1):
+            self.assertIsNone(self.size(b"\xff\xd8\xff\xe0" + struct.pack(">H", length) + b"\0" * 32))
+
+
+class TestAddImageAttributes(unittest.TestCase):
+
+    index = {
+        "images/big.png": ImageInfo(1200, 800, ((480, "images/big-480w.png"), (960, "images/big-960w.png"))),
+        "blog/small.gif": ImageInfo(16, 16, ()),
+    }
+
+    def test_dimensions_and_srcset(self):
+        page = '<p><img alt="Big" src="/images/big.png" /> <img src="small.gif" alt="Small"></p>'
+        self.assertEqual(add_image_attributes(page, "/blog/post.html", self.index), (
+            '<p><img alt="Big" src="/images/big.png" width="1200" height="800" '
+            'srcset="/images/big-480w.png 480w, /images/big-960w.png 960w, /images/big.png 1200w" '
+            'sizes="(max-width: 1200px) 100vw, 1200px" /> '
+            '<img src="small.gif" alt="Small" width="16" height="16"></p>'
+        ))
+
+    def test_unknown_and_sized_images_are_left_alone(self):
+        page = '<img src="/missing.png"><img src="/images/big.png" width="100"><img src="https://x/images/big.png">'
+        self.assertEqual(add_image_attributes(page, "/", self.index), page)
+
+
+class TestProcessImages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.cache = os.path.join(self.tmp.name, "cache")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.add("images/photo.png", png_header(1000, 500))
+        self.add("images/icon.png", png_header(64, 64))
+        self.add("style.css", b"body {}")
+        patches = [mock.patch.object(images, "Image", object()),
+                   mock.patch.object(images, "resize_image", side_effect=self.resize)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, key, data):
+        path = os.path.join(self.static, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        # What copy_static_incremental records for a synced file.
+        self.manifest.set("static", key, fingerprint_file(path))
+
+    @staticmethod
+    def resize(job):
+        _, cache_path, width = job
+        with open(cache_path, "wb") as f:
+            f.write(str(width).encode())
+
+    def process(self):
+        return process_images(self.manifest, self.static, self.public, self.cache)
+
+    def test_variants_narrower_than_the_original(self):
+        counts = self.process()
+        self.assertEqual(counts, {"images": 2, "measured": 2, "unchanged": 0, "resized": 2, "cached": 0})
+        entry = self.manifest.get(IMAGES_SECTION, "images/photo.png")
+        self.assertEqual((entry["width"], entry["height"]), (1000, 500))
+        self.assertEqual(entry["variants"], [[480, "images/photo-480w.png"], [960, "images/photo-960w.png"]])
+        with open(os.path.join(self.public, "images", "photo-960w.png"), "rb") as f:
+            self.assertEqual(f.read(), b"960")
+        self.assertEqual(self.manifest.get(IMAGES_SECTION, "images/icon.png")["variants"], [])
+
+    def test_unchanged_images_are_never_resized_again(self):
+        self.process()
+        self.assertEqual(self.process(), {"images": 2, "measured": 0, "unchanged": 2, "resized": 0, "cached": 0})
+        # A fresh output tree and manifest still take the variants from the transform cache.
+        self.manifest.clear(IMAGES_SECTION)
+        os.remove(os.path.join(self.public, "images", "photo-480w.png"))
+        self.assertEqual(self.process(), {"images": 2, "measured": 2, "unchanged": 0, "resized": 0, "cached": 2})
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", "photo-480w.png")))
+
+    def test_changed_and_removed_images(self):
+        self.process()
+        self.add("images/photo.png", png_header(600, 300))
+        self.assertEqual(self.process()["resized"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "photo-960w.png")))
+        self.manifest.pop("static", "images/photo.png")
+        self.process()
+        self.assertIsNone(self.manifest.get(IMAGES_SECTION, "images/photo.png"))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "photo-480w.png")))
+
+    def test_remove_image_variants(self):
+        self.process()
+        remove_image_variants(self.manifest, self.public)
+        self.assertEqual(list(self.manifest.keys(IMAGES_SECTION)), [])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+
+
+class TestImagePages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.site = SitePaths(os.path.join(root, "static"), os.path.join(root, "content"),
+                              os.path.join(root, "template.html"), os.path.join(root, "public"),
+                              os.path.join(root, ".cache", "build-manifest.json"))
+        self.write(self.site.template_file, "{{ Content }}")
+        self.write(os.path.join(self.site.static_dir, "photo.png"), png_header(1000, 500))
+        self.write(os.path.join(self.site.static_dir, "icon.png"), png_header(64, 64))
+        self.write(os.path.join(self.site.content_dir, "index.md"), "![Photo](photo.png)")
+        self.write(os.path.join(self.site.content_dir, "about.md"), "![Icon](/icon.png)")
+        self.write(os.path.join(self.site.content_dir, "plain.md"), "No images")
+        patch = mock.patch.object(images, "Image", None)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(disable_image_attributes)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data.encode() if isinstance(data, str) else data)
+
+    def build(self, images=True):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNotNone(build_site(self.site, images=images))
+        return next(line for line in output.getvalue().splitlines() if line.startswith("Pages:"))
+
+    def test_only_pages_showing_a_changed_image_are_rendered(self):
+        self.assertEqual(self.build(), "Pages: 3 rendered, 0 unchanged, 0 removed.")
+        self.write(os.path.join(self.site.static_dir, "icon.png"), png_header(32, 32))
+        self.assertEqual(self.build(), "Pages: 1 rendered, 2 unchanged, 0 removed.")
+        with open(os.path.join(self.site.dest_dir, "about.html"), encoding="utf-8") as f:
+            self.assertIn('width="32" height="32"', f.read())
+        self.assertEqual(self.build(), "Pages: 0 rendered, 3 unchanged, 0 removed.")
+        icon = os.path.join(self.site.static_dir, "icon.png")
+        self.write(icon, png_header(16, 16))
+        manifest = BuildManifest.load(self.site.manifest_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(rebuild_changed([icon], self.site, manifest, images=True), (1, 1))
+        with open(os.path.join(self.site.dest_dir, "about.html"), encoding="utf-8") as f:
+            self.assertIn('width="16" height="16"', f.read())
+        manifest.save()
+        # Turning images off drops every image's attributes.
+        self.assertEqual(self.build(images=False), "Pages: 2 rendered, 1 unchanged, 0 removed.")
+        self.assertEqual(list(BuildManifest.load(self.site.manifest_file).keys(IMAGES_SECTION)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
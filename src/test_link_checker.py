@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import link_checker
+from build_manifest import GENERATED_SECTION, BuildManifest, fingerprint_file
+from link_checker import IMAGE, LINK, PAGE_LINKS_TABLE, BrokenLink, check_links, page_links, resolve_link
+from metadata_index import MetadataIndex, PageMetadata, page_url
+
+
+class TestPageLinks(unittest.TestCase):
+
+    def test_links_and_images_outside_code(self):
+        markdown = (
+            "# [Home](/)\n\n"
+            "See ![logo](/images/logo.png) and [docs]( docs.html ).\n\n"
+            "```\n[not a link](nowhere.html)\n```"
+        )
+        self.assertEqual(page_links(markdown), [(LINK, "/"), (LINK, "docs.html"), (IMAGE, "/images/logo.png")])
+
+
+class TestResolveLink(unittest.TestCase):
+
+    def test_relative_and_absolute(self):
+        self.assertEqual(resolve_link("/blog/post.html", "other.html#top"), "blog/other.html")
+        self.assertEqual(resolve_link("/blog/", "../about.html?x=1"), "about.html")
+        self.assertEqual(resolve_link("/blog/", "./"), "blog/index.html")
+        self.assertEqual(resolve_link("/", "/images/a%20b.png"), "images/a b.png")
+        self.assertEqual(resolve_link("/", "/../../escape.html"), "escape.html")
+
+    def test_external_and_fragments_are_skipped(self):
+        for target in ("https://example.com", "mailto:me@example.com", "//cdn.example.com/x.js", "#top", ""):
+            self.assertIsNone(resolve_link("/", target))
+
+
+class TestCheckLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.index = MetadataIndex()
+        self.manifest.set("static", "images/logo.png", {})
+        self.manifest.set(GENERATED_SECTION, "rss.xml", {})
+        self.write("index.md", "[Blog](/blog) [About](about.html) ![Logo](images/logo.png) [Feed](/rss.xml)")
+        self.write("blog/index.md", "[First](first.html) [Home](../) [Gone](/gone.html)")
+        self.write("blog/first.md", "[Blog](./) [Self](first.html) ![Missing](missing.png)")
+        self.write("about.md", "[Elsewhere](https://example.com)")
+        self.write("lonely.md", "[Lonely](lonely.html)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, key, text):
+        path = os.path.join(self.content, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        output = key[:-3] + ".html"
+        # What generate_pages_incremental records for a rendered page.
+        self.manifest.set("pages", key, {**fingerprint_file(path), "output": output})
+        url = page_url(os.path.join(self.public, output), self.public)
+        self.index.pages[key] = PageMetadata(key, url, key, None, (), False)
+
+    def test_broken_links_and_orphans(self):
+        report = check_links(self.index, self.content, self.manifest)
+        self.assertEqual(report.links, 11)
+        self.assertEqual(report.broken, [
+            BrokenLink("blog/first.md", IMAGE, "missing.png"),
+            BrokenLink("blog/index.md", LINK, "/gone.html"),
+        ])
+        # Linking to itself doesn't count.
+        self.assertEqual(report.orphans, ["lonely.md"])
+
+    def test_unchanged_pages_are_not_read_again(self):
+        check_links(self.index, self.content, self.manifest)
+        self.write("lonely.md", "[Gone](/gone.html)")
+        with mock.patch.object(link_checker, "page_links", wraps=link_checker.page_links) as read:
+            report = check_links(self.index, self.content, self.manifest)
+        self.assertEqual(read.call_count, 1)
+        self.assertIn(BrokenLink("lonely.md", LINK, "/gone.html"), report.broken)
+
+    def test_fixing_a_link_needs_only_the_new_output(self):
+        check_links(self.index, self.content, self.manifest)
+        self.write("gone.md", "[Home](/)")
+        report = check_links(self.index, self.content, self.manifest)
+        self.assertEqual(report.broken, [BrokenLink("blog/first.md", IMAGE, "missing.png")])
+        self.assertEqual(report.orphans, ["lonely.md"])
+
+    def test_links_are_kept_out_of_the_manifest(self):
+        check_links(self.index, self.content, self.manifest)
+        self.manifest.save()
+        with open(self.manifest.path, encoding="utf-8") as f:
+            self.assertNotIn("gone.html", f.read())
+        links_path = self.manifest.table(PAGE_LINKS_TABLE).path
+        mtime = os.stat(links_path).st_mtime_ns
+        self.manifest = BuildManifest.load(self.manifest.path)
+        with mock.patch.object(link_checker, "page_links", wraps=link_checker.page_links) as read:
+            report = check_links(self.index, self.content, self.manifest)
+        read.assert_not_called()
+        self.assertEqual(len(report.broken), 2)
+        self.manifest.save()
+        self.assertEqual(os.stat(links_path).st_mtime_ns, mtime)
+
+        # Without the table, pages are read again.
+        os.remove(links_path)
+        self.manifest = BuildManifest.load(self.manifest.path)
+        self.assertEqual(check_links(self.index, self.content, self.manifest), report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import markdown
+
+from markdown_renderer import (
+    MARKDOWN_EXTENSIONS,
+    MarkdownRenderer,
+    cached_html_formatter,
+    cached_lexer_by_name,
+    get_markdown_renderer,
+)
+
+
+class TestMarkdownRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.renderer = MarkdownRenderer(warm_languages=())
+
+    def assertSameAsMarkdown(self, text):
+        self.assertEqual(self.renderer.render(text), markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS))
+
+    def test_matches_markdown_markdown(self):
+        self.assertSameAsMarkdown("# Title\n\nSome *text* and a [link](/x).\n\n| a | b |\n|---|---|\n| 1 | 2 |")
+
+    def test_highlighted_code_matches(self):
+        self.assertSameAsMarkdown("```python\ndef f():\n    return 1\n```")
+        self.assertSameAsMarkdown("```python hl_lines=\"2\"\na = 1\nb = 2\n```")
+        self.assertSameAsMarkdown("```no-such-language\nplain\n```")
+
+    def test_no_state_leaks_between_documents(self):
+        self.renderer.render("[ref]: /somewhere\n\n[a link][ref]")
+        self.assertEqual(self.renderer.render("[a link][ref]"), "<p>[a link][ref]</p>")
+
+    def test_renderer_is_shared_per_process(self):
+        self.assertIs(get_markdown_renderer(), get_markdown_renderer())
+
+
+class TestPygmentsCaches(unittest.TestCase):
+
+    def test_lexer_is_reused(self):
+        self.assertIs(cached_lexer_by_name("python", stripnl=False), cached_lexer_by_name("python", stripnl=False))
+        self.assertIsNot(cached_lexer_by_name("python", stripnl=False), cached_lexer_by_name("python"))
+
+    def test_unknown_lexer_raises_every_time(self):
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cached_lexer_by_name("no-such-language")
+
+    def test_formatter_is_reused_per_options(self):
+        first = cached_html_formatter(lang_str="language-python", cssclass="codehilite", hl_lines=[1])
+        second = cached_html_formatter(lang_str="language-bash", cssclass="codehilite", hl_lines=[1])
+        self.assertIs(first, second)
+        self.assertIsNot(first, cached_html_formatter(cssclass="other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
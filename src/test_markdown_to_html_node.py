@@ -1,6 +1,10 @@
 # Contents of test_markdown_to_html_node.py
+import io
 import unittest
-from markdown_to_html_node import markdown_to_html_node, HTMLNode, HTMLNodeType
+from markdown_to_blocks import iter_markdown_blocks
+from markdown_to_html_node import (
+    iter_block_nodes, markdown_to_html, markdown_to_html_node, html_node_to_html, text_to_children, HTMLNode, HTMLNodeType
+)
 
 class TestMarkdownToHTMLNode(unittest.TestCase):
 
@@ -58,4 +62,121 @@ This is another paragraph with _italic_ text and `code` here
         node = markdown_to_html_node(md)
         html = self.to_html(node)
         expected_html = "<div><pre><code>print('hello')\n</code></pre></div>"
-        self.assertEqual(html.replace("\n", ""), expected_html.replace("\n", ""))
\ No newline at end of file
+        self.assertEqual(html.replace("\n", ""), expected_html.replace("\n", ""))
+
+    def test_codeblock_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(self.to_html(node), "<div><pre><code>\nfirst\n\nsecond\n</code></pre></div>")
+
+    def test_iter_block_nodes_streams_a_file(self):
+        md = "# Title\n\nSome _text_\n\n- one\n- two\n"
+        nodes = list(iter_block_nodes(iter_markdown_blocks(io.StringIO(md))))
+        self.assertEqual(
+            "".join(self.to_html(node) for node in nodes),
+            self.to_html(markdown_to_html_node(md))[len("<div>"):-len("</div>")],
+        )
+
+class TestTextToChildren(unittest.TestCase):
+
+    def test_plain_text_is_one_node(self):
+        children = text_to_children("just a long run of plain text")
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0].node_type, HTMLNodeType.TEXT)
+        self.assertEqual(children[0].text, "just a long run of plain text")
+
+    def test_nested_emphasis(self):
+        children = text_to_children("a **b _c_ d** e")
+        self.assertEqual([child.node_type for child in children],
+                         [HTMLNodeType.TEXT, HTMLNodeType.STRONG, HTMLNodeType.TEXT])
+        strong = children[1]
+        self.assertEqual([child.node_type for child in strong.children],
+                         [HTMLNodeType.TEXT, HTMLNodeType.EM, HTMLNodeType.TEXT])
+        self.assertEqual(strong.children[1].children[0].text, "c")
+
+    def test_unmatched_delimiters_are_merged_text(self):
+        children = text_to_children("a ** b _ c ` d")
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0].text, "a ** b _ c ` d")
+
+    def test_delimiters_must_flank_their_text(self):
+        self.assertEqual(text_to_children("a**.x** b")[0].text, "a**.x** b")
+        children = text_to_children("x **a ** b** c")
+        self.assertEqual(children[1].node_type, HTMLNodeType.STRONG)
+        self.assertEqual(children[1].children[0].text, "a ** b")
+        children = text_to_children("_a _b_ c_")
+        self.assertEqual([child.node_type for child in children[0].children],
+                         [HTMLNodeType.TEXT, HTMLNodeType.EM, HTMLNodeType.TEXT])
+
+    def test_code_span_is_stripped(self):
+        self.assertEqual(text_to_children("` a `")[0].children[0].text, "a")
+
+    def test_crossed_delimiters_close_the_first_opener(self):
+        children = text_to_children("**a _b** c_")
+        self.assertEqual(children[0].node_type, HTMLNodeType.STRONG)
+        self.assertEqual(children[0].children[0].text, "a _b")
+        self.assertEqual(children[1].text, " c_")
+
+    def test_code_span_is_literal(self):
+        children = text_to_children("`**not bold** _or italic_`")
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0].node_type, HTMLNodeType.CODE)
+        self.assertEqual(children[0].children[0].text, "**not bold** _or italic_")
+
+    def test_links_and_images(self):
+        children = text_to_children("see [the **docs**](/d) and ![logo](/l.png)")
+        self.assertEqual([child.node_type for child in children],
+                         [HTMLNodeType.TEXT, HTMLNodeType.A, HTMLNodeType.TEXT, HTMLNodeType.IMG])
+        link, image = children[1], children[3]
+        self.assertEqual((link.text, link.children[1].node_type), ("/d", HTMLNodeType.STRONG))
+        self.assertEqual((image.text, image.children[0].text), ("/l.png", "logo"))
+        with self.assertRaises(ValueError):
+            text_to_children("![](/no-alt.png)")
+
+    def test_code_span_binds_tighter_than_emphasis(self):
+        children = text_to_children("_a `b_` c")
+        self.assertEqual([child.node_type for child in children],
+                         [HTMLNodeType.TEXT, HTMLNodeType.CODE, HTMLNodeType.TEXT])
+        self.assertEqual(children[0].text, "_a ")
+
+
+class TestHtmlNodeToHtml(unittest.TestCase):
+
+    def test_serializes_blocks_and_inline(self):
+        self.assertEqual(
+            markdown_to_html("## Title\n\nSome **bold _and_ italic** `code`\n\n> quote\n\n1. one\n2. two"),
+            "<div><h2>Title</h2><div>Some <strong>bold <em>and</em> italic</strong> <code>code</code></div>"
+            "<blockquote>quote</blockquote><ol><li>one</li><li>two</li></ol></div>",
+        )
+
+    def test_escapes_text(self):
+        self.assertEqual(markdown_to_html("a < b && `<br>`"), "<div><div>a &lt; b &amp;&amp; <code>&lt;br&gt;</code></div></div>")
+        self.assertEqual(html_node_to_html(HTMLNode(HTMLNodeType.TEXT, text="x > y")), "x &gt; y")
+
+    def test_adjacent_text_nodes_are_merged(self):
+        node = HTMLNode(HTMLNodeType.LI, children=[
+            HTMLNode(HTMLNodeType.TEXT, text="a &"),
+            HTMLNode(HTMLNodeType.TEXT, text=""),
+            HTMLNode(HTMLNodeType.TEXT, text=" b"),
+            HTMLNode(HTMLNodeType.EM, children=[HTMLNode(HTMLNodeType.TEXT, text="c")]),
+        ])
+        self.assertEqual(html_node_to_html(node), "<li>a &amp; b<em>c</em></li>")
+
+    def test_links_and_images_carry_their_urls(self):
+        self.assertEqual(
+            markdown_to_html('[a & b](/x?y="z") ![<alt>](/i.png)'),
+            '<div><div><a href="/x?y=&quot;z&quot;">a &amp; b</a> <img alt="&lt;alt&gt;" src="/i.png" /></div></div>',
+        )
+
+    def test_deep_trees_do_not_recurse(self):
+        node = HTMLNode(HTMLNodeType.TEXT, text="x")
+        for _ in range(10000):
+            node = HTMLNode(HTMLNodeType.EM, children=[node])
+        self.assertEqual(html_node_to_html(node), "<em>" * 10000 + "x" + "</em>" * 10000)
+
+    def test_matches_reference_serializer(self):
+        md = "# T\n\nx **y** _z_\n\n- a\n- b\n\n```\ncode\n```"
+        expected = TestMarkdownToHTMLNode().to_html(markdown_to_html_node(md))
+        self.assertEqual(html_node_to_html(markdown_to_html_node(md)),
+                         expected.replace("<b>", "<strong>").replace("</b>", "</strong>")
+                         .replace("<i>", "<em>").replace("</i>", "</em>"))
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import metadata_index
+from build_manifest import BuildManifest
+from main import extract_title, generate_pages_incremental
+from metadata_index import MetadataIndex, build_metadata_index, find_title, page_url, template_values
+
+
+class TestFindTitle(unittest.TestCase):
+
+    def test_first_h1(self):
+        self.assertEqual(find_title("intro\n## Sub\n  #  Spaced title  \n# Second"), "Spaced title")
+        self.assertEqual(find_title("# Title\r\nText"), "Title")
+        self.assertIsNone(find_title("#No space\n#  \n## Sub"))
+
+    def test_extract_title_raises_without_h1(self):
+        self.assertEqual(extract_title("text\n# Title"), "Title")
+        with self.assertRaises(ValueError):
+            extract_title("no heading")
+
+
+class TestMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.write("index.md", "# Home\n")
+        self.write("blog/first.md", "---\ntitle: First\ndate: 2024-01-02\ntags: [a, b]\n---\nBody\n")
+        self.write("blog/second.md", "+++\ndate = 2024-03-04\ntags = [\"b\"]\n+++\n# Second post\n")
+        self.write("blog/wip.md", "---\ndraft: true\n---\n# Work in progress\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def pages(self):
+        return [
+            (os.path.join(self.content, relative), os.path.join(self.public, relative[:-3] + ".html"))
+            for relative in ("index.md", "blog/first.md", "blog/second.md", "blog/wip.md")
+            if os.path.exists(os.path.join(self.content, relative))
+        ]
+
+    def test_index(self):
+        index = build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        self.assertEqual(index.get("blog/second.md").title, "Second post")
+        self.assertEqual(index.get("blog/first.md").date, "2024-01-02")
+        self.assertEqual(index.get("index.md").url, "/")
+        self.assertEqual([page.key for page in index.published()], ["blog/second.md", "blog/first.md", "index.md"])
+        self.assertEqual([page.key for page in index.drafts()], ["blog/wip.md"])
+        self.assertEqual({tag: [page.key for page in pages] for tag, pages in index.by_tag().items()},
+                         {"a": ["blog/first.md"], "b": ["blog/second.md", "blog/first.md"]})
+
+    def test_unchanged_pages_are_not_read_again(self):
+        build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        with mock.patch.object(metadata_index, "read_page_metadata") as read:
+            index = build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        read.assert_not_called()
+        self.assertEqual(MetadataIndex.from_manifest(self.manifest).pages, index.pages)
+
+    def test_deleted_pages_and_invalid_front_matter_are_dropped(self):
+        build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        os.remove(os.path.join(self.content, "blog/second.md"))
+        self.write("blog/first.md", "---\ntitle: [unclosed\n---\n")
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            index = build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        self.assertIn("invalid front matter", output.getvalue())
+        self.assertEqual(sorted(self.manifest.keys("metadata")), ["blog/wip.md", "index.md"])
+        self.assertNotIn("blog/first.md", index)
+
+    def test_quoted_draft_flags(self):
+        self.write("blog/wip.md", '---\ndraft: "false"\n---\n# Published after all\n')
+        self.write("blog/second.md", "---\ndraft: 'yes'\n---\n# Still a draft\n")
+        index = build_metadata_index(self.pages(), self.content, self.public, self.manifest)
+        self.assertFalse(index.get("blog/wip.md").draft)
+        self.assertTrue(index.get("blog/second.md").draft)
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join(self.public, "blog", "index.html"), self.public), "/blog/")
+        self.assertEqual(page_url(os.path.join(self.public, "about.html"), self.public), "/about.html")
+
+    def test_drafts_are_not_rendered(self):
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(generate_pages_incremental(self.content, template, self.public, self.manifest,
+                                                        include_drafts=True), (4, 0, 0))
+            self.assertEqual(generate_pages_incremental(self.content, template, self.public, self.manifest),
+                             (0, 3, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "wip.html")))
+        with open(os.path.join(self.public, "blog", "first.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>First</title><p>Body</p>")
+
+    def test_front_matter_fills_template_slots(self):
+        self.write("blog/first.md", "---\ntitle: First\nauthor: Tolkien\ndate: 2024-01-02\ntags: [a, b]\n---\nBody\n")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title><p>{{ Author }}, {{ date }}, {{ Tags }}</p>{{ Missing }}{{ Content }}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, template, self.public, self.manifest)
+        with open(os.path.join(self.public, "blog", "first.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>First</title><p>Tolkien, 2024-01-02, a, b</p>{{ Missing }}<p>Body</p>")
+
+    def test_template_values(self):
+        self.assertEqual(template_values({"draft": False, "Author": "B", "author": "a", "notes": None}),
+                         {"draft": "false", "Draft": "false", "Author": "B", "author": "a", "notes": "", "Notes": ""})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import os
+import tempfile
+import unittest
+
+from page_template import PageTemplate, clear_template_cache, load_template
+
+
+class TestPageTemplate(unittest.TestCase):
+
+    def test_render_fills_slots(self):
+        template = PageTemplate("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+            "<title>Hi</title><body><p>x</p></body>",
+        )
+
+    def test_slot_whitespace_is_optional(self):
+        template = PageTemplate("{{Title}}|{{  Title  }}")
+        self.assertEqual(template.render({"Title": "T"}), "T|T")
+
+    def test_arbitrary_slots(self):
+        template = PageTemplate("{{ Author }} on {{ Date }}")
+        self.assertEqual(template.slot_names, ["Author", "Date"])
+        self.assertEqual(template.render({"Author": "Bilbo", "Date": "2024-01-01"}), "Bilbo on 2024-01-01")
+
+    def test_missing_slot_is_left_as_written(self):
+        template = PageTemplate("{{ Title }} {{ Unknown }}")
+        self.assertEqual(template.render({"Title": "T"}), "T {{ Unknown }}")
+
+    def test_slot_values_are_not_reparsed(self):
+        template = PageTemplate("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "{{ Content }}", "Content": "c"}), "{{ Content }}|c")
+
+    def test_render_to_matches_render(self):
+        template = PageTemplate("<a>{{ Title }}</a>{{ Content }}<b></b>")
+        context = {"Title": "t", "Content": "c"}
+        stream = io.StringIO()
+        template.render_to(stream, context)
+        self.assertEqual(stream.getvalue(), template.render(context))
+
+
+class TestLoadTemplate(unittest.TestCase):
+
+    def setUp(self):
+        clear_template_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "template.html")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("<h1>{{ Title }}</h1>")
+
+    def tearDown(self):
+        clear_template_cache()
+        self.tmp.cleanup()
+
+    def test_is_cached(self):
+        self.assertIs(load_template(self.path), load_template(self.path))
+
+    def test_reloads_when_file_changes(self):
+        first = load_template(self.path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("<h2>{{ Title }}</h2>!")
+        second = load_template(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render({"Title": "x"}), "<h2>x</h2>!")
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            load_template(os.path.join(self.tmp.name, "missing.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
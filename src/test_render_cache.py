@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+
+from render_cache import RenderCache, fragment_key
+
+
+class TestFragmentKey(unittest.TestCase):
+
+    def test_same_text_same_key(self):
+        self.assertEqual(fragment_key("# Hi", "v1"), fragment_key("# Hi", "v1"))
+
+    def test_text_and_parser_version_change_the_key(self):
+        self.assertNotEqual(fragment_key("# Hi", "v1"), fragment_key("# Ho", "v1"))
+        self.assertNotEqual(fragment_key("# Hi", "v1"), fragment_key("# Hi", "v2"))
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "fragments")
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, text):
+        self.calls.append(text)
+        return f"<p>{text}</p>"
+
+    def test_memory_hit_skips_render(self):
+        cache = RenderCache()
+        self.assertEqual(cache.get_or_render("a", "v", self.render), "<p>a</p>")
+        self.assertEqual(cache.get_or_render("a", "v", self.render), "<p>a</p>")
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(cache.stats["memory_hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_disk_tier_survives_a_new_cache(self):
+        RenderCache(self.directory).get_or_render("a", "v", self.render)
+        cache = RenderCache(self.directory)
+        self.assertEqual(cache.get_or_render("a", "v", self.render), "<p>a</p>")
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(cache.stats["disk_hits"], 1)
+
+    def test_parser_version_change_renders_again(self):
+        cache = RenderCache(self.directory)
+        cache.get_or_render("a", "v1", self.render)
+        cache.get_or_render("a", "v2", self.render)
+        self.assertEqual(self.calls, ["a", "a"])
+
+    def test_memory_lru_eviction(self):
+        cache = RenderCache(max_memory_bytes=20)
+        for text in ("aaaa", "bbbb", "cccc"):  # 11 characters each once rendered
+            cache.get_or_render(text, "v", self.render)
+        self.assertEqual(cache.stats["memory_evictions"], 2)
+        cache.get_or_render("cccc", "v", self.render)
+        cache.get_or_render("aaaa", "v", self.render)
+        self.assertEqual(self.calls, ["aaaa", "bbbb", "cccc", "aaaa"])
+
+    def test_prune_removes_least_recently_used_files(self):
+        cache = RenderCache(self.directory, max_disk_bytes=20)
+        for index, text in enumerate(("old", "mid", "new")):
+            key = fragment_key(text, "v")
+            cache.put(key, "x" * 10)
+            timestamp = time.time() - 100 + index
+            os.utime(cache._path(key), (timestamp, timestamp))
+
+        self.assertEqual(cache.prune(), 1)
+        fresh = RenderCache(self.directory)
+        self.assertIsNone(fresh.get(fragment_key("old", "v")))
+        self.assertEqual(fresh.get(fragment_key("new", "v")), "x" * 10)
+
+    def test_drain_and_add_stats(self):
+        cache = RenderCache()
+        cache.get_or_render("a", "v", self.render)
+        stats = cache.drain_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(cache.stats["misses"], 0)
+        cache.add_stats(stats)
+        self.assertIn("1 misses", cache.format_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
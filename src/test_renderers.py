@@ -0,0 +1,143 @@
+import unittest
+from unittest import mock
+
+from render_cache import disable_render_cache, enable_render_cache
+from renderer_parity import EQUIVALENT, IDENTICAL, compare, normalise_html
+from renderers import (
+    AutoRenderer,
+    NativeRenderer,
+    get_renderer,
+    needs_python_markdown,
+    select_renderer,
+)
+
+SIMPLE_PAGE = (
+    "# Title\n\n"
+    "Some **bold**, _italic_, `code`, a [link](/u) and ![an image](/i.png).\n\n"
+    "> quoted\n> lines\n\n"
+    "- one\n- two\n\n"
+    "Then\n\n"
+    "1. first\n2. second"
+)
+# Emphasis, links and code spans the native renderer parses like python-markdown.
+NATIVE_INLINE_CASES = (
+    "A [**bold link**](/x) here.",
+    "Some **bold _ital_ bold** text.",
+    "An _italic **bold** inside_ text.",
+    "x **a ** b** c",
+    "a**.x** but (**y**)",
+    "_a _b_ c_",
+    "` a `",
+)
+# Markdown needs_python_markdown sends to python-markdown instead.
+FALLBACK_CASES = (
+    'text [a](b "title")',
+    "> one\n>\n> two",
+    "> one\n\n> two",
+    "[![logo](/l.png)](/home)",
+    "# a\nb",
+    "  # a",
+    "** **",
+)
+
+
+class TestNativeRenderer(unittest.TestCase):
+
+    def test_renders_blocks(self):
+        self.assertEqual(
+            NativeRenderer().render("## Sub\n\n> q\n\n- a\n- **b**\n\n1. x\n2. _y_ ![i](/i.png)"),
+            "<h2>Sub</h2>\n<blockquote>\n<p>q</p>\n</blockquote>\n"
+            "<ul>\n<li>a</li>\n<li><strong>b</strong></li>\n</ul>\n"
+            '<ol>\n<li>x</li>\n<li><em>y</em> <img alt="i" src="/i.png" /></li>\n</ol>',
+        )
+
+    def test_code_is_escaped_without_its_fence_line(self):
+        self.assertEqual(
+            NativeRenderer().render("```python\nif a < b:\n    pass\n```"),
+            "<pre><code>if a &lt; b:\n    pass\n</code></pre>",
+        )
+
+    def test_matches_python_markdown_on_simple_pages(self):
+        self.assertFalse(needs_python_markdown(SIMPLE_PAGE))
+        self.assertEqual(compare(SIMPLE_PAGE, "python-markdown", "native"), (IDENTICAL, []))
+
+    def test_matches_python_markdown_on_inline_edge_cases(self):
+        for text in NATIVE_INLINE_CASES:
+            self.assertFalse(needs_python_markdown(text), text)
+            self.assertEqual(compare(text, "python-markdown", "native"), (IDENTICAL, []), text)
+
+    def test_blocks_shared_between_pages_are_cached(self):
+        cache = enable_render_cache()
+        self.addCleanup(disable_render_cache)
+        license_block = "Licensed under **CC BY 4.0**, see [the license](/license.html)."
+        first = NativeRenderer().render(f"# First\n\n{license_block}")
+        self.assertEqual(cache.drain_stats()["misses"], 2)
+        second = AutoRenderer().render(f"# Second\n\nOther text.\n\n{license_block}")
+        self.assertEqual(first.split("\n")[1], second.split("\n")[2])
+        stats = cache.drain_stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 2))
+
+
+class TestAutoRenderer(unittest.TestCase):
+
+    def test_falls_back_for_tables_and_code(self):
+        for text in ("| a | b |\n|---|---|\n| 1 | 2 |", "```python\nx = 1\n```", "- a\n\n- b", "a & b",
+                     "![](/no-alt.png)", "a __ b") + FALLBACK_CASES:
+            self.assertTrue(needs_python_markdown(text), text)
+
+    def test_output_matches_python_markdown(self):
+        for text in (SIMPLE_PAGE, "* star list\n* item", "```python\nx = 1\n```", "![no url]()") + FALLBACK_CASES:
+            self.assertEqual(compare(text, "python-markdown", "auto"), (IDENTICAL, []), text)
+
+    def test_native_errors_fall_back(self):
+        text = "![no url]()"
+        self.assertFalse(needs_python_markdown(text))
+        with self.assertRaises(ValueError):
+            NativeRenderer().render(text)
+        self.assertEqual(AutoRenderer().render(text), '<p><img alt="no url" src="" /></p>')
+
+
+class TestRendererSelection(unittest.TestCase):
+
+    def tearDown(self):
+        select_renderer("python-markdown")
+
+    def test_selected_renderer_is_shared(self):
+        select_renderer("native")
+        self.assertIs(get_renderer(), get_renderer("native"))
+        self.assertEqual(get_renderer().name, "native")
+
+    def test_renderers_have_distinct_versions(self):
+        versions = {get_renderer(name).version for name in ("python-markdown", "native", "auto")}
+        self.assertEqual(len(versions), 3)
+
+    def test_unknown_renderer(self):
+        with self.assertRaises(ValueError):
+            select_renderer("nope")
+
+
+class TestNormaliseHtml(unittest.TestCase):
+
+    def test_ignores_spelling_differences(self):
+        self.assertEqual(
+            normalise_html('<ul>\n<li><em>x</em> &amp; <img src="a" alt="b" /></li>\n</ul>'),
+            normalise_html('<ul><li><em>x</em> & <img alt="b" src="a"></li></ul>'),
+        )
+
+    def test_keeps_tag_differences(self):
+        self.assertNotEqual(normalise_html("<b>x</b>"), normalise_html("<strong>x</strong>"))
+        self.assertNotEqual(normalise_html('<img src="a" />'), normalise_html('<img src="a"></img>'))
+
+    def test_equivalent_output_comes_with_the_raw_diff(self):
+        with mock.patch.object(NativeRenderer, "render", return_value="<ul><li>a</li><li>b</li></ul>"):
+            result, diff = compare("- a\n- b", "python-markdown", "native")
+        self.assertEqual(result, EQUIVALENT)
+        self.assertIn("+<ul><li>a</li><li>b</li></ul>", diff)
+
+    def test_keeps_text_differences(self):
+        self.assertNotEqual(normalise_html("<p>a b</p>"), normalise_html("<p>a  b</p>"))
+        self.assertNotEqual(normalise_html("<pre><code>x\n</code></pre>"), normalise_html("<pre><code>x</code></pre>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import search_index
+from build_manifest import BuildManifest, fingerprint_file
+from main import SitePaths, build_site
+from metadata_index import MetadataIndex, PageMetadata
+from search_index import (
+    DOCS_FILE, SEARCH_SCRIPT, SEARCH_SECTION, SEARCH_TERMS_TABLE, apply_search_script, choose_prefix_length,
+    decode_shard, decode_varint, disable_search_script, enable_search_script, encode_shard, encode_varint,
+    page_terms, remove_search_index, shard_name, write_search_index,
+)
+
+
+class TestTokenizing(unittest.TestCase):
+
+    def test_page_terms_come_from_text_bold_and_italic(self):
+        markdown = (
+            "# Static **Site**\n\n"
+            "Build _fast_ sites, fast. See [the docs](/docs) and `inline_code`.\n\n"
+            "```\nfenced code\n```\n\n"
+            "> Quoted words\n\n"
+            "- Listed item\n\n1. Numbered item"
+        )
+        self.assertEqual(page_terms(markdown), {
+            "static": 1, "site": 1, "build": 1, "fast": 2, "sites": 1, "see": 1, "and": 1,
+            "quoted": 1, "words": 1, "listed": 1, "item": 2, "numbered": 1,
+        })
+
+    def test_unicode_and_long_terms(self):
+        self.assertEqual(page_terms("Über CAFÉ " + "x" * 65), {"über": 1, "café": 1})
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_varint_round_trip(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, 2 ** 32]
+        for value in values:
+            encode_varint(value, out)
+        self.assertEqual(bytes(out[:4]), b"\x00\x01\x7f\x80")
+        pos = 0
+        for value in values:
+            decoded, pos = decode_varint(out, pos)
+            self.assertEqual(decoded, value)
+        self.assertEqual(pos, len(out))
+
+    def test_shard_round_trip(self):
+        terms = {"static": [(0, 2), (5, 1), (900, 3)], "stat": [(5, 1)], "sté": [(1, 1)]}
+        data = encode_shard(terms)
+        self.assertEqual(decode_shard(data), terms)
+        # Front-coded terms and gaps keep it well below the raw terms and numbers.
+        self.assertLess(len(data), 30)
+
+
+class TestWriteSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(self.content)
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.index = MetadataIndex()
+        self.write("index.md", "# Home\n\nWelcome to the site")
+        self.write("apples.md", "# Apples\n\nApples are red")
+        self.write("pears.md", "# Pears\n\nPears are green")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, key, text):
+        path = os.path.join(self.content, key)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # What generate_pages_incremental records for a rendered page.
+        self.manifest.set("pages", key, fingerprint_file(path))
+        url = "/" if key == "index.md" else "/" + key[:-3] + ".html"
+        self.index.pages[key] = PageMetadata(key, url, key[:-3].title(), None, (), False)
+
+    def remove(self, key):
+        os.remove(os.path.join(self.content, key))
+        self.manifest.pop("pages", key)
+        self.index.pages.pop(key)
+
+    def build(self, prefix_length=2):
+        return write_search_index(self.index, self.content, self.public, self.manifest, prefix_length)
+
+    def docs(self):
+        with open(os.path.join(self.public, *DOCS_FILE.split("/")), encoding="utf-8") as f:
+            return json.load(f)
+
+    def shard(self, prefix):
+        with open(os.path.join(self.public, *shard_name(prefix).split("/")), "rb") as f:
+            return decode_shard(f.read())
+
+    def lookup(self, term):
+        meta = self.docs()
+        prefix = term[:meta["prefixLength"]]
+        if prefix not in meta["shards"]:
+            return []
+        return sorted(meta["docs"][doc][0] for doc, _ in self.shard(prefix).get(term, []))
+
+    def test_index(self):
+        counts = self.build()
+        self.assertEqual((counts["pages"], counts["indexed"], counts["unchanged"]), (3, 3, 0))
+        self.assertEqual(self.lookup("are"), ["/apples.html", "/pears.html"])
+        self.assertEqual(self.lookup("apples"), ["/apples.html"])
+        self.assertEqual(self.shard("ap")["apples"][0][1], 2)
+        self.assertIn("we", self.docs()["shards"])
+        self.assertTrue(os.path.exists(os.path.join(self.public, "search", "search.js")))
+
+    def test_only_changed_pages_and_shards_are_rewritten(self):
+        self.build()
+        self.write("pears.md", "# Pears\n\nPears are yellow")
+        with mock.patch.object(search_index, "page_terms", wraps=search_index.page_terms) as terms:
+            counts = self.build()
+        self.assertEqual(terms.call_count, 1)
+        self.assertEqual((counts["indexed"], counts["unchanged"]), (1, 2))
+        # Only "ye" (yellow) is written: "gr" (green) is removed and the pe and ar shards come out identical.
+        self.assertEqual(counts["written"], 1)
+        self.assertEqual(self.lookup("yellow"), ["/pears.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, *shard_name("gr").split("/"))))
+
+    def test_removed_pages_free_their_document_number(self):
+        self.build()
+        self.remove("apples.md")
+        self.build()
+        self.assertEqual(self.lookup("apples"), [])
+        self.assertEqual(self.lookup("are"), ["/pears.html"])
+        self.write("plums.md", "# Plums\n\nPlums are purple")
+        self.build()
+        self.assertEqual(self.docs()["docs"].count(None), 0)
+        self.assertEqual(self.lookup("are"), ["/pears.html", "/plums.html"])
+
+    def test_terms_are_kept_out_of_the_manifest(self):
+        self.build()
+        self.manifest.save()
+        with open(self.manifest.path, encoding="utf-8") as f:
+            self.assertNotIn('"terms"', f.read())
+        terms_path = self.manifest.table(SEARCH_TERMS_TABLE).path
+        mtime = os.stat(terms_path).st_mtime_ns
+        self.manifest = BuildManifest.load(self.manifest.path)
+        self.assertEqual(self.build()["unchanged"], 3)
+        self.manifest.save()
+        # Nothing changed, so the table isn't rewritten.
+        self.assertEqual(os.stat(terms_path).st_mtime_ns, mtime)
+
+        # A lost table re-indexes every page rather than leaving stale shards.
+        os.remove(terms_path)
+        self.manifest = BuildManifest.load(self.manifest.path)
+        self.remove("apples.md")
+        self.assertEqual(self.build()["indexed"], 2)
+        self.assertEqual(self.lookup("apples"), [])
+        self.assertEqual(self.lookup("are"), ["/pears.html"])
+
+    def test_small_site_gets_a_single_shard(self):
+        counts = self.build(prefix_length=None)
+        self.assertEqual(counts["written"], 1)
+        self.assertEqual((self.docs()["prefixLength"], self.docs()["shards"]), (0, [""]))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "search", "index.bin")))
+        self.assertEqual(self.lookup("are"), ["/apples.html", "/pears.html"])
+
+    def test_prefix_length_grows_with_the_vocabulary(self):
+        self.assertEqual(choose_prefix_length(set(), terms_per_shard=2), 0)
+        self.assertEqual(choose_prefix_length({"ab", "ac"}, terms_per_shard=2), 0)
+        self.assertEqual(choose_prefix_length({"ab", "ac", "bd"}, terms_per_shard=2), 1)
+        self.assertEqual(choose_prefix_length({"ab", "ac", "ad", "ae", "af"}, terms_per_shard=2), 2)
+        self.assertEqual(choose_prefix_length({"abc", "abd", "abe"}, terms_per_shard=1), 3)
+
+    def test_changed_prefix_length_rewrites_shards_without_re_indexing(self):
+        self.build()
+        with mock.patch.object(search_index, "page_terms", wraps=search_index.page_terms) as terms:
+            counts = self.build(prefix_length=None)
+        self.assertEqual(terms.call_count, 0)
+        self.assertEqual((counts["unchanged"], counts["written"]), (3, 1))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.public, "search"))),
+                         ["docs.json", "index.bin", "search.js"])
+        self.assertEqual(self.lookup("apples"), ["/apples.html"])
+
+    def test_remove_search_index(self):
+        self.build()
+        remove_search_index(self.manifest, self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "search")))
+        self.assertEqual(list(self.manifest.keys(SEARCH_SECTION)), [])
+        self.assertEqual(list(self.manifest.keys("generated")), [])
+        self.assertEqual(list(self.manifest.table(SEARCH_TERMS_TABLE).keys()), [])
+
+
+class TestSearchScript(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(disable_search_script)
+
+    def test_script_goes_in_the_head(self):
+        parts = ["<html><head><title>T</title>", "</HEAD><body>x</body></html>"]
+        self.assertEqual(apply_search_script(parts), parts)
+        enable_search_script()
+        self.assertEqual("".join(apply_search_script(parts)),
+                         f"<html><head><title>T</title>{SEARCH_SCRIPT}</HEAD><body>x</body></html>")
+        self.assertEqual("".join(apply_search_script(["<p>x</p></body>"])), f"<p>x</p>{SEARCH_SCRIPT}</body>")
+        self.assertEqual("".join(apply_search_script(["<p>x</p>"])), f"<p>x</p>{SEARCH_SCRIPT}")
+
+    def test_site_build_links_the_client_from_every_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            site = SitePaths(os.path.join(root, "static"), os.path.join(root, "content"),
+                             os.path.join(root, "template.html"), os.path.join(root, "public"),
+                             os.path.join(root, ".cache", "build-manifest.json"))
+            os.makedirs(site.content_dir)
+            os.makedirs(site.static_dir)
+            with open(site.template_file, "w", encoding="utf-8") as f:
+                f.write("<head></head><body>{{ Content }}</body>")
+            with open(os.path.join(site.content_dir, "index.md"), "w", encoding="utf-8") as f:
+                f.write("# Home")
+            page = os.path.join(site.dest_dir, "index.html")
+
+            def built_page(search):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    build_site(site, search=search)
+                with open(page, encoding="utf-8") as f:
+                    return f.read()
+
+            self.assertIn(SEARCH_SCRIPT, built_page(search=True))
+            self.assertTrue(os.path.exists(os.path.join(site.dest_dir, "search", "search.js")))
+            # Turning search off re-renders the unchanged page without the script.
+            self.assertNotIn(SEARCH_SCRIPT, built_page(search=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
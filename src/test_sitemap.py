@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from build_manifest import BuildManifest
+from metadata_index import MetadataIndex, PageMetadata
+from sitemap import SITEMAP_FILE, absolute_url, remove_sitemaps, shard_count, sitemap_entries, url_hashes, write_sitemaps
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+BASE = "https://example.com/"
+
+
+def make_index(count, draft_every=0, date="2024-01-01"):
+    pages = {}
+    for number in range(count):
+        key = f"posts/{number:05d}.md"
+        pages[key] = PageMetadata(key, f"/posts/{number:05d}.html", f"Post {number}", date, (),
+                                  bool(draft_every) and number % draft_every == 0)
+    return MetadataIndex(pages)
+
+
+class TestSitemap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+        self.manifest = BuildManifest(os.path.join(self.dest, "manifest.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def parse(self, name):
+        return ET.parse(os.path.join(self.dest, name)).getroot()
+
+    def locs(self, root):
+        return [element.text for element in root.iter(NS + "loc")]
+
+    def test_single_sitemap(self):
+        index = make_index(5, draft_every=2)
+        index.pages["a&b.md"] = PageMetadata("a&b.md", "/a&b c.html", "A", "2024-02-03T10:00:00", (), False)
+        counts = write_sitemaps(index, self.dest, BASE, self.manifest)
+        self.assertEqual(counts, {"urls": 3, "written": 1, "reused": 0})
+        root = self.parse(SITEMAP_FILE)
+        self.assertEqual(root.tag, NS + "urlset")
+        self.assertEqual(self.locs(root), ["https://example.com/a&b%20c.html",
+                                           "https://example.com/posts/00001.html",
+                                           "https://example.com/posts/00003.html"])
+        self.assertEqual([element.text for element in root.iter(NS + "lastmod")],
+                         ["2024-02-03T10:00:00+00:00", "2024-01-01", "2024-01-01"])
+
+    def test_large_sites_are_sharded(self):
+        index = make_index(100)
+        counts = write_sitemaps(index, self.dest, BASE, self.manifest, limit=30)
+        sitemap_index = self.parse(SITEMAP_FILE)
+        self.assertEqual(sitemap_index.tag, NS + "sitemapindex")
+        shards = [url[len(BASE):] for url in self.locs(sitemap_index)]
+        self.assertEqual(len(shards), shard_count(url_hashes(sitemap_entries(index, BASE)), 30))
+        self.assertEqual(counts["written"], len(shards) + 1)
+        urls = []
+        for shard in shards:
+            shard_urls = self.locs(self.parse(shard))
+            self.assertLessEqual(len(shard_urls), 30)
+            urls.extend(shard_urls)
+        self.assertEqual(sorted(urls), [absolute_url(BASE, page.url) for page in index])
+
+    def test_unchanged_shards_are_reused(self):
+        index = make_index(100)
+        write_sitemaps(index, self.dest, BASE, self.manifest, limit=30)
+        self.assertEqual(write_sitemaps(index, self.dest, BASE, self.manifest, limit=30)["written"], 0)
+        # A changed or new page rewrites only its own shard; the index lists the same shards.
+        index.pages["posts/00007.md"] = index.pages["posts/00007.md"]._replace(date="2025-01-01")
+        self.assertEqual(write_sitemaps(index, self.dest, BASE, self.manifest, limit=30)["written"], 1)
+        index.pages["new.md"] = PageMetadata("new.md", "/new.html", "New", None, (), False)
+        self.assertEqual(write_sitemaps(index, self.dest, BASE, self.manifest, limit=30)["written"], 1)
+
+    def test_stale_shards_are_removed(self):
+        write_sitemaps(make_index(100), self.dest, BASE, self.manifest, limit=30)
+        write_sitemaps(make_index(10), self.dest, BASE, self.manifest, limit=30)
+        self.assertEqual(sorted(name for name in os.listdir(self.dest) if name.endswith(".xml")), [SITEMAP_FILE])
+        self.assertEqual(self.parse(SITEMAP_FILE).tag, NS + "urlset")
+
+    def test_remove_sitemaps(self):
+        write_sitemaps(make_index(100), self.dest, BASE, self.manifest, limit=30)
+        # A static file of the same kind isn't generated, so it stays.
+        with open(os.path.join(self.dest, "sitemap-news.xml"), "w", encoding="utf-8") as f:
+            f.write("<urlset/>")
+        remove_sitemaps(self.manifest, self.dest)
+        self.assertEqual([name for name in os.listdir(self.dest) if name.endswith(".xml")], ["sitemap-news.xml"])
+        self.assertEqual(list(self.manifest.keys("generated")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
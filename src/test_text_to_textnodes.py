@@ -1,5 +1,13 @@
 import unittest
-from text_to_textnodes import text_to_textnodes  # Correct import
+import random
+from text_to_textnodes import (  # Correct import
+    text_to_textnodes,
+    split_nodes_code,
+    split_nodes_image,
+    split_nodes_link,
+    split_nodes_bold,
+    split_nodes_italic,
+)
 from textnode import TextNode, TextType
 
 class TestTextToTextNodes(unittest.TestCase):
@@ -105,4 +113,41 @@ class TestTextToTextNodes(unittest.TestCase):
     def test_empty_url_link(self):
         text = "[anchor]( )"
         expected = [TextNode("anchor", TextType.LINK, " ")]
-        self.assertEqual(text_to_textnodes(text), expected)
\ No newline at end of file
+        self.assertEqual(text_to_textnodes(text), expected)
+
+
+def five_pass_text_to_textnodes(text):
+    """Reference: the splitters applied one after another, as text_to_textnodes used to."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_code(nodes)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_bold(nodes)
+    nodes = split_nodes_italic(nodes)
+    return [node for node in nodes if node.text is not None and node.text != ""]
+
+
+class TestFusedLexerParity(unittest.TestCase):
+
+    def test_precedence_cases(self):
+        cases = [
+            "_a `b_ c`",
+            "**a [b** c](u)",
+            "![a _b](u) c_",
+            "!`x`[l](u)",
+            "[a](b)![c](d)[e](f)",
+            "**a _b_ c** _d **e** f_",
+            "``**``",
+            "![](url) and [](url)",
+            "multi\nline _not\nitalic_ **not\nbold**",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertEqual(text_to_textnodes(text), five_pass_text_to_textnodes(text))
+
+    def test_random_inputs(self):
+        rng = random.Random(4)
+        alphabet = ["a", " ", "*", "**", "_", "`", "[", "]", "(", ")", "!", "![", "](", "\n"]
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            self.assertEqual(text_to_textnodes(text), five_pass_text_to_textnodes(text), msg=repr(text))
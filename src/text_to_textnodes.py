@@ -2,12 +2,18 @@
 import re
 from textnode import TextNode, TextType # Assuming these are correctly defined
 
+# Compiled once and shared by the individual splitters and the fused lexer below.
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^)]*?)\)")
+LINK_RE = re.compile(r"(?<!\!)\[([^\[\]]*)\]\(([^\)]*?)\)")
+CODE_RE = re.compile(r"\`(.*?)\`")
+BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+ITALIC_RE = re.compile(r"\_(.*?)\_")
+
 # --- Leaf Node Splitters (Image, Link) ---
 # (Keep split_nodes_image and split_nodes_link as they were in the previous good version)
 def split_nodes_image(old_nodes):
     # ... (same as previous version) ...
     new_nodes = []
-    image_pattern = r"!\[([^\[\]]*)\]\(([^)]*?)\)"
     for node in old_nodes:
         if node.text_type != TextType.TEXT or not node.text:
             new_nodes.append(node)
@@ -16,7 +22,7 @@ def split_nodes_image(old_nodes):
         current_split_nodes = []
         last_end = 0
         processed_outer = False
-        for match in re.finditer(image_pattern, original_text):
+        for match in IMAGE_RE.finditer(original_text):
             processed_outer = True
             start, end = match.span()
             alt_text = match.group(1)
@@ -34,7 +40,6 @@ def split_nodes_image(old_nodes):
 def split_nodes_link(old_nodes):
     # ... (same as previous version) ...
     new_nodes = []
-    link_pattern = r"(?<!\!)\[([^\[\]]*)\]\(([^\)]*?)\)"
     for node in old_nodes:
         if node.text_type != TextType.TEXT or not node.text:
             new_nodes.append(node)
@@ -43,7 +48,7 @@ def split_nodes_link(old_nodes):
         current_split_nodes = []
         last_end = 0
         processed_outer = False
-        for match in re.finditer(link_pattern, original_text):
+        for match in LINK_RE.finditer(original_text):
             processed_outer = True
             start, end = match.span()
             anchor_text = match.group(1)
@@ -64,7 +69,6 @@ def split_nodes_link(old_nodes):
 def split_nodes_code(old_nodes):
     """Splits TEXT nodes around `code` segments. Content is treated literally."""
     new_nodes = []
-    code_pattern = r"\`(.*?)\`"
     for node in old_nodes:
         if node.text_type != TextType.TEXT or not node.text:
             new_nodes.append(node)
@@ -75,7 +79,7 @@ def split_nodes_code(old_nodes):
         last_end = 0
         processed_outer = False
 
-        for match in re.finditer(code_pattern, original_text):
+        for match in CODE_RE.finditer(original_text):
             processed_outer = True
             start, end = match.span()
             inner_content = match.group(1)
@@ -167,8 +171,6 @@ def split_nodes_bold(old_nodes):
     Processes inner content for _italic_ segments. (Fixes duplication bug)
     """
     new_nodes = []
-    bold_pattern = r"\*\*(.*?)\*\*"
-    italic_pattern = r"\_(.*?)\_"
 
     for node in old_nodes:
         if node.text_type != TextType.TEXT or not node.text:
@@ -180,7 +182,7 @@ def split_nodes_bold(old_nodes):
         last_end = 0
         processed_outer = False # Flag if any bold match occurred in this node
 
-        for match in re.finditer(bold_pattern, original_text):
+        for match in BOLD_RE.finditer(original_text):
             processed_outer = True
             start, end = match.span()
             inner_bold_content = match.group(1)
@@ -192,7 +194,7 @@ def split_nodes_bold(old_nodes):
             # 2. Process the inner_bold_content for italics
             temp_inner_nodes = [] # Nodes generated ONLY from inner content
             inner_last_end = 0
-            for inner_match in re.finditer(italic_pattern, inner_bold_content):
+            for inner_match in ITALIC_RE.finditer(inner_bold_content):
                 inner_start, inner_end = inner_match.span()
                 italic_content = inner_match.group(1)
                 # Text before italic (as BOLD)
@@ -234,7 +236,6 @@ def split_nodes_italic(old_nodes):
     Assumes bold segments have already handled italics within them.
     """
     new_nodes = []
-    italic_pattern = r"\_(.*?)\_"
 
     for node in old_nodes:
         if node.text_type != TextType.TEXT or not node.text:
@@ -246,7 +247,7 @@ def split_nodes_italic(old_nodes):
         last_end = 0
         processed_outer = False
 
-        for match in re.finditer(italic_pattern, original_text):
+        for match in ITALIC_RE.finditer(original_text):
             processed_outer = True
             start, end = match.span()
             inner_content = match.group(1)
@@ -268,25 +269,87 @@ def split_nodes_italic(old_nodes):
             new_nodes.append(node)
     return new_nodes
 
+# --- Fused Lexer ---
+# text_to_textnodes used to run the five splitters above one after another,
+# rebuilding the node list each time. Each splitter only ever looks at the
+# TEXT left between the matches of the ones before it, so the same result is
+# produced by walking those gaps directly: match code spans, then images in
+# the gaps between them, then links in the remaining gaps, and so on. Nodes
+# are emitted straight into one output list, and intermediate TEXT nodes are
+# never built. A single alternation regex would be leftmost-first instead,
+# which changes the result (e.g. "_a `b_ c`" must be TEXT + CODE, not ITALIC).
+
+def _emit(out, text, text_type, url=None, alt=None):
+    # Same filter text_to_textnodes always applied to its result.
+    if text:
+        out.append(TextNode(text, text_type, url, alt))
+
+def _emit_code(match, out):
+    _emit(out, match.group(1), TextType.CODE)
+
+def _emit_image(match, out):
+    alt_text = match.group(1)
+    _emit(out, alt_text, TextType.IMAGE, match.group(2), alt_text)
+
+def _emit_link(match, out):
+    _emit(out, match.group(1), TextType.LINK, match.group(2))
+
+def _emit_bold(match, out):
+    # Italics nested in bold, exactly as split_nodes_bold handles them.
+    inner = match.group(1)
+    inner_last_end = 0
+    for inner_match in ITALIC_RE.finditer(inner):
+        _emit(out, inner[inner_last_end:inner_match.start()], TextType.BOLD)
+        _emit(out, inner_match.group(1), TextType.ITALIC)
+        inner_last_end = inner_match.end()
+    _emit(out, inner[inner_last_end:], TextType.BOLD)
+
+def _emit_italic(match, out):
+    _emit(out, match.group(1), TextType.ITALIC)
+
+# (pattern, substring that must occur for the pattern to match, emitter),
+# in the order the splitters used to run.
+_INLINE_LEVELS = (
+    (CODE_RE, "`", _emit_code),
+    (IMAGE_RE, "![", _emit_image),
+    (LINK_RE, "[", _emit_link),
+    (BOLD_RE, "**", _emit_bold),
+    (ITALIC_RE, "_", _emit_italic),
+)
+
+def _lex(text, start, end, levels, out):
+    """Emits nodes for text[start:end], matching levels[0] first and lexing the gaps with the rest."""
+    if not levels:
+        _emit(out, text[start:end], TextType.TEXT)
+        return
+    pattern, _, emit = levels[0]
+    rest = levels[1:]
+    last_end = start
+    # endpos behaves exactly like slicing; the link lookbehind can see one
+    # character before pos, but that is always the ` or ) closing the
+    # previous match, never "!".
+    for match in pattern.finditer(text, start, end):
+        _lex(text, last_end, match.start(), rest, out)
+        emit(match, out)
+        last_end = match.end()
+    _lex(text, last_end, end, rest, out)
+
 # --- Main Function ---
 
 def text_to_textnodes(text):
     """
     Converts raw text to TextNodes, handling basic nesting.
     Uses standard Markdown rules (code blocks are literal by default).
+
+    Produces the same nodes as applying split_nodes_code, split_nodes_image,
+    split_nodes_link, split_nodes_bold and split_nodes_italic in turn and
+    dropping empty nodes, in a single walk over the text.
     """
     if not isinstance(text, str):
         raise TypeError("Input must be a string")
 
-    initial_node = TextNode(text, TextType.TEXT)
-    nodes = [initial_node]
-
-    # Apply splitters - use Option A or B for split_nodes_code
-    nodes = split_nodes_code(nodes) # Using Option A by default
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_bold(nodes) # Use revised bold splitter
-    nodes = split_nodes_italic(nodes)
-
-    # Filter out empty text nodes
-    return [node for node in nodes if node.text is not None and node.text != ""]
\ No newline at end of file
+    # Levels whose trigger never occurs can't match anywhere.
+    levels = tuple(level for level in _INLINE_LEVELS if level[1] in text)
+    nodes = []
+    _lex(text, 0, len(text), levels, nodes)
+    return nodes
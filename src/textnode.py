@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = 6
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url", "alt")
+
     def __init__(self, text, text_type, url=None, alt=None):
         self.text = text
         self.text_type = text_type